@@ -0,0 +1,13 @@
+"""
+转换器包
+定义统一的HTML转PDF转换器接口，各后端通过注册表接入
+"""
+
+from .base import Converter, ConverterCapabilities, ConversionResult
+from .registry import (register_converter, available_converters, failed_converters, create_converter,
+                       get_converter_class)
+
+__all__ = [
+    "Converter", "ConverterCapabilities", "ConversionResult",
+    "register_converter", "available_converters", "failed_converters", "create_converter", "get_converter_class"
+]
\ No newline at end of file
@@ -0,0 +1,180 @@
+"""
+转换器接口
+所有HTML转PDF后端实现同一个接口，由注册表统一发现和调度
+"""
+
+import os
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+
+@dataclass
+class ConverterCapabilities:
+    """转换器能力描述"""
+    javascript: bool = False  # 是否执行页面中的JavaScript
+    max_concurrency: int = 1  # convert 可以被同时调用的最大次数
+    batch: bool = False  # 是否需要整批调用 convert_many 才能发挥效率(如一次启动转换多个文件)
+    accepts_bytes: bool = True  # 是否接受内存中的HTML内容
+
+
+@dataclass
+class ConversionResult:
+    """单个文档的转换结果"""
+    sample_name: str
+    success: bool
+    time: float  # 转换耗时(秒)，不含启动开销
+    file_size: int = 0
+    file_path: str = ""
+    error: str = ""
+    extra: Dict[str, Any] = field(default_factory=dict)  # 后端特有的附加信息
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为 tools/test_*.py 使用的原始结果字典"""
+        result = {
+            "sample": self.sample_name,
+            "success": self.success,
+            "time": self.time,
+            "file_size": self.file_size,
+            "file_path": self.file_path,
+            "error": self.error
+        }
+        result.update(self.extra)
+        return result
+
+
+# 转换任务: (HTML文件路径或HTML字节内容, 输出PDF路径, 样例名)
+ConversionJob = Tuple[Union[str, bytes], str, str]
+
+
+class Converter(ABC):
+    """
+    HTML转PDF转换器基类
+
+    生命周期为 setup -> convert/convert_many -> teardown。setup 负责启动和预热
+    (浏览器池、进程池、常驻监听进程等)，启动耗时记录在 launch_time 中，
+    与单文档耗时分开统计。
+    """
+
+    name: str = ""  # 工具名称，作为评估结果中的键
+    output_suffix: str = ""  # 输出文件名后缀，如 base_weasyprint.pdf
+    log_prefix: str = ""  # 控制台日志前缀
+    priority: int = 100  # 默认运行顺序，数值越小越靠前
+    capabilities: ConverterCapabilities = ConverterCapabilities()
+    # 只影响运行方式(并发数、超时、复用的资源池等)而不影响输出PDF的参数，不参与转换缓存的键
+    runtime_options: Tuple[str, ...] = ()
+
+    def __init__(self, **options):
+        self.options = options
+        self.launch_time = 0.0
+        self._ready = False
+
+    def __enter__(self) -> "Converter":
+        self.ensure_ready()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.teardown()
+
+    def version(self) -> str:
+        """后端版本号，用于区分不同版本的转换结果；可能取决于选项(如可执行文件路径)，因此是实例方法"""
+        return "unknown"
+
+    def output_options(self) -> Dict[str, Any]:
+        """影响输出PDF的参数，用于计算转换缓存的键"""
+        return {key: value for key, value in self.options.items() if key not in self.runtime_options}
+
+    @property
+    def ready(self) -> bool:
+        """是否已执行 setup"""
+        return self._ready
+
+    def ensure_ready(self) -> None:
+        """首次使用前执行 setup"""
+        if not self._ready:
+            self.setup()
+            self._ready = True
+
+    def setup(self) -> None:
+        """启动并预热后端资源"""
+
+    def teardown(self) -> None:
+        """释放后端资源"""
+        self._ready = False
+
+    @abstractmethod
+    def convert(self, source: Union[str, bytes], output_path: str,
+                sample_name: Optional[str] = None) -> ConversionResult:
+        """
+        转换单个文档
+
+        Args:
+            source: HTML文件路径或HTML字节内容
+            output_path: 输出PDF文件路径
+            sample_name: 结果中使用的样例名，默认取输入文件名
+
+        Returns:
+            转换结果，转换失败时 success 为 False 而不是抛出异常
+        """
+
+    def convert_many(self, jobs: List[ConversionJob]) -> List[ConversionResult]:
+        """转换多个文档，按输入顺序返回结果；支持并发或批量的后端应覆盖此方法"""
+        return [self.convert(source, output_path, sample_name) for source, output_path, sample_name in jobs]
+
+    def output_filename(self, sample_name: str) -> str:
+        """样例对应的输出文件名"""
+        return os.path.splitext(sample_name)[0] + f"_{self.output_suffix}.pdf"
+
+    @staticmethod
+    def sample_name_for(source: Union[str, bytes], sample_name: Optional[str]) -> str:
+        if sample_name:
+            return sample_name
+        return os.path.basename(source) if isinstance(source, str) else "document.html"
+
+    @staticmethod
+    @contextmanager
+    def materialize(source: Union[str, bytes], sample_name: Optional[str] = None) -> Iterator[str]:
+        """
+        确保输入是磁盘上的HTML文件
+
+        字节内容写入临时目录，文件名沿用样例名，便于依赖文件名的后端使用。
+        """
+        if isinstance(source, str):
+            yield source
+            return
+
+        temp_dir = tempfile.mkdtemp(prefix="html_pdf_")
+        try:
+            path = os.path.join(temp_dir, os.path.basename(sample_name or "document.html"))
+            with open(path, "wb") as f:
+                f.write(source)
+            yield path
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @staticmethod
+    def success_result(sample_name: str, conversion_time: float, output_path: str,
+                       **extra) -> ConversionResult:
+        file_size = os.path.getsize(output_path) if os.path.exists(output_path) else 0
+        return ConversionResult(
+            sample_name=sample_name,
+            success=True,
+            time=conversion_time,
+            file_size=file_size,
+            file_path=output_path,
+            extra=extra
+        )
+
+    @staticmethod
+    def failure_result(sample_name: str, conversion_time: float, error: str,
+                       **extra) -> ConversionResult:
+        return ConversionResult(
+            sample_name=sample_name,
+            success=False,
+            time=conversion_time,
+            error=error,
+            extra=extra
+        )
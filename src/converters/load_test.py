@@ -0,0 +1,391 @@
+"""
+持续负载测试
+在固定并发数或目标到达率下，用测试样例组成的负载持续转换一段时间，
+报告吞吐量、随时间变化的延迟分布、错误率和内存漂移，用于生产环境容量规划
+"""
+
+import itertools
+import math
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Union
+
+from converters.base import Converter
+from converters.registry import create_converter
+from converters.runner import OUTPUTS_DIR, SAMPLES_DIR
+from utils.corpus import SampleSpec, as_corpus
+from utils.resource_monitor import MB, ResourceMonitor
+from utils.timing_stats import TimingStats, percentile
+
+# 延迟直方图的桶上界(秒)，最后一个桶收集超过最大上界的请求
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def latency_histogram(latencies: List[float]) -> Dict[str, int]:
+    """按 LATENCY_BUCKETS 统计延迟分布，键为桶的标签，如 ≤0.5s、>60s"""
+    histogram = {f"≤{bound:g}s": 0 for bound in LATENCY_BUCKETS}
+    histogram[f">{LATENCY_BUCKETS[-1]:g}s"] = 0
+    for latency in latencies:
+        for bound in LATENCY_BUCKETS:
+            if latency <= bound:
+                histogram[f"≤{bound:g}s"] += 1
+                break
+        else:
+            histogram[f">{LATENCY_BUCKETS[-1]:g}s"] += 1
+    return histogram
+
+
+def linear_slope(xs: List[float], ys: List[float]) -> float:
+    """最小二乘直线的斜率，样本不足时为0"""
+    n = len(xs)
+    if n < 2:
+        return 0.0
+    mean_x = sum(xs) / n
+    mean_y = sum(ys) / n
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    if variance == 0:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance
+
+
+@dataclass
+class LoadRequest:
+    """单个请求的记录，时间均为相对测试开始的秒数"""
+    sample_name: str
+    arrival: float  # 请求到达时间；开放模式下为计划到达时间，包含排队等待
+    start: float  # 开始转换的时间
+    end: float  # 转换完成的时间
+    success: bool
+    error: str = ""
+
+    @property
+    def latency(self) -> float:
+        """从到达到完成的延迟"""
+        return self.end - self.arrival
+
+    @property
+    def service_time(self) -> float:
+        """不含排队的转换耗时"""
+        return self.end - self.start
+
+
+@dataclass
+class LoadWindow:
+    """一个统计时间窗口内完成的请求"""
+    start: float
+    end: float
+    completed: int
+    errors: int
+    throughput: float  # 文档/秒
+    p50: float
+    p95: float
+    p99: float
+    histogram: Dict[str, int]
+    rss_mb: float = 0.0  # 窗口内进程树RSS的平均值
+
+
+@dataclass
+class LoadTestReport:
+    """负载测试结果"""
+    tool_name: str
+    mode: str  # "concurrency" 固定并发(闭环) 或 "rate" 目标到达率(开环)
+    concurrency: int
+    target_rate: Optional[float]
+    duration: float
+    completed: int
+    errors: int
+    abandoned: int  # 测试结束时仍在排队、未开始转换的请求(开环模式下后端饱和的信号)
+    error_rate: float  # 百分比
+    throughput: float  # 成功文档/秒
+    latency: Dict[str, float]  # 成功请求的延迟统计
+    service_time: Dict[str, float]  # 成功请求不含排队的转换耗时统计
+    histogram: Dict[str, int]
+    windows: List[LoadWindow] = field(default_factory=list)
+    memory: Dict[str, float] = field(default_factory=dict)
+    sample_counts: Dict[str, int] = field(default_factory=dict)  # 负载中各样例的请求数
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class LoadTester:
+    """
+    负载测试器
+
+    两种模式:
+    - 固定并发(闭环): concurrency 个工作线程各自不停转换，一个完成后立即开始下一个
+    - 目标到达率(开环): 请求按泊松过程以 rate 个/秒到达，由 concurrency 个工作线程处理，
+      延迟从计划到达时间算起，后端处理不过来时排队时间计入延迟
+
+    负载按样例权重从语料中随机抽取。后端启动开销不计入测试时长。
+    """
+
+    def __init__(self, converter: Converter, samples: Any = None, input_dir: str = SAMPLES_DIR,
+                 output_dir: str = OUTPUTS_DIR, seed: Optional[int] = 0):
+        """
+        Args:
+            converter: 转换器实例，由调用方负责释放
+            samples: 负载使用的样例来源，默认为内置样例
+            input_dir: 样例目录
+            output_dir: 输出目录，每个工作线程使用独立的子目录并覆盖写入
+            seed: 抽取样例的随机种子
+        """
+        self.converter = converter
+        self.specs = [spec for spec in as_corpus(samples, input_dir) if os.path.exists(spec.path)]
+        if not self.specs:
+            raise ValueError("负载测试没有可用的样例")
+        self.output_dir = os.path.join(output_dir, "load_test")
+        self.rng = random.Random(seed)
+
+        self._lock = threading.Lock()
+        self._requests: List[LoadRequest] = []
+        self._slots = threading.local()
+        self._slot_ids = itertools.count()
+        self._origin = 0.0
+
+    def _pick(self) -> SampleSpec:
+        with self._lock:
+            return self.rng.choices(self.specs, weights=[spec.weight for spec in self.specs])[0]
+
+    def _now(self) -> float:
+        return time.perf_counter() - self._origin
+
+    def _output_path(self, spec: SampleSpec) -> str:
+        if not hasattr(self._slots, "directory"):
+            self._slots.directory = os.path.join(self.output_dir, f"slot{next(self._slot_ids)}")
+            os.makedirs(self._slots.directory, exist_ok=True)
+        return os.path.join(self._slots.directory, self.converter.output_filename(spec.name))
+
+    def _execute(self, spec: SampleSpec, arrival: float) -> None:
+        start = self._now()
+        try:
+            result = self.converter.convert(spec.path, self._output_path(spec), spec.name)
+            success, error = result.success, result.error
+        except Exception as e:
+            success, error = False, str(e)
+        request = LoadRequest(spec.name, arrival, start, self._now(), success, error)
+        with self._lock:
+            self._requests.append(request)
+
+    def _closed_loop(self, concurrency: int, duration: float) -> int:
+        def worker() -> None:
+            while self._now() < duration:
+                self._execute(self._pick(), self._now())
+
+        threads = [threading.Thread(target=worker, name=f"load-{index}", daemon=True) for index in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return 0
+
+    def _open_loop(self, concurrency: int, rate: float, duration: float) -> int:
+        futures = []
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="load") as executor:
+            arrival = 0.0
+            while True:
+                arrival += self.rng.expovariate(rate)
+                if arrival >= duration:
+                    break
+                delay = arrival - self._now()
+                if delay > 0:
+                    time.sleep(delay)
+                futures.append(executor.submit(self._execute, self._pick(), arrival))
+            # 测试结束时尚未开始的请求不再转换
+            return sum(1 for future in futures if future.cancel())
+
+    def run(self, duration: float = 60.0, concurrency: Optional[int] = None, rate: Optional[float] = None,
+            window: float = 5.0, warmup: float = 0.0, monitor_interval: float = 0.5) -> LoadTestReport:
+        """
+        运行负载测试
+
+        Args:
+            duration: 计入统计的测试时长(秒)
+            concurrency: 工作线程数，默认为后端的 max_concurrency，超过时按后端上限处理
+            rate: 目标到达率(文档/秒)；为空时使用固定并发模式
+            window: 随时间变化的统计窗口长度(秒)
+            warmup: 正式测试前以相同负载预热的时长(秒)，不计入统计
+            monitor_interval: 进程树内存采样间隔(秒)
+        """
+        self.converter.ensure_ready()
+        limit = self.converter.capabilities.max_concurrency
+        concurrency = concurrency or limit
+        if concurrency > limit:
+            print(f"⚠️ {self.converter.name} 最多支持 {limit} 个并发转换，并发数由 {concurrency} 调整为 {limit}")
+            concurrency = limit
+
+        if warmup > 0:
+            print(f"🔥 预热 {warmup:.0f}s...")
+            self._drive(concurrency, rate, warmup)
+            self._requests = []
+
+        mode = f"目标到达率 {rate:g}/s" if rate else f"固定并发 {concurrency}"
+        print(f"🏋️ {self.converter.name} 负载测试: {mode}, 时长 {duration:.0f}s, 样例 {len(self.specs)} 个")
+        with ResourceMonitor(interval=monitor_interval) as monitor:
+            abandoned = self._drive(concurrency, rate, duration)
+
+        return self._build_report(concurrency, rate, duration, window, abandoned, monitor)
+
+    def _drive(self, concurrency: int, rate: Optional[float], duration: float) -> int:
+        self._origin = time.perf_counter()
+        if rate:
+            return self._open_loop(concurrency, rate, duration)
+        return self._closed_loop(concurrency, duration)
+
+    def _build_report(self, concurrency: int, rate: Optional[float], duration: float, window: float,
+                      abandoned: int, monitor: ResourceMonitor) -> LoadTestReport:
+        requests = sorted(self._requests, key=lambda request: request.end)
+        succeeded = [request for request in requests if request.success]
+        errors = len(requests) - len(succeeded)
+        latencies = [request.latency for request in succeeded]
+
+        # 延迟样本较多，减少自助法重抽样次数
+        latency_stats = TimingStats.from_samples(latencies, resamples=200).to_dict()
+        service_stats = TimingStats.from_samples([request.service_time for request in succeeded], resamples=200).to_dict()
+
+        sample_counts: Dict[str, int] = {}
+        for request in requests:
+            sample_counts[request.sample_name] = sample_counts.get(request.sample_name, 0) + 1
+
+        # 固定并发模式下最后一批请求在时长结束后才完成，按实际结束时间计算吞吐量
+        elapsed = max(duration, requests[-1].end if requests else duration)
+        return LoadTestReport(
+            tool_name=self.converter.name,
+            mode="rate" if rate else "concurrency",
+            concurrency=concurrency,
+            target_rate=rate,
+            duration=elapsed,
+            completed=len(succeeded),
+            errors=errors,
+            abandoned=abandoned,
+            error_rate=errors / len(requests) * 100 if requests else 0.0,
+            throughput=len(succeeded) / elapsed if elapsed > 0 else 0.0,
+            latency=latency_stats,
+            service_time=service_stats,
+            histogram=latency_histogram(latencies),
+            windows=self._windows(requests, duration, elapsed, window, monitor),
+            memory=self._memory_drift(monitor),
+            sample_counts=sample_counts
+        )
+
+    @staticmethod
+    def _windows(requests: List[LoadRequest], duration: float, elapsed: float, window: float,
+                 monitor: ResourceMonitor) -> List[LoadWindow]:
+        """按完成时间划分统计窗口，时长结束后才完成的请求计入最后一个窗口"""
+        windows = []
+        count = max(1, math.ceil(duration / window))
+        for index in range(count):
+            last = index == count - 1
+            start = index * window
+            end = elapsed if last else (index + 1) * window
+            in_window = [request for request in requests if start <= request.end and (last or request.end < end)]
+            latencies = [request.latency for request in in_window if request.success]
+            rss = [value for at, value in zip(monitor.sample_times, monitor.rss_samples)
+                   if start <= at and (last or at < end)]
+            windows.append(LoadWindow(
+                start=start,
+                end=end,
+                completed=len(latencies),
+                errors=len(in_window) - len(latencies),
+                throughput=len(latencies) / (end - start) if end > start else 0.0,
+                p50=percentile(latencies, 50),
+                p95=percentile(latencies, 95),
+                p99=percentile(latencies, 99),
+                histogram=latency_histogram(latencies),
+                rss_mb=sum(rss) / len(rss) / MB if rss else 0.0
+            ))
+        return windows
+
+    @staticmethod
+    def _memory_drift(monitor: ResourceMonitor) -> Dict[str, float]:
+        """
+        进程树内存随时间的变化
+
+        drift_mb_per_min 为RSS对时间的线性回归斜率，持续为正说明后端可能存在泄漏
+        或缓存无上限增长；前10%的采样视为爬升阶段，不参与回归。
+        """
+        if not monitor.rss_samples:
+            return {}
+
+        skip = len(monitor.rss_samples) // 10
+        times = monitor.sample_times[skip:]
+        rss = [value / MB for value in monitor.rss_samples[skip:]]
+        memory = {
+            "rss_start_mb": monitor.rss_samples[0] / MB,
+            "rss_end_mb": monitor.rss_samples[-1] / MB,
+            "rss_peak_mb": max(monitor.rss_samples) / MB,
+            "drift_mb_per_min": linear_slope(times, rss) * 60,
+            "processes_peak": max(monitor.process_counts)
+        }
+        if any(monitor.pss_samples):
+            pss = [value / MB for value in monitor.pss_samples[skip:]]
+            memory.update({
+                "pss_peak_mb": max(monitor.pss_samples) / MB,
+                "pss_drift_mb_per_min": linear_slope(times, pss) * 60
+            })
+        return memory
+
+
+def print_load_test_report(report: LoadTestReport) -> None:
+    """在控制台打印负载测试结果"""
+    print(f"\n📈 {report.tool_name} 负载测试结果")
+    print("=" * 50)
+    mode = f"目标到达率 {report.target_rate:g}/s" if report.mode == "rate" else "固定并发"
+    print(f"模式: {mode}, 并发 {report.concurrency}, 时长 {report.duration:.1f}s")
+    print(f"吞吐量: {report.throughput:.2f} 文档/秒 (成功 {report.completed}, 失败 {report.errors}, "
+          f"错误率 {report.error_rate:.2f}%)")
+    if report.abandoned:
+        print(f"⚠️ 结束时仍有 {report.abandoned} 个请求在排队，后端处理能力低于目标到达率")
+
+    latency = report.latency
+    print(f"延迟: p50 {latency['median']:.3f}s, p95 {latency['p95']:.3f}s, p99 {latency['p99']:.3f}s, "
+          f"平均 {latency['mean']:.3f}s")
+    print(f"转换耗时(不含排队): p50 {report.service_time['median']:.3f}s, p95 {report.service_time['p95']:.3f}s")
+    print("延迟分布: " + ", ".join(f"{label} {count}" for label, count in report.histogram.items() if count))
+
+    print("\n时间窗口:")
+    for window in report.windows:
+        print(f"  {f'{window.start:.0f}-{window.end:.0f}s':>12}  {window.throughput:7.2f}/s  "
+              f"p50 {window.p50:.3f}s  p95 {window.p95:.3f}s  p99 {window.p99:.3f}s  "
+              f"错误 {window.errors}  RSS {window.rss_mb:.0f}MB")
+
+    if report.memory:
+        memory = report.memory
+        print(f"\n内存: RSS {memory['rss_start_mb']:.0f}MB -> {memory['rss_end_mb']:.0f}MB "
+              f"(峰值 {memory['rss_peak_mb']:.0f}MB), 漂移 {memory['drift_mb_per_min']:+.1f}MB/分钟")
+
+
+def run_load_test(converter: Union[str, Converter], duration: float = 60.0, concurrency: Optional[int] = None,
+                  rate: Optional[float] = None, samples: Any = None, window: float = 5.0, warmup: float = 0.0,
+                  output_dir: str = OUTPUTS_DIR, seed: Optional[int] = 0, **options) -> LoadTestReport:
+    """
+    对单个后端运行负载测试并打印结果
+
+    Args:
+        converter: 转换器名称或实例；传入名称时按 options 创建，测试结束后释放
+        duration: 测试时长(秒)
+        concurrency: 工作线程数，默认为后端的 max_concurrency
+        rate: 目标到达率(文档/秒)，为空时使用固定并发模式
+        samples: 负载使用的样例来源，按样例权重抽取，默认为内置样例
+        window: 统计窗口长度(秒)
+        warmup: 预热时长(秒)
+        output_dir: 输出目录
+        seed: 抽取样例的随机种子
+    """
+    owns_converter = isinstance(converter, str)
+    if owns_converter:
+        converter = create_converter(converter, **options)
+
+    try:
+        tester = LoadTester(converter, samples=samples, output_dir=output_dir, seed=seed)
+        report = tester.run(duration=duration, concurrency=concurrency, rate=rate, window=window, warmup=warmup)
+    finally:
+        if owns_converter:
+            converter.teardown()
+
+    print_load_test_report(report)
+    return report
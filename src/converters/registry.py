@@ -0,0 +1,94 @@
+"""
+转换器注册表
+converters 包中以 _converter.py 结尾的模块会被自动导入，模块内用 register_converter 注册后端
+"""
+
+import ast
+import importlib
+import os
+import pkgutil
+from typing import Dict, List, Type
+
+from converters.base import Converter
+
+
+_REGISTRY: Dict[str, Type[Converter]] = {}
+# 导入失败的后端: {工具名称: 错误信息}
+_FAILED: Dict[str, str] = {}
+_discovered = False
+
+
+def register_converter(cls: Type[Converter]) -> Type[Converter]:
+    """注册转换器类的装饰器"""
+    if not cls.name:
+        raise ValueError(f"转换器 {cls.__name__} 缺少 name")
+    _REGISTRY[cls.name] = cls
+    return cls
+
+
+def _declared_names(path: str) -> List[str]:
+    """不导入模块，从源码中读取用 register_converter 注册的类声明的 name"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=path)
+    except (OSError, SyntaxError, ValueError):
+        return []
+
+    names = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        if not any(isinstance(d, ast.Name) and d.id == "register_converter" for d in node.decorator_list):
+            continue
+        for statement in node.body:
+            if (isinstance(statement, ast.Assign) and isinstance(statement.value, ast.Constant)
+                    and any(isinstance(t, ast.Name) and t.id == "name" for t in statement.targets)):
+                names.append(str(statement.value.value))
+    return names
+
+
+def discover_converters() -> None:
+    """导入 converters 包中的所有后端模块，导入失败的模块按工具名称记录错误"""
+    global _discovered
+    if _discovered:
+        return
+    _discovered = True
+
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    for module_info in pkgutil.iter_modules([package_dir]):
+        if module_info.name.endswith("_converter"):
+            try:
+                importlib.import_module(f"converters.{module_info.name}")
+            except Exception as e:
+                print(f"❌ 导入转换器模块失败 {module_info.name}: {e}")
+                path = os.path.join(package_dir, f"{module_info.name}.py")
+                for name in _declared_names(path) or [module_info.name]:
+                    if name not in _REGISTRY:
+                        _FAILED[name] = f"导入转换器模块 {module_info.name} 失败: {e}"
+
+
+def available_converters() -> List[str]:
+    """按运行顺序返回所有已注册的转换器名称"""
+    discover_converters()
+    return [cls.name for cls in sorted(_REGISTRY.values(), key=lambda c: (c.priority, c.name))]
+
+
+def failed_converters() -> Dict[str, str]:
+    """模块导入失败的工具: {工具名称: 错误信息}"""
+    discover_converters()
+    return dict(_FAILED)
+
+
+def get_converter_class(name: str) -> Type[Converter]:
+    """按名称查找转换器类"""
+    discover_converters()
+    if name not in _REGISTRY:
+        if name in _FAILED:
+            raise ImportError(_FAILED[name])
+        raise KeyError(f"未注册的转换器: {name}，可用: {', '.join(available_converters())}")
+    return _REGISTRY[name]
+
+
+def create_converter(name: str, **options) -> Converter:
+    """按名称创建转换器实例"""
+    return get_converter_class(name)(**options)
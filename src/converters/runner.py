@@ -0,0 +1,283 @@
+"""
+样例运行器
+用任意已注册的转换器转换测试样例，输出与 tools/test_*.py 一致的原始结果
+"""
+
+import os
+import sys
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from converters.base import ConversionJob, Converter, ConversionResult
+from converters.registry import create_converter
+from utils.conversion_cache import ConversionCache
+from utils.corpus import DEFAULT_SAMPLES_DIR, SampleSpec, as_corpus
+from utils.phase_timer import median_phases
+from utils.resource_monitor import ResourceMonitor, current_descendants
+from utils.timing_stats import TimingStats
+
+# 获取当前文件的目录，然后构建相对于src目录的路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.dirname(current_dir)  # 上一级目录就是src
+
+SAMPLES_DIR = DEFAULT_SAMPLES_DIR
+OUTPUTS_DIR = os.path.join(src_dir, "test_data", "outputs")
+
+# 每次调用 convert_many 的文档数，语料按块流式读取
+CHUNK_SIZE = 32
+
+
+def prepare_job(converter: Converter, spec: SampleSpec,
+                output_dir: str = OUTPUTS_DIR) -> Union[ConversionJob, ConversionResult]:
+    """
+    为单个样例生成转换任务
+
+    Returns:
+        转换任务；输入文件不存在时返回失败结果
+    """
+    # 检查HTML文件是否存在
+    if not os.path.exists(spec.path):
+        print(f"{converter.log_prefix or f'[{converter.name}]'} {spec.name} -> 文件不存在，跳过")
+        return Converter.failure_result(spec.name, 0, "文件不存在")
+
+    output_path = os.path.join(output_dir, converter.output_filename(spec.name))
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    return spec.path, output_path, spec.name
+
+
+def prepare_jobs(converter: Converter, samples: Iterable[SampleSpec],
+                 output_dir: str = OUTPUTS_DIR) -> Iterator[Union[ConversionJob, ConversionResult]]:
+    """按语料顺序逐个生成转换任务或输入缺失的失败结果"""
+    os.makedirs(output_dir, exist_ok=True)
+    for spec in samples:
+        yield prepare_job(converter, spec, output_dir)
+
+
+def report_result(converter: Converter, result: ConversionResult) -> ConversionResult:
+    """打印单个转换结果，并附上后端启动耗时"""
+    prefix = converter.log_prefix or f"[{converter.name}]"
+    timing = result.extra.get("timing")
+    if result.success and timing and timing["trials"] > 1:
+        print(f"{prefix} {result.sample_name} -> median {timing['median']:.3f}s "
+              f"[{timing['median_ci_low']:.3f}, {timing['median_ci_high']:.3f}], "
+              f"p95 {timing['p95']:.3f}s, n={timing['trials']}, size: {result.file_size} bytes")
+    elif result.success and result.extra.get("cache") == "hit":
+        print(f"{prefix} {result.sample_name} -> 命中缓存 (原耗时 {result.time:.2f}s), size: {result.file_size} bytes")
+    elif result.success:
+        print(f"{prefix} {result.sample_name} -> done in {result.time:.2f}s, size: {result.file_size} bytes")
+    else:
+        print(f"{prefix} {result.sample_name} -> 转换失败: {result.error}")
+    result.extra.setdefault("launch_time", converter.launch_time)
+    return result
+
+
+def aggregate_trials(trial_results: List[ConversionResult]) -> ConversionResult:
+    """
+    合并同一文档多次测量的结果
+
+    耗时取成功测量的中位数，完整统计写入 extra["timing"]，各阶段耗时和资源占用同样取中位数；
+    只要有一次测量成功即视为成功，失败次数记录在 extra["failed_trials"] 中。
+    """
+    measured = [result for result in trial_results if result.success]
+    failures = [result for result in trial_results if not result.success]
+    result = measured[-1] if measured else trial_results[-1]
+
+    times = [trial.time for trial in measured]
+    stats = TimingStats.from_samples(times)
+    if measured:
+        result.time = stats.median
+        result.extra["phases"] = median_phases(trial.extra.get("phases", {}) for trial in measured)
+        if any("resources" in trial.extra for trial in measured):
+            # median_phases 对任意 {名称: 数值} 字典按键取中位数
+            result.extra["resources"] = median_phases(trial.extra.get("resources", {}) for trial in measured)
+    if failures and measured:
+        result.error = f"{len(failures)}/{len(trial_results)} 次测量失败: {failures[-1].error}"
+    result.extra.update({"trial_times": times, "timing": stats.to_dict(), "failed_trials": len(failures)})
+    return result
+
+
+def convert_monitored(converter: Converter, jobs: List[ConversionJob],
+                      monitor: bool = False, exclude_pids: Iterable[int] = ()) -> List[ConversionResult]:
+    """
+    转换一组文档，monitor 为 True 时采样进程树的内存和CPU占用
+
+    资源占用写入每个结果的 extra["resources"]，CPU时间按文档数平均分摊，
+    内存峰值和平均值是这组文档共同的值；逐个文档调用时即为单个文档的占用。
+    exclude_pids 中的进程(后端启动前已存在的子进程)及其子孙不计入。
+    """
+    if not monitor:
+        return converter.convert_many(jobs)
+
+    with ResourceMonitor(exclude_pids=exclude_pids) as resource_monitor:
+        results = converter.convert_many(jobs)
+    usage = resource_monitor.summary(len(jobs))
+    for result in results:
+        result.extra["resources"] = dict(usage)
+    return results
+
+
+def run_trials(converter: Converter, jobs: List[ConversionJob], warmup: int = 0,
+               trials: int = 1, monitor: bool = False, exclude_pids: Iterable[int] = ()) -> List[ConversionResult]:
+    """
+    预热后重复测量一组文档
+
+    每轮按顺序转换全部文档，多轮交替进行，避免同一文档的测量集中在某段时间内。
+    warmup 为0且 trials 为1时与直接调用 convert_many 相同。
+
+    Args:
+        converter: 已就绪的转换器
+        jobs: 转换任务
+        warmup: 不计入统计的预热轮数
+        trials: 计入统计的测量轮数
+        monitor: 是否在测量轮中监控资源占用，预热轮不监控
+        exclude_pids: 监控时不计入的进程，见 convert_monitored
+    """
+    if warmup <= 0 and trials <= 1:
+        return convert_monitored(converter, jobs, monitor, exclude_pids)
+
+    for _ in range(warmup):
+        converter.convert_many(jobs)
+    rounds = [convert_monitored(converter, jobs, monitor, exclude_pids) for _ in range(max(1, trials))]
+    return [aggregate_trials(list(trial_results)) for trial_results in zip(*rounds)]
+
+
+def run_cached(converter: Converter, jobs: List[ConversionJob], cache: Optional[ConversionCache],
+               run: Callable[[List[ConversionJob]], List[ConversionResult]],
+               **key_extra) -> List[ConversionResult]:
+    """
+    先查转换缓存，只把未命中的文档交给 run 转换，成功的结果写回缓存
+
+    Args:
+        converter: 转换器
+        jobs: 转换任务
+        cache: 转换缓存，为空时直接调用 run
+        run: 实际转换一组任务的函数
+        key_extra: 其他影响结果的参数(预热次数、测量次数、是否监控资源)，参与缓存键
+
+    Returns:
+        按输入顺序排列的结果，命中缓存的结果 extra["cache"] 为 "hit"
+    """
+    if cache is None or not jobs:
+        return run(jobs)
+
+    results: List[Optional[ConversionResult]] = [None] * len(jobs)
+    keys: List[Optional[str]] = [None] * len(jobs)
+    misses = []
+    for index, (source, output_path, sample_name) in enumerate(jobs):
+        try:
+            keys[index] = cache.key_for(converter, source, key_extra)
+        except OSError:
+            # 无法读取输入时交给转换器报告错误
+            misses.append(index)
+            continue
+        results[index] = cache.get(keys[index], output_path, sample_name)
+        if results[index] is None:
+            misses.append(index)
+
+    if misses:
+        converted = run([jobs[index] for index in misses])
+        for index, result in zip(misses, converted):
+            result.extra["cache"] = "miss"
+            if keys[index] is not None:
+                cache.put(keys[index], result)
+            results[index] = result
+    return results
+
+
+def unavailable_results(error: str, samples: Any = None, input_dir: str = SAMPLES_DIR) -> List[Dict[str, Any]]:
+    """后端不可用(如模块导入失败)时，为每个样例生成失败结果"""
+    return [Converter.failure_result(spec.name, 0, error).to_dict() for spec in as_corpus(samples, input_dir)]
+
+
+# 进程内共享的后端进程池: (模块名, 关闭函数名)
+SHARED_POOLS = (
+    ("utils.browser_pool", "close_shared_pool"),
+    ("utils.soffice_server", "close_shared_server_pool"),
+)
+
+
+def close_shared_pools() -> None:
+    """关闭进程内共享的浏览器池和 soffice 监听池，未导入的模块说明共享池不存在"""
+    for module_name, closer in SHARED_POOLS:
+        module = sys.modules.get(module_name)
+        if module is not None:
+            getattr(module, closer)()
+
+
+def describe_cache_usage(results: List[Dict[str, Any]]) -> str:
+    """单个工具的缓存命中情况"""
+    hits = sum(1 for result in results if result.get("cache") == "hit")
+    looked_up = sum(1 for result in results if "cache" in result)
+    rate = hits / looked_up * 100 if looked_up else 0.0
+    return f"命中 {hits}/{looked_up} ({rate:.1f}%)"
+
+
+def run_converter(converter: Union[str, Converter], samples: Any = None,
+                  input_dir: str = SAMPLES_DIR, output_dir: str = OUTPUTS_DIR,
+                  chunk_size: int = CHUNK_SIZE, warmup: int = 0, trials: int = 1,
+                  monitor_resources: bool = False, cache: Optional[ConversionCache] = None,
+                  **options) -> List[Dict[str, Any]]:
+    """
+    用指定转换器转换样例
+
+    Args:
+        converter: 转换器名称或实例；传入名称时按 options 创建，运行结束后释放
+        samples: 样例来源，可以是 Corpus、目录/清单/通配符字符串或样例名列表，
+            默认为 input_dir 中的全部样例
+        input_dir: 样例目录
+        output_dir: 输出目录
+        chunk_size: 每次交给转换器的文档数
+        warmup: 基准测试模式下每个文档不计入统计的预热次数
+        trials: 基准测试模式下每个文档计入统计的测量次数，结果耗时为中位数
+        monitor_resources: 是否记录进程树(含浏览器、soffice等子进程)的内存和CPU占用；
+            开启后逐个文档转换，使资源占用可以归属到单个文档。后端启动前先关闭其他后端的共享进程池，
+            启动前已存在的子进程不计入，评估进程本身只计入相对基线的增长
+        cache: 转换缓存，输入、引用资源、后端版本和参数都未变化的文档直接复用上次的PDF和结果
+
+    Returns:
+        按语料顺序排列的原始结果字典列表
+    """
+    owns_converter = isinstance(converter, str)
+    if owns_converter:
+        converter = create_converter(converter, **options)
+
+    results: List[Dict[str, Any]] = []
+    exclude_pids: List[int] = []
+    try:
+        if monitor_resources and not converter.ready:
+            # 其他后端的共享进程池在监控期间仍会占用内存和CPU，先关闭；
+            # 此后仍在运行的子进程(如 forkserver)不属于本后端，不计入资源占用
+            close_shared_pools()
+            exclude_pids = current_descendants()
+        converter.ensure_ready()
+        # 启动开销单独报告，不计入单文档转换时间
+        print(f"{converter.log_prefix or f'[{converter.name}]'} 后端就绪, 启动耗时 {converter.launch_time:.2f}s")
+
+        if monitor_resources:
+            chunk_size = 1
+        prepared = prepare_jobs(converter, as_corpus(samples, input_dir), output_dir)
+        while True:
+            chunk = list(islice(prepared, chunk_size))
+            if not chunk:
+                break
+            jobs = [item for item in chunk if not isinstance(item, ConversionResult)]
+            converted = iter(run_cached(
+                converter, jobs, cache,
+                lambda pending: run_trials(converter, pending, warmup, trials, monitor_resources, exclude_pids),
+                warmup=warmup, trials=trials, monitor=monitor_resources
+            ))
+
+            # convert_many 按输入顺序返回结果，与缺失文件的结果按语料顺序合并
+            for item in chunk:
+                if isinstance(item, ConversionResult):
+                    results.append(item.to_dict())
+                else:
+                    results.append(report_result(converter, next(converted)).to_dict())
+
+        if cache is not None:
+            print(f"{converter.log_prefix or f'[{converter.name}]'} 转换缓存: {describe_cache_usage(results)}")
+    finally:
+        if owns_converter:
+            converter.teardown()
+
+    return results
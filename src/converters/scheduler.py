@@ -0,0 +1,229 @@
+"""
+转换调度器
+让多个后端同时转换样例，在全局并发预算内按后端限制分配文档
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from converters.base import ConversionJob, Converter, ConversionResult
+from converters.registry import create_converter
+from converters.runner import (
+    CHUNK_SIZE, OUTPUTS_DIR, SAMPLES_DIR, describe_cache_usage, prepare_jobs, report_result, run_cached, run_trials
+)
+from utils.conversion_cache import ConversionCache
+from utils.corpus import as_corpus
+
+
+class JobFeed:
+    """
+    单个后端的任务来源
+
+    多个工作线程共用，从语料中逐个取出任务，同时记录语料顺序和转换结果。
+    """
+
+    def __init__(self, prepared: Iterator[Union[ConversionJob, ConversionResult]]):
+        self._prepared = prepared
+        self._lock = threading.Lock()
+        self._order: List[str] = []
+        self._results: Dict[str, ConversionResult] = {}
+
+    def take(self, count: int = 1) -> List[ConversionJob]:
+        """取出至多 count 个任务，输入缺失的样例直接记录失败结果"""
+        jobs = []
+        with self._lock:
+            while len(jobs) < count:
+                item = next(self._prepared, None)
+                if item is None:
+                    break
+                if isinstance(item, ConversionResult):
+                    self._order.append(item.sample_name)
+                    self._results[item.sample_name] = item
+                    continue
+                self._order.append(item[2])
+                jobs.append(item)
+        return jobs
+
+    def record(self, result: ConversionResult) -> None:
+        with self._lock:
+            self._results[result.sample_name] = result
+
+    def results(self) -> List[Dict[str, Any]]:
+        """按语料顺序排列的原始结果字典列表"""
+        return [self._results[name].to_dict() for name in self._order if name in self._results]
+
+
+class ConversionScheduler:
+    """
+    多后端并行调度器
+
+    每个后端按自己的并发上限开启若干工作线程，从各自的任务来源取文档转换；
+    所有后端共用一个全局并发预算，正在转换的文档总数不超过该预算。
+    需要整批转换的后端(capabilities.batch)按块调用 convert_many，
+    每块按其并发数占用全局预算。
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None,
+                 backend_limits: Optional[Dict[str, int]] = None,
+                 cache: Optional[ConversionCache] = None):
+        """
+        Args:
+            max_concurrency: 全局同时转换的最大文档数，默认为各后端并发上限之和
+            backend_limits: 按工具名称限制单个后端的并发数，不能超过后端自身的 max_concurrency
+            cache: 转换缓存，命中的文档不占用并发预算
+        """
+        self.max_concurrency = max_concurrency
+        self.backend_limits = backend_limits or {}
+        self.cache = cache
+        self.wall_time = 0.0
+        self._budget: Optional[threading.Semaphore] = None
+        self._budget_size = 0
+        self._multi_acquire_lock = threading.Lock()
+
+    def backend_limit(self, converter: Converter) -> int:
+        """后端实际使用的并发数"""
+        limit = converter.capabilities.max_concurrency
+        if converter.name in self.backend_limits:
+            limit = min(limit, self.backend_limits[converter.name])
+        return max(1, limit)
+
+    def run(self, tools: List[str], converter_options: Optional[Dict[str, Dict[str, Any]]] = None,
+            samples: Any = None, input_dir: str = SAMPLES_DIR,
+            output_dir: str = OUTPUTS_DIR, warmup: int = 0, trials: int = 1) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        同时用多个后端转换样例
+
+        Args:
+            tools: 工具名称列表
+            converter_options: 按工具名称传给转换器的参数
+            samples: 样例来源，可以是 Corpus、目录/清单/通配符字符串或样例名列表
+            warmup: 基准测试模式下每个文档的预热次数
+            trials: 基准测试模式下每个文档的测量次数
+
+        Returns:
+            按工具名称分组的原始结果字典列表，组内按样例顺序排列；
+            启动失败的工具对应空列表
+        """
+        converter_options = converter_options or {}
+        start = time.perf_counter()
+
+        converters: Dict[str, Converter] = {}
+        for tool_name in tools:
+            try:
+                converters[tool_name] = create_converter(tool_name, **converter_options.get(tool_name, {}))
+            except Exception as e:
+                print(f"❌ {tool_name} 创建失败: {e}")
+
+        try:
+            ready = self._setup_all(converters)
+            test_results: Dict[str, List[Dict[str, Any]]] = {name: [] for name in tools}
+
+            limits = {name: self.backend_limit(converter) for name, converter in ready.items()}
+            self._budget_size = self.max_concurrency or sum(limits.values()) or 1
+            self._budget = threading.Semaphore(self._budget_size)
+            print(f"⚙️ 全局并发预算 {self._budget_size}, 后端并发: "
+                  + ", ".join(f"{name}={limit}" for name, limit in limits.items()))
+
+            feeds: Dict[str, JobFeed] = {}
+            lanes = []
+            for name, converter in ready.items():
+                # 每个后端各自流式遍历语料
+                feeds[name] = JobFeed(prepare_jobs(converter, as_corpus(samples, input_dir), output_dir))
+                if converter.capabilities.batch:
+                    lanes.append(threading.Thread(
+                        target=self._run_batch, args=(converter, feeds[name], limits[name], warmup, trials),
+                        name=f"scheduler-{name}", daemon=True
+                    ))
+                    continue
+                for index in range(limits[name]):
+                    lanes.append(threading.Thread(
+                        target=self._run_lane, args=(converter, feeds[name], warmup, trials),
+                        name=f"scheduler-{name}-{index}", daemon=True
+                    ))
+
+            for lane in lanes:
+                lane.start()
+            for lane in lanes:
+                lane.join()
+
+            for name, feed in feeds.items():
+                test_results[name] = feed.results()
+                if self.cache is not None:
+                    print(f"{ready[name].log_prefix or f'[{name}]'} 转换缓存: {describe_cache_usage(test_results[name])}")
+        finally:
+            for converter in converters.values():
+                try:
+                    converter.teardown()
+                except Exception as e:
+                    print(f"⚠️ {converter.name} 释放资源失败: {e}")
+
+        self.wall_time = time.perf_counter() - start
+        print(f"⏱️ 并行转换总耗时 {self.wall_time:.2f}s")
+        return test_results
+
+    def _setup_all(self, converters: Dict[str, Converter]) -> Dict[str, Converter]:
+        """并行启动所有后端，返回启动成功的后端"""
+        if not converters:
+            return {}
+
+        ready = {}
+        with ThreadPoolExecutor(max_workers=len(converters)) as executor:
+            futures = {name: executor.submit(converter.ensure_ready) for name, converter in converters.items()}
+            for name, future in futures.items():
+                converter = converters[name]
+                try:
+                    future.result()
+                    print(f"{converter.log_prefix or f'[{name}]'} 后端就绪, 启动耗时 {converter.launch_time:.2f}s")
+                    ready[name] = converter
+                except Exception as e:
+                    print(f"❌ {name} 启动失败: {e}")
+        return ready
+
+    def _run_lane(self, converter: Converter, feed: JobFeed, warmup: int, trials: int) -> None:
+        """单个后端的工作线程，每转换一个文档占用一份全局预算"""
+        while True:
+            jobs = feed.take()
+            if not jobs:
+                return
+            sample_name = jobs[0][2]
+
+            def convert(pending: List[ConversionJob]) -> List[ConversionResult]:
+                with self._budget:
+                    start = time.perf_counter()
+                    try:
+                        return run_trials(converter, pending, warmup, trials)
+                    except Exception as e:
+                        return [converter.failure_result(sample_name, time.perf_counter() - start, str(e))]
+
+            result = run_cached(converter, jobs, self.cache, convert, warmup=warmup, trials=trials, monitor=False)[0]
+            feed.record(report_result(converter, result))
+
+    def _run_batch(self, converter: Converter, feed: JobFeed, limit: int, warmup: int, trials: int) -> None:
+        """整批转换的后端按块转换，每块按其并发数占用全局预算"""
+        permits = min(limit, self._budget_size)
+        while True:
+            jobs = feed.take(CHUNK_SIZE)
+            if not jobs:
+                return
+
+            def convert(pending: List[ConversionJob]) -> List[ConversionResult]:
+                self._acquire(permits)
+                try:
+                    return run_trials(converter, pending, warmup, trials)
+                except Exception as e:
+                    return [converter.failure_result(sample_name, 0, str(e)) for _, _, sample_name in pending]
+                finally:
+                    for _ in range(permits):
+                        self._budget.release()
+
+            converted = run_cached(converter, jobs, self.cache, convert, warmup=warmup, trials=trials, monitor=False)
+            for result in converted:
+                feed.record(report_result(converter, result))
+
+    def _acquire(self, permits: int) -> None:
+        # 同一时间只允许一个调用方占用多份预算，避免两个整批后端各占一半互相等待
+        with self._multi_acquire_lock:
+            for _ in range(permits):
+                self._budget.acquire()
@@ -0,0 +1,169 @@
+"""
+LibreOffice转换器
+支持逐文件命令行(cli)、UNO常驻监听(uno)、隔离工作槽位并行(parallel)和批量调用(batch)四种模式
+"""
+
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import List, Optional, Union
+
+from converters.base import ConversionJob, ConversionResult, Converter, ConverterCapabilities
+from converters.registry import register_converter
+from utils.phase_timer import PhaseTimer, optional_phase
+
+
+@register_converter
+class SofficeConverter(Converter):
+    """
+    LibreOffice转换器
+
+    Options:
+        mode: "cli"、"uno"、"parallel" 或 "batch"
+        servers: UNO 模式下的监听进程数量
+        workers: 并行/批量模式下的工作槽位数，默认为CPU核数(批量模式默认为1)
+        batch_size: 批量模式下每次调用的文件数，默认全部文件放在一批
+        soffice_binary: soffice 可执行文件
+    """
+
+    name = "LibreOffice"
+    output_suffix = "soffice"
+    log_prefix = "[soffice]"
+    priority = 30
+    runtime_options = ("mode", "servers", "workers", "batch_size")
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.mode = options.get("mode", "cli")
+        self.soffice_binary = options.get("soffice_binary", "soffice")
+        self.server_pool = None
+        self.worker_pool = None
+
+        if self.mode == "uno":
+            concurrency = options.get("servers", 1)
+        elif self.mode == "parallel":
+            concurrency = options.get("workers") or os.cpu_count() or 1
+        elif self.mode == "batch":
+            concurrency = options.get("workers") or 1
+        else:
+            # 逐文件模式共用默认用户配置，LibreOffice 不允许多个实例同时使用
+            concurrency = 1
+        self.capabilities = ConverterCapabilities(
+            javascript=False, max_concurrency=concurrency, batch=self.mode == "batch"
+        )
+
+    def version(self) -> str:
+        try:
+            result = subprocess.run([self.soffice_binary, "--version"], capture_output=True, text=True, timeout=30)
+            return result.stdout.strip() or "unknown"
+        except Exception:
+            return "unknown"
+
+    def setup(self) -> None:
+        start = time.perf_counter()
+        if self.mode == "uno":
+            from utils.soffice_server import get_shared_server_pool
+            self.server_pool = get_shared_server_pool(self.options.get("servers", 1))
+        elif self.mode in ("parallel", "batch"):
+            from utils.soffice_workers import SofficeWorkerPool
+            self.worker_pool = SofficeWorkerPool(
+                workers=self.capabilities.max_concurrency, soffice_binary=self.soffice_binary
+            )
+        self.launch_time = time.perf_counter() - start
+
+    def teardown(self) -> None:
+        if self.worker_pool is not None:
+            self.worker_pool.close()
+            self.worker_pool = None
+        # UNO 监听池是进程内共享的，跨运行保留
+        self.server_pool = None
+        super().teardown()
+
+    def convert(self, source: Union[str, bytes], output_path: str,
+                sample_name: Optional[str] = None) -> ConversionResult:
+        self.ensure_ready()
+        sample_name = self.sample_name_for(source, sample_name)
+        if self.mode == "batch":
+            return self._convert_batch([(source, output_path, sample_name)])[0]
+
+        timer = PhaseTimer()
+        start = time.perf_counter()
+        try:
+            with self.materialize(source, sample_name) as input_path:
+                if self.mode == "uno":
+                    self.server_pool.convert(input_path, output_path, timer=timer)
+                elif self.mode == "parallel":
+                    timer.record("soffice", self.worker_pool.convert(input_path, output_path))
+                else:
+                    self._convert_cli(input_path, output_path, timer)
+            return self.success_result(sample_name, time.perf_counter() - start, output_path, phases=timer.to_dict())
+        except Exception as e:
+            return self.failure_result(sample_name, time.perf_counter() - start, str(e), phases=timer.to_dict())
+
+    def convert_many(self, jobs: List[ConversionJob]) -> List[ConversionResult]:
+        self.ensure_ready()
+        if self.mode == "batch":
+            return self._convert_batch(jobs)
+
+        with ThreadPoolExecutor(max_workers=self.capabilities.max_concurrency) as executor:
+            return list(executor.map(lambda job: self.convert(*job), jobs))
+
+    def _convert_cli(self, input_path: str, output_path: str, timer: Optional[PhaseTimer] = None) -> None:
+        """每个文件启动一次 soffice，先转换到输出目录，再重命名添加 _soffice 后缀；timer 记录 soffice、move 两个阶段"""
+        output_dir = os.path.dirname(output_path)
+        temp_output = os.path.join(output_dir, os.path.splitext(os.path.basename(input_path))[0] + ".pdf")
+        cmd = [self.soffice_binary, "--headless", "--convert-to", "pdf", "--outdir", output_dir, input_path]
+
+        with optional_phase(timer, "soffice"):
+            result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr or "转换命令执行失败")
+        if not os.path.exists(temp_output):
+            raise RuntimeError("输出文件未生成")
+        with optional_phase(timer, "move"):
+            os.replace(temp_output, output_path)
+
+    def _convert_batch(self, jobs: List[ConversionJob]) -> List[ConversionResult]:
+        """
+        批量转换，每批只启动一次 soffice
+
+        单文档耗时由批次总耗时平均分摊得到，并标记 time_derived，便于与逐个转换的结果对比。
+        """
+        if not jobs:
+            return []
+
+        batch_size = self.options.get("batch_size") or len(jobs)
+
+        with ExitStack() as stack:
+            entries = [(stack.enter_context(self.materialize(source, sample_name)), output_path, sample_name)
+                       for source, output_path, sample_name in jobs]
+            batches = [entries[i:i + batch_size] for i in range(0, len(entries), batch_size)]
+
+            def _run_batch(batch):
+                # 一个批次异常时只把该批次的文件记为失败，不影响其他批次的结果
+                try:
+                    errors, elapsed = self.worker_pool.convert_batch(
+                        [(input_path, output_path) for input_path, output_path, _ in batch]
+                    )
+                except Exception as e:
+                    errors, elapsed = {input_path: str(e) or "批量转换失败" for input_path, _, _ in batch}, 0.0
+                return batch, errors, elapsed
+
+            with ThreadPoolExecutor(max_workers=self.worker_pool.workers) as executor:
+                outcomes = list(executor.map(_run_batch, batches))
+
+        results = {}
+        for batch, errors, elapsed in outcomes:
+            per_document_time = elapsed / len(batch)
+            extra = {"time_derived": True, "batch_time": elapsed, "batch_size": len(batch),
+                     "phases": {"soffice": per_document_time}}
+            for input_path, output_path, sample_name in batch:
+                error_msg = errors.get(input_path, "输出文件未生成")
+                if error_msg:
+                    results[sample_name] = self.failure_result(sample_name, per_document_time, error_msg, **extra)
+                else:
+                    results[sample_name] = self.success_result(sample_name, per_document_time, output_path, **extra)
+
+        return [results[sample_name] for _, _, sample_name in jobs]
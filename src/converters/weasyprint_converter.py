@@ -0,0 +1,128 @@
+"""
+WeasyPrint转换器
+支持当前进程串行转换(serial)和多进程并行转换(process)
+"""
+
+import os
+import time
+from typing import List, Optional, Union
+
+from converters.base import ConversionJob, ConversionResult, Converter, ConverterCapabilities
+from converters.registry import register_converter
+from utils.phase_timer import PhaseTimer
+
+
+@register_converter
+class WeasyPrintConverter(Converter):
+    """
+    WeasyPrint转换器
+
+    Options:
+        mode: "serial" 或 "process"
+        workers: 多进程模式下的工作进程数，默认为CPU核数
+        timeout: 多进程模式下单个文档的超时时间(秒)
+        stylesheets: 所有文档共用的样式表路径
+        shared_stylesheets: 文档中 <link> 引用的样式表只解析一次、跨文档复用(改为用户样式表参与层叠)
+        offline: 离线模式，禁止获取网络资源
+        resource_cache_dir: 资源的磁盘缓存目录
+    """
+
+    name = "WeasyPrint"
+    output_suffix = "weasyprint"
+    log_prefix = "[WeasyPrint]"
+    priority = 10
+    capabilities = ConverterCapabilities(javascript=False, max_concurrency=1)
+    runtime_options = ("mode", "workers", "timeout", "session", "resource_cache_dir")
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.mode = options.get("mode", "serial")
+        self.session = None
+        self.pool = None
+
+        if self.mode == "process":
+            self.capabilities = ConverterCapabilities(
+                javascript=False, max_concurrency=options.get("workers") or os.cpu_count() or 1
+            )
+
+    def version(self) -> str:
+        import weasyprint
+        return weasyprint.__version__
+
+    def _session_options(self):
+        return {
+            "stylesheets": self.options.get("stylesheets"),
+            "shared_stylesheets": self.options.get("shared_stylesheets", False),
+            "offline": self.options.get("offline", False),
+            "resource_cache_dir": self.options.get("resource_cache_dir")
+        }
+
+    def setup(self) -> None:
+        start = time.perf_counter()
+        if self.mode == "process":
+            from utils.weasyprint_pool import WeasyPrintProcessPool
+            self.pool = WeasyPrintProcessPool(
+                workers=self.options.get("workers"),
+                timeout=self.options.get("timeout", 120.0),
+                session_options=self._session_options()
+            )
+            self.pool.start()
+        else:
+            from utils.weasyprint_session import WeasyPrintSession
+            self.session = self.options.get("session") or WeasyPrintSession(**self._session_options())
+        self.launch_time = time.perf_counter() - start
+
+    def teardown(self) -> None:
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+        if self.session is not None:
+            stats = self.session.stats
+            print(f"[WeasyPrint] 会话缓存: 样式表命中 {stats['css_hits']}/{stats['css_hits'] + stats['css_misses']}, "
+                  f"复用 <link> 样式表 {stats['links_shared']} 次")
+            fetcher = self.session.url_fetcher
+            if hasattr(fetcher, "hit_rate"):
+                print(f"[WeasyPrint] 资源缓存: 命中率 {fetcher.hit_rate * 100:.1f}%, "
+                      f"节省 {fetcher.stats['bytes_saved'] / 1024:.1f}KB, 拦截网络请求 {fetcher.stats['blocked']} 次")
+            self.session = None
+        super().teardown()
+
+    def convert(self, source: Union[str, bytes], output_path: str,
+                sample_name: Optional[str] = None) -> ConversionResult:
+        return self.convert_many([(source, output_path, self.sample_name_for(source, sample_name))])[0]
+
+    def convert_many(self, jobs: List[ConversionJob]) -> List[ConversionResult]:
+        self.ensure_ready()
+        if self.mode == "process":
+            return self._convert_process(jobs)
+        return [self._convert_serial(*job) for job in jobs]
+
+    def _convert_serial(self, source: Union[str, bytes], output_path: str, sample_name: str) -> ConversionResult:
+        timer = PhaseTimer()
+        start = time.perf_counter()
+        try:
+            with self.materialize(source, sample_name) as html_path:
+                # 通过会话转换，复用字体配置、已解析的样式表和已获取的资源
+                self.session.convert(html_path, output_path, timer=timer)
+            return self.success_result(sample_name, time.perf_counter() - start, output_path, phases=timer.to_dict())
+        except Exception as e:
+            return self.failure_result(sample_name, time.perf_counter() - start, str(e), phases=timer.to_dict())
+
+    def _convert_process(self, jobs: List[ConversionJob]) -> List[ConversionResult]:
+        # 工作进程按路径读取输入，字节内容需要先落盘
+        from contextlib import ExitStack
+
+        with ExitStack() as stack:
+            paths = [stack.enter_context(self.materialize(source, sample_name))
+                     for source, _, sample_name in jobs]
+            converted = self.pool.map([(path, output_path) for path, (_, output_path, _) in zip(paths, jobs)])
+
+        results = []
+        for (_, output_path, sample_name), result in zip(jobs, converted):
+            if result["success"]:
+                results.append(self.success_result(sample_name, result["time"], output_path,
+                                                   phases=result.get("phases", {})))
+            else:
+                results.append(self.failure_result(sample_name, result["time"], result["error"],
+                                                   phases=result.get("phases", {})))
+        return results
@@ -4,34 +4,65 @@ HTML转PDF评估器
 """
 
 import os
-from typing import Dict, List, Any
+from dataclasses import asdict
+from typing import Dict, List, Any, Optional
 from models.evaluation_models import (
-    SampleResult, EvaluationMetrics, EVALUATION_DIMENSIONS, 
-    SAMPLES_INFO, SAMPLE_WEIGHTS,
+    SampleResult, EvaluationMetrics, EVALUATION_DIMENSIONS, get_sample_weight,
     calculate_dynamic_quality_score, calculate_dimension_scores
 )
 from models.objective_evaluation import ObjectiveEvaluator, ObjectiveMetrics
+from evaluators.incremental import (
+    IncrementalPlan, compute_fingerprints, load_previous_results, make_provenance,
+    new_run_id, pdf_digest, plan_incremental, sample_result_from_entry
+)
+from utils.corpus import as_corpus
 from utils.test_runner import TestRunner
 from utils.file_operations import FileOperations
-from utils.pdf_analyzer import PDFAnalyzer
+from utils.analysis_cache import AnalysisCache
+from utils.pdf_analyzer import PDFAnalyzer, PDFAnalysisResult
+from utils.scaling_fit import MIN_R_SQUARED, PREDICTION_PAGES, analyze_scaling, scaling_to_dict
 from generators.html_report_generator import HTMLReportGenerator
 
 
 class HTMLToPDFEvaluator:
     """HTML转PDF评估器"""
     
-    def __init__(self, output_dir: str = "output"):
+    def __init__(self, output_dir: str = "output", samples=None, warmup: int = 0, trials: int = 1,
+                 monitor_resources: bool = False, cache_dir: str = None, incremental: bool = False,
+                 analysis_workers: Optional[int] = None, analysis_cache: str = None):
+        """
+        Args:
+            output_dir: 报告输出目录
+            samples: 样例来源，可以是 Corpus、目录/清单/通配符字符串或样例名列表，默认为内置样例
+            warmup: 基准测试模式下每个文档的预热次数
+            trials: 基准测试模式下每个文档的测量次数，大于1时按中位数评分并报告耗时分布
+            monitor_resources: 是否监控内存和CPU占用并计入性能评分，开启后各后端按顺序运行
+            cache_dir: 转换缓存目录，只修改了部分样例时其余样例直接复用缓存的PDF和结果
+            incremental: 增量评估，读取上次的 evaluation_results.json，只重新转换和分析
+                输入、引用资源、后端版本或参数发生变化的样例，其余条目沿用上次结果
+            analysis_workers: 并行分析PDF的进程数，默认为CPU核数，为1时在当前进程中逐个分析
+            analysis_cache: PDF分析结果缓存的SQLite文件路径，内容未变化的PDF不再重新解析
+        """
         self.output_dir = output_dir
-        self.samples_info = SAMPLES_INFO
-        self.sample_weights = SAMPLE_WEIGHTS
+        self.results_path = os.path.join(output_dir, "evaluation_results.json")
+        self.incremental = incremental
+        # 影响转换结果的运行参数，与转换缓存的键使用相同的名称
+        self.run_options = {"warmup": warmup, "trials": trials, "monitor": monitor_resources}
+        self.run_info: Dict[str, Any] = {}
+        # 规模曲线拟合结果，语料包含不同规模的样例时才有内容
+        self.scaling: Dict[str, Any] = {}
+        self.prediction_pages = PREDICTION_PAGES
+        self.corpus = as_corpus(samples)
         self.evaluation_dimensions = EVALUATION_DIMENSIONS
         
         # 初始化组件
-        self.test_runner = TestRunner()
+        self.test_runner = TestRunner(samples=self.corpus, warmup=warmup, trials=trials,
+                                      monitor_resources=monitor_resources, cache_dir=cache_dir)
         self.file_ops = FileOperations()
         self.html_generator = HTMLReportGenerator()
-        self.pdf_analyzer = PDFAnalyzer()
-        self.objective_evaluator = ObjectiveEvaluator()
+        self.pdf_analyzer = PDFAnalyzer(cache=AnalysisCache(analysis_cache) if analysis_cache else None)
+        self.analysis_workers = analysis_workers
+        self.objective_evaluator = ObjectiveEvaluator(self.corpus)
         
         # 确保输出目录存在
         self.file_ops.ensure_directory_exists(output_dir)
@@ -50,7 +81,12 @@ class HTMLToPDFEvaluator:
                     conversion_time=result.get('time', 0.0),
                     file_size=result.get('file_size', 0),
                     error_message=result.get('error', ''),
-                    quality_score=result.get('quality_score', 0.0)
+                    quality_score=result.get('quality_score', 0.0),
+                    trial_times=result.get('trial_times', []),
+                    timing_stats=result.get('timing', {}),
+                    phase_times=result.get('phases', {}),
+                    resource_usage=result.get('resources', {}),
+                    cache_status=result.get('cache', '')
                 )
                 sample_results.append(sample_result)
             converted_results[tool_name] = sample_results
@@ -103,7 +139,7 @@ class HTMLToPDFEvaluator:
         
         for result in results:
             # 获取样例权重
-            weight = SAMPLE_WEIGHTS.get(result.sample_name, 1.0)
+            weight = get_sample_weight(result.sample_name, self.corpus)
             
             quality_score = self.calculate_quality_score(
                 result.sample_name,
@@ -117,19 +153,28 @@ class HTMLToPDFEvaluator:
         
         return total_weighted_score / total_weight if total_weight > 0 else 0.0
     
-    def run_objective_evaluation(self, tool_name: str, pdf_files: List[str]) -> ObjectiveMetrics:
-        """运行客观评估"""
-        # 分析PDF文件
+    @staticmethod
+    def pdf_key(result: SampleResult) -> str:
+        """
+        客观评估中PDF的索引名: 样例名所在目录加输出文件名，如 a/b_weasyprint.pdf
+
+        样例名是相对语料根目录的路径，只用文件名时不同子目录中的同名样例会互相覆盖。
+        """
+        return os.path.join(os.path.dirname(result.sample_name), os.path.basename(result.file_path))
+
+    def analyze_pdfs(self, pdf_files: List[str]) -> Dict[str, PDFAnalysisResult]:
+        """分析PDF文件，按文件路径返回分析结果"""
+        analyses = self.pdf_analyzer.analyze_many(pdf_files, workers=self.analysis_workers)
         pdf_results = {}
-        for pdf_file in pdf_files:
-            try:
-                filename = os.path.basename(pdf_file)
-                analysis = self.pdf_analyzer.analyze_pdf(pdf_file)
-                pdf_results[filename] = analysis
-            except Exception as e:
-                print(f"⚠️ 分析PDF文件失败 {pdf_file}: {e}")
-                continue
-        
+        for pdf_file, analysis in zip(pdf_files, analyses):
+            if analysis.error_message:
+                print(f"⚠️ 分析PDF文件失败 {pdf_file}: {analysis.error_message}")
+            pdf_results[pdf_file] = analysis
+        return pdf_results
+
+    def objective_metrics_from_analyses(self, tool_name: str,
+                                        pdf_results: Dict[str, PDFAnalysisResult]) -> ObjectiveMetrics:
+        """由PDF分析结果计算工具的客观评估指标"""
         if not pdf_results:
             # 返回空的客观评估结果
             return ObjectiveMetrics(
@@ -189,17 +234,40 @@ class HTMLToPDFEvaluator:
         )
     
     def run_evaluation(self) -> tuple[Dict[str, List[SampleResult]], Dict[str, EvaluationMetrics], Dict[str, ObjectiveMetrics]]:
-        """运行完整评估"""
+        """运行完整评估；增量模式下只重新评估发生变化的样例"""
         print("🚀 开始HTML转PDF工具评估...")
-        
-        # 运行实际测试
-        raw_results = self.test_runner.run_actual_tests()
+        run_id = new_run_id()
+        tools = self.test_runner.resolve_tools()
+        
+        # 增量评估或启用转换缓存时计算内容指纹，作为每个条目的来源信息和下次增量评估的依据；
+        # 其他情况只记录后端版本，不为指纹读取全部输入文件
+        track = self.incremental or self.test_runner.cache is not None
+        fingerprints, versions = compute_fingerprints(
+            tools, self.corpus, self.test_runner.converter_options, self.run_options, with_fingerprints=track
+        )
+        previous = load_previous_results(self.results_path) if self.incremental else {}
+        plan = plan_incremental(previous, fingerprints)
+        
+        if self.incremental:
+            # 无法计算指纹的工具完整评估
+            all_names = list(self.corpus.names())
+            for tool_name in tools:
+                plan.pending.setdefault(tool_name, all_names)
+            print(f"♻️ 增量评估: {plan.describe()}")
+            
+            # 运行实际测试，待评估样例相同的工具一起运行
+            raw_results = {}
+            for names, group_tools in plan.groups().items():
+                raw_results.update(self.test_runner.run_actual_tests(group_tools, self.corpus.subset(names)))
+        else:
+            # 运行实际测试
+            raw_results = self.test_runner.run_actual_tests(tools)
         
         # 转换结果格式
-        results = self.convert_raw_results_to_sample_results(raw_results)
+        new_results = self.convert_raw_results_to_sample_results(raw_results)
         
-        # 重新计算质量评分
-        for tool_name, tool_results in results.items():
+        # 重新计算质量评分，记录来源信息
+        for tool_name, tool_results in new_results.items():
             for result in tool_results:
                 if result.conversion_success:
                     result.quality_score = self.calculate_quality_score(
@@ -208,43 +276,82 @@ class HTMLToPDFEvaluator:
                         result.conversion_time,
                         result.file_size
                     )
+                result.provenance = make_provenance(
+                    fingerprints.get(tool_name, {}).get(result.sample_name, ""),
+                    versions.get(tool_name, "unknown"),
+                    run_id,
+                    plan.status(tool_name, result.sample_name) if self.incremental else "full",
+                    pdf_digest(result.file_path) if track and result.conversion_success else ""
+                )
+        
+        # 只分析本次生成的PDF，沿用的条目使用上次保存的分析结果
+        print("📊 开始客观评估...")
+        for tool_name, tool_results in new_results.items():
+            pdf_files = [result.file_path for result in tool_results if result.conversion_success and result.file_path]
+            if pdf_files:
+                print(f"🔍 分析 {tool_name} 工具 ({len(pdf_files)} 个PDF文件)...")
+            analyses = self.analyze_pdfs(pdf_files)
+            for result in tool_results:
+                analysis = analyses.get(result.file_path) if result.file_path else None
+                if result.conversion_success and analysis is not None:
+                    result.pdf_analysis = asdict(analysis)
+        if self.pdf_analyzer.cache is not None:
+            print(f"🗃️ PDF分析缓存: {self.pdf_analyzer.cache.describe()}")
+        
+        results = self.merge_results(tools, new_results, plan)
+        self.run_info = {
+            "run_id": run_id,
+            "mode": "incremental" if self.incremental else "full",
+            "rerun": sum(len(tool_results) for tool_results in new_results.values()),
+            "reused": sum(len(entries) for entries in plan.reused.values()) if self.incremental else 0,
+            "backend_versions": versions
+        }
         
         # 计算传统评估指标
         metrics = {}
         for tool_name, tool_results in results.items():
             metrics[tool_name] = self.calculate_metrics(tool_name, tool_results)
         
+        # 拟合耗时和内存随文档规模的变化
+        self.scaling = analyze_scaling(results, self.corpus)
+        
         # 运行客观评估
-        print("📊 开始客观评估...")
         objective_metrics = {}
         for tool_name, tool_results in results.items():
-            # 收集该工具的PDF文件路径
-            pdf_files = [result.file_path for result in tool_results if result.conversion_success and result.file_path]
-            if pdf_files:
-                print(f"🔍 评估 {tool_name} 工具 ({len(pdf_files)} 个PDF文件)...")
-                objective_metrics[tool_name] = self.run_objective_evaluation(tool_name, pdf_files)
+            pdf_results = {
+                self.pdf_key(result): PDFAnalysisResult(**result.pdf_analysis)
+                for result in tool_results if result.conversion_success and result.pdf_analysis
+            }
+            if pdf_results:
+                print(f"🔍 评估 {tool_name} 工具 ({len(pdf_results)} 个PDF文件)...")
             else:
                 print(f"⚠️ {tool_name} 工具没有成功的PDF文件可供评估")
-                objective_metrics[tool_name] = ObjectiveMetrics(
-                    tool_name=tool_name,
-                    avg_file_size=0.0,
-                    file_size_consistency=0.0,
-                    compression_efficiency=0.0,
-                    text_preservation_rate=0.0,
-                    content_density_score=0.0,
-                    chinese_support_score=0.0,
-                    special_char_support=0.0,
-                    image_support_rate=0.0,
-                    font_preservation_rate=0.0,
-                    form_support_rate=0.0,
-                    page_structure_score=0.0,
-                    success_rate=0.0,
-                    error_rate=0.0,
-                    overall_score=0.0
-                )
+            objective_metrics[tool_name] = self.objective_metrics_from_analyses(tool_name, pdf_results)
         
         return results, metrics, objective_metrics
     
+    def merge_results(self, tools: List[str], new_results: Dict[str, List[SampleResult]],
+                      plan: IncrementalPlan) -> Dict[str, List[SampleResult]]:
+        """按语料顺序合并本次评估的结果和沿用的上次结果，已从语料中移除的样例不再保留"""
+        if not self.incremental:
+            return new_results
+        
+        names = list(self.corpus.names())
+        merged = {}
+        for tool_name in tools:
+            fresh = {result.sample_name: result for result in new_results.get(tool_name, [])}
+            reused = plan.reused.get(tool_name, {})
+            tool_results = []
+            for name in names:
+                if name in fresh:
+                    tool_results.append(fresh[name])
+                elif name in reused:
+                    result = sample_result_from_entry(reused[name])
+                    result.provenance = dict(result.provenance, status="reused")
+                    tool_results.append(result)
+            merged[tool_name] = tool_results
+        return merged
+    
     def generate_performance_analysis(self, metrics: Dict[str, EvaluationMetrics]) -> str:
         """生成性能分析报告"""
         analysis = []
@@ -275,6 +382,14 @@ class HTMLToPDFEvaluator:
             analysis.append(f"  • 平均转换时间: {avg_time:.2f}s")
             analysis.append(f"  • 平均文件大小: {avg_size/1024:.1f}KB")
             analysis.append(f"  • 平均质量评分: {avg_quality:.1f}")
+            
+            # 开启资源监控时报告被测后端的内存峰值和CPU时间(不含评估进程基线)
+            usages = [r.resource_usage for r in metric.sample_results if r.conversion_success and r.resource_usage]
+            if usages:
+                peak_memory = max(u.get('pss_peak_mb') or u.get('rss_peak_mb', 0) for u in usages)
+                avg_cpu = sum(u.get('cpu_user', 0) + u.get('cpu_system', 0) for u in usages) / len(usages)
+                analysis.append(f"  • 内存峰值(后端进程): {peak_memory:.1f}MB")
+                analysis.append(f"  • 平均CPU时间: {avg_cpu:.2f}s")
         
         # 性能对比
         if len(sorted_tools) >= 2:
@@ -363,11 +478,47 @@ class HTMLToPDFEvaluator:
         print("\n" + "="*60)
         print()
     
+    def print_scaling_report(self) -> None:
+        """打印规模曲线拟合结果"""
+        if not self.scaling:
+            return
+        
+        print("\n" + "="*60)
+        print("📈 规模曲线拟合 (y = a·x^b，b 为双对数斜率)")
+        print("="*60)
+        
+        metric_units = {"time": "s", "memory": "MB"}
+        for tool_name, series_fits in self.scaling.items():
+            print(f"\n🔧 {tool_name}")
+            print("-" * 40)
+            for series, measures in series_fits.items():
+                print(f"  {'规模曲线 ' + series if series else '混合样例'}:")
+                for measure, fits in measures.items():
+                    for metric, fit in fits.items():
+                        if not fit.reliable:
+                            print(f"    {metric} ~ {measure}: 数据不足 (R²={fit.r_squared:.2f} < {MIN_R_SQUARED}, "
+                                  f"n={fit.points}, {fit.x_min:g}-{fit.x_max:g})")
+                            continue
+                        unit = metric_units.get(metric, "")
+                        flag = " ⚠️ 超线性" if fit.superlinear else ""
+                        tail = f", 大规模端 b={fit.tail_exponent:.2f}" if fit.tail_exponent is not None else ""
+                        print(f"    {metric} ~ {measure}: b={fit.exponent:.2f}{tail}, R²={fit.r_squared:.2f}, "
+                              f"边际成本 {fit.linear_slope:.4g}{unit}/{measure}, 固定开销 {fit.linear_intercept:.3g}{unit}"
+                              f" (n={fit.points}, {fit.x_min:g}-{fit.x_max:g}){flag}")
+                        if measure == "pages":
+                            for pages in self.prediction_pages:
+                                print(f"        预测 {pages} 页: 幂律 {fit.predict(pages):.2f}{unit}, "
+                                      f"线性 {fit.predict_linear(pages):.2f}{unit}")
+        
+        print("\n" + "="*60)
+        print()
+    
     def generate_html_report(self, results: Dict[str, List[SampleResult]], 
                            metrics: Dict[str, EvaluationMetrics],
                            objective_metrics: Dict[str, ObjectiveMetrics] = None) -> str:
         """生成HTML报告"""
-        return self.html_generator.generate_full_report(results, metrics, objective_metrics)
+        return self.html_generator.generate_full_report(results, metrics, objective_metrics,
+                                                        self.scaling, self.prediction_pages)
     
     def save_results(self, results: Dict[str, List[SampleResult]], 
                     metrics: Dict[str, EvaluationMetrics], 
@@ -385,7 +536,14 @@ class HTMLToPDFEvaluator:
                         "file_size": r.file_size,
                         "quality_score": r.quality_score,
                         "error_message": r.error_message,
-                        "notes": r.notes
+                        "notes": r.notes,
+                        "trial_times": r.trial_times,
+                        "timing_stats": r.timing_stats,
+                        "phase_times": r.phase_times,
+                        "resource_usage": r.resource_usage,
+                        "cache_status": r.cache_status,
+                        "pdf_analysis": r.pdf_analysis,
+                        "provenance": r.provenance
                     }
                     for r in tool_results
                 ]
@@ -430,7 +588,13 @@ class HTMLToPDFEvaluator:
                 for tool_name, om in objective_metrics.items()
             }
         
-        json_path = f"{self.output_dir}/evaluation_results.json"
+        if self.scaling:
+            json_data["scaling"] = scaling_to_dict(self.scaling, self.prediction_pages)
+        
+        if self.run_info:
+            json_data["run"] = self.run_info
+        
+        json_path = self.results_path
         self.file_ops.save_json(json_data, json_path)
         print(f"📄 评估结果已保存到: {json_path}")
         
@@ -440,10 +604,18 @@ class HTMLToPDFEvaluator:
         self.file_ops.save_text(html_content, html_path)
         print(f"🌐 HTML报告已生成: {html_path}")
     
+    def close(self) -> None:
+        """关闭PDF分析缓存的数据库连接"""
+        if self.pdf_analyzer.cache is not None:
+            self.pdf_analyzer.cache.close()
+    
     def run_complete_evaluation(self) -> None:
-        """运行完整的评估流程"""
+        """运行完整的评估流程，结束后关闭PDF分析缓存"""
         # 运行评估
-        results, metrics, objective_metrics = self.run_evaluation()
+        try:
+            results, metrics, objective_metrics = self.run_evaluation()
+        finally:
+            self.close()
         
         # 打印传统评估报告
         self.print_evaluation_report(results, metrics)
@@ -451,5 +623,8 @@ class HTMLToPDFEvaluator:
         # 打印客观评估报告
         self.print_objective_evaluation_report(objective_metrics)
         
+        # 打印规模曲线拟合结果
+        self.print_scaling_report()
+        
         # 保存结果
         self.save_results(results, metrics, objective_metrics)
\ No newline at end of file
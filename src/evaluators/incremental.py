@@ -0,0 +1,213 @@
+"""
+增量评估
+对比上次评估结果中记录的内容指纹，只重新转换和分析输入、资源、后端版本或参数发生变化的样例
+"""
+
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from models.evaluation_models import SampleResult
+from utils.analysis_cache import file_sha256
+from utils.corpus import Corpus
+
+
+# 结果文件中单个样例条目的格式版本，字段变化不兼容时递增，使旧条目全部重新评估
+# 2: pdf_analysis 只保留文本样本，增加全文摘要和关键词
+# 3: 来源信息记录输出PDF的内容哈希
+RESULT_ENTRY_VERSION = 3
+
+# 输入文件不存在的样例使用的指纹
+MISSING_FINGERPRINT = "missing"
+
+
+def new_run_id() -> str:
+    """本次评估的标识，写入每个新条目的来源信息"""
+    return datetime.now().strftime("%Y%m%d-%H%M%S")
+
+
+def load_previous_results(json_path: str) -> Dict[str, Any]:
+    """读取上次的评估结果，文件不存在或无法解析时返回空字典"""
+    if not os.path.exists(json_path):
+        return {}
+    try:
+        with open(json_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ 无法读取上次的评估结果 {json_path}: {e}")
+        return {}
+
+
+def compute_fingerprints(tools: List[str], corpus: Corpus,
+                         converter_options: Optional[Dict[str, Dict[str, Any]]] = None,
+                         extra: Optional[Dict[str, Any]] = None,
+                         with_fingerprints: bool = True) -> Tuple[Dict[str, Dict[str, str]], Dict[str, str]]:
+    """
+    计算每个工具、每个样例的内容指纹
+
+    指纹与转换缓存的键相同，覆盖输入HTML、引用的本地资源、后端版本和影响输出的参数。
+    只创建转换器实例读取参数，不启动后端。语料只流式遍历一次，所有工具共用。
+
+    Args:
+        with_fingerprints: 为 False 时只查询后端版本；指纹需要读取每个输入文件和引用的资源，
+            只在增量评估或启用转换缓存时需要
+
+    Returns:
+        ({工具名: {样例名: 指纹}}, {工具名: 后端版本})；无法创建的工具不出现在结果中
+    """
+    # converters 依赖 utils 包，在这里导入以避免循环导入
+    from converters.registry import create_converter
+    from utils.conversion_cache import backend_version, conversion_key
+
+    converter_options = converter_options or {}
+    converters = {}
+    versions: Dict[str, str] = {}
+
+    for tool_name in tools:
+        try:
+            converter = create_converter(tool_name, **converter_options.get(tool_name, {}))
+        except Exception as e:
+            print(f"⚠️ {tool_name} 无法计算样例指纹，将完整重新评估: {e}")
+            continue
+        versions[tool_name] = backend_version(converter)
+        converters[tool_name] = converter
+
+    if not with_fingerprints:
+        return {}, versions
+
+    fingerprints: Dict[str, Dict[str, str]] = {tool_name: {} for tool_name in converters}
+
+    for spec in corpus:
+        for tool_name, converter in converters.items():
+            try:
+                fingerprints[tool_name][spec.name] = conversion_key(converter, spec.path, extra)
+            except OSError:
+                fingerprints[tool_name][spec.name] = MISSING_FINGERPRINT
+
+    return fingerprints, versions
+
+
+def pdf_digest(path: str) -> str:
+    """输出PDF的内容哈希，文件不存在或无法读取时为空字符串"""
+    try:
+        return file_sha256(path) if path else ""
+    except OSError:
+        return ""
+
+
+def _reusable(entry: Dict[str, Any], fingerprint: str) -> bool:
+    """
+    上次的条目是否可以直接沿用
+
+    只沿用转换成功的条目: 失败可能是偶发的(超时、浏览器崩溃)，每次都重新尝试。
+    输出PDF必须仍然存在且内容哈希与记录一致，否则PDF已被覆盖或删除，分析结果不再对应。
+    """
+    provenance = entry.get("provenance") or {}
+    if provenance.get("fingerprint") != fingerprint or provenance.get("entry_version") != RESULT_ENTRY_VERSION:
+        return False
+    if not entry.get("conversion_success"):
+        return False
+    # 客观评估需要PDF分析结果，报告需要PDF文件
+    if not entry.get("pdf_analysis"):
+        return False
+    recorded = provenance.get("pdf_sha256")
+    return bool(recorded) and pdf_digest(entry.get("file_path", "")) == recorded
+
+
+@dataclass
+class IncrementalPlan:
+    """增量评估计划：每个工具需要重新评估的样例和可以沿用的上次结果"""
+    fingerprints: Dict[str, Dict[str, str]]  # {工具名: {样例名: 指纹}}
+    pending: Dict[str, List[str]] = field(default_factory=dict)  # {工具名: 需要重新评估的样例，按语料顺序}
+    reused: Dict[str, Dict[str, Dict[str, Any]]] = field(default_factory=dict)  # {工具名: {样例名: 上次的条目}}
+    previous_names: Dict[str, set] = field(default_factory=dict)  # {工具名: 上次结果中已有的样例名}
+
+    def groups(self) -> Dict[Tuple[str, ...], List[str]]:
+        """
+        按待评估的样例集合对工具分组，同一组的工具可以一起运行
+
+        Returns:
+            {待评估样例名元组: 工具名列表}，不包含无需重新评估的工具
+        """
+        grouped: Dict[Tuple[str, ...], List[str]] = {}
+        for tool_name, names in self.pending.items():
+            if names:
+                grouped.setdefault(tuple(names), []).append(tool_name)
+        return grouped
+
+    def status(self, tool_name: str, sample_name: str) -> str:
+        """条目来源: reused 沿用上次结果, changed 重新评估已有样例, new 首次评估"""
+        if sample_name in self.reused.get(tool_name, {}):
+            return "reused"
+        if sample_name in self.previous_names.get(tool_name, set()):
+            return "changed"
+        return "new"
+
+    def describe(self) -> str:
+        pending = sum(len(names) for names in self.pending.values())
+        reused = sum(len(entries) for entries in self.reused.values())
+        return f"重新评估 {pending} 项, 沿用上次结果 {reused} 项"
+
+
+def plan_incremental(previous: Dict[str, Any], fingerprints: Dict[str, Dict[str, str]]) -> IncrementalPlan:
+    """
+    对比上次结果和当前指纹，确定需要重新评估的样例
+
+    Args:
+        previous: 上次保存的评估结果，为空时全部重新评估
+        fingerprints: compute_fingerprints 返回的当前指纹
+    """
+    plan = IncrementalPlan(fingerprints=fingerprints)
+    previous_results = previous.get("results", {})
+
+    for tool_name, tool_fingerprints in fingerprints.items():
+        entries = {entry.get("sample_name"): entry for entry in previous_results.get(tool_name, [])}
+        plan.previous_names[tool_name] = set(entries)
+        plan.pending[tool_name] = []
+        plan.reused[tool_name] = {}
+        for sample_name, fingerprint in tool_fingerprints.items():
+            entry = entries.get(sample_name)
+            if entry is not None and _reusable(entry, fingerprint):
+                plan.reused[tool_name][sample_name] = entry
+            else:
+                plan.pending[tool_name].append(sample_name)
+
+    return plan
+
+
+def make_provenance(fingerprint: str, backend_version: str, run_id: str, status: str,
+                    pdf_sha256: str = "") -> Dict[str, Any]:
+    """新评估条目的来源信息，pdf_sha256 为输出PDF的内容哈希，沿用条目前用于校验"""
+    return {
+        "fingerprint": fingerprint,
+        "backend_version": backend_version,
+        "run_id": run_id,
+        "evaluated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "status": status,
+        "pdf_sha256": pdf_sha256,
+        "entry_version": RESULT_ENTRY_VERSION
+    }
+
+
+def sample_result_from_entry(entry: Dict[str, Any]) -> SampleResult:
+    """由结果文件中的条目恢复 SampleResult"""
+    return SampleResult(
+        sample_name=entry.get("sample_name", "unknown"),
+        file_path=entry.get("file_path", ""),
+        conversion_success=entry.get("conversion_success", False),
+        conversion_time=entry.get("conversion_time", 0.0),
+        file_size=entry.get("file_size", 0),
+        error_message=entry.get("error_message", ""),
+        quality_score=entry.get("quality_score", 0.0),
+        notes=entry.get("notes", ""),
+        trial_times=entry.get("trial_times", []),
+        timing_stats=entry.get("timing_stats", {}),
+        phase_times=entry.get("phase_times", {}),
+        resource_usage=entry.get("resource_usage", {}),
+        cache_status=entry.get("cache_status", ""),
+        pdf_analysis=entry.get("pdf_analysis", {}),
+        provenance=entry.get("provenance", {})
+    )
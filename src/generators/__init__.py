@@ -4,5 +4,6 @@
 """
 
 from .html_report_generator import HTMLReportGenerator
+from .synthetic_corpus import SyntheticCorpusGenerator, SyntheticSpec, scaling_series
 
-__all__ = ["HTMLReportGenerator"]
\ No newline at end of file
+__all__ = ["HTMLReportGenerator", "SyntheticCorpusGenerator", "SyntheticSpec", "scaling_series"]
\ No newline at end of file
@@ -3,9 +3,13 @@ HTML报告生成器
 负责生成评估报告的HTML页面
 """
 
-from typing import Dict, List, Any
+import json
+import math
+from typing import Dict, List, Any, Sequence
 from models.evaluation_models import SampleResult, EvaluationMetrics
 from models.objective_evaluation import ObjectiveMetrics
+from utils.phase_timer import summarize_phases
+from utils.scaling_fit import MIN_R_SQUARED
 
 
 class HTMLReportGenerator:
@@ -3981,6 +3985,320 @@ class HTMLReportGenerator:
         html += "</div>"
         return html
     
+    def generate_timing_statistics_html(self, results: Dict[str, List[SampleResult]]) -> str:
+        """生成基准测试耗时统计HTML，仅包含多次测量的样例"""
+        html = ""
+        
+        for tool_name, tool_results in results.items():
+            measured = [r for r in tool_results if r.timing_stats and r.timing_stats.get("trials", 0) > 1]
+            if not measured:
+                continue
+            
+            html += f"""
+            <h3>{tool_name}</h3>
+            <table class="comparison-table">
+                <thead>
+                    <tr>
+                        <th>样例</th>
+                        <th>测量次数</th>
+                        <th>最小值</th>
+                        <th>中位数</th>
+                        <th>平均值</th>
+                        <th>P90</th>
+                        <th>P95</th>
+                        <th>P99</th>
+                        <th>标准差</th>
+                        <th>中位数置信区间</th>
+                        <th>平均值置信区间</th>
+                    </tr>
+                </thead>
+                <tbody>
+            """
+            
+            for result in measured:
+                stats = result.timing_stats
+                confidence = f"{stats.get('confidence', 0.95) * 100:.0f}%"
+                html += f"""
+                <tr>
+                    <td><strong>{result.sample_name}</strong></td>
+                    <td>{stats['trials']}</td>
+                    <td>{stats['min']:.3f}s</td>
+                    <td>{stats['median']:.3f}s</td>
+                    <td>{stats['mean']:.3f}s</td>
+                    <td>{stats['p90']:.3f}s</td>
+                    <td>{stats['p95']:.3f}s</td>
+                    <td>{stats['p99']:.3f}s</td>
+                    <td>{stats['stdev']:.3f}s</td>
+                    <td>{confidence}: {stats['median_ci_low']:.3f} - {stats['median_ci_high']:.3f}s</td>
+                    <td>{confidence}: {stats['mean_ci_low']:.3f} - {stats['mean_ci_high']:.3f}s</td>
+                </tr>
+                """
+            
+            html += """
+                </tbody>
+            </table>
+            """
+        
+        if html:
+            html = """
+            <p>每个样例预热后重复测量多次，评分使用中位数耗时；置信区间由自助法(bootstrap)重抽样估计，区间越窄说明测量越稳定。</p>
+            """ + html
+        
+        return html
+    
+    def generate_phase_breakdown_html(self, results: Dict[str, List[SampleResult]]) -> str:
+        """生成各工具转换阶段耗时分解HTML，标出耗时占比最高的阶段"""
+        html = ""
+        
+        for tool_name, tool_results in results.items():
+            summary = summarize_phases(r.phase_times for r in tool_results if r.conversion_success and r.phase_times)
+            if not summary:
+                continue
+            
+            dominant = max(summary.items(), key=lambda item: item[1]["share"])
+            html += f"""
+            <h3>{tool_name}</h3>
+            <p>耗时最多的阶段: <strong>{dominant[0]}</strong> (占 {dominant[1]['share']:.1f}%)，优先优化该阶段收益最大</p>
+            <table class="comparison-table">
+                <thead>
+                    <tr>
+                        <th>阶段</th>
+                        <th>平均耗时</th>
+                        <th>耗时占比</th>
+                        <th>样例数</th>
+                    </tr>
+                </thead>
+                <tbody>
+            """
+            
+            for phase_name, stats in summary.items():
+                html += f"""
+                <tr>
+                    <td><strong>{phase_name}</strong></td>
+                    <td>{stats['mean']:.3f}s</td>
+                    <td>
+                        <div style="background:#eee;border-radius:4px;width:160px;display:inline-block;vertical-align:middle;">
+                            <div style="background:#667eea;height:10px;border-radius:4px;width:{stats['share']:.1f}%;"></div>
+                        </div>
+                        {stats['share']:.1f}%
+                    </td>
+                    <td>{stats['count']:.0f}</td>
+                </tr>
+                """
+            
+            html += """
+                </tbody>
+            </table>
+            """
+        
+        return html
+    
+    def generate_resource_usage_html(self, results: Dict[str, List[SampleResult]]) -> str:
+        """生成内存和CPU占用HTML，统计范围是被测后端的子进程和评估进程的增长，评估进程基线单独列出"""
+        rows = ""
+        
+        for tool_name, tool_results in results.items():
+            usages = [r.resource_usage for r in tool_results if r.conversion_success and r.resource_usage]
+            if not usages:
+                continue
+            
+            count = len(usages)
+            rss_peak = max(u.get('rss_peak_mb', 0) for u in usages)
+            rss_avg = sum(u.get('rss_avg_mb', 0) for u in usages) / count
+            pss_values = [u['pss_peak_mb'] for u in usages if 'pss_peak_mb' in u]
+            pss_display = f"{max(pss_values):.1f}MB" if pss_values else "N/A"
+            cpu_user = sum(u.get('cpu_user', 0) for u in usages) / count
+            cpu_system = sum(u.get('cpu_system', 0) for u in usages) / count
+            processes = max(u.get('processes_peak', 0) for u in usages)
+            baselines = [u['baseline_rss_mb'] for u in usages if 'baseline_rss_mb' in u]
+            baseline_display = f"{sum(baselines) / len(baselines):.1f}MB" if baselines else "N/A"
+            
+            rows += f"""
+                <tr>
+                    <td><strong>{tool_name}</strong></td>
+                    <td>{rss_peak:.1f}MB</td>
+                    <td>{rss_avg:.1f}MB</td>
+                    <td>{pss_display}</td>
+                    <td>{cpu_user:.2f}s</td>
+                    <td>{cpu_system:.2f}s</td>
+                    <td>{processes:.0f}</td>
+                    <td>{baseline_display}</td>
+                </tr>
+            """
+        
+        if not rows:
+            return ""
+        
+        return f"""
+            <p>每个文档转换期间采样被测后端启动的子进程(浏览器、soffice、工作进程等)的内存，加上评估进程相对转换开始时的增长；其他后端的进程不计入，评估进程本身的基线单独列出。CPU时间包含已退出的子进程，不含采样线程的开销；PSS按共享进程数分摊共享内存，更接近多进程后端的实际占用。</p>
+            <table class="comparison-table">
+                <thead>
+                    <tr>
+                        <th>工具</th>
+                        <th>RSS峰值</th>
+                        <th>RSS平均值</th>
+                        <th>PSS峰值</th>
+                        <th>用户态CPU/文档</th>
+                        <th>内核态CPU/文档</th>
+                        <th>最大进程数</th>
+                        <th>评估进程基线RSS</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {rows}
+                </tbody>
+            </table>
+        """
+    
+    def generate_scaling_analysis_html(self, scaling: Dict[str, Any], prediction_pages: Sequence[int] = (500,)) -> str:
+        """生成规模曲线拟合HTML：拟合参数表和双对数坐标下的曲线图，拟合优度不足的组合显示为数据不足"""
+        if not scaling:
+            return ""
+        
+        measure_names = {"pages": "页数", "bytes": "字节数", "dom_nodes": "DOM节点数"}
+        metric_names = {"time": "耗时", "memory": "内存增量"}
+        metric_units = {"time": "s", "memory": "MB"}
+        
+        rows = ""
+        charts: Dict[tuple, List[Dict[str, Any]]] = {}
+        colors = ['#667eea', '#f093fb', '#4facfe', '#43e97b', '#fa709a']
+        
+        for index, (tool_name, series_fits) in enumerate(scaling.items()):
+            color = colors[index % len(colors)]
+            for series, measures in series_fits.items():
+                series_name = series or "混合样例"
+                for measure, fits in measures.items():
+                    for metric, fit in fits.items():
+                        if not fit.reliable:
+                            rows += f"""
+                <tr>
+                    <td><strong>{tool_name}</strong></td>
+                    <td>{series_name}</td>
+                    <td>{metric_names.get(metric, metric)} ~ {measure_names.get(measure, measure)}</td>
+                    <td colspan="5" style="color: #a0aec0;">数据不足 (R²={fit.r_squared:.2f})，不做判断和外推</td>
+                    <td>{fit.points} ({fit.x_min:g} - {fit.x_max:g})</td>
+                    <td>—</td>
+                    <td>—</td>
+                </tr>
+                            """
+                            continue
+                        
+                        unit = metric_units.get(metric, "")
+                        flag = '<span style="color: #e53e3e; font-weight: bold;">⚠️ 超线性</span>' if fit.superlinear else "—"
+                        tail = f"{fit.tail_exponent:.2f}" if fit.tail_exponent is not None else "N/A"
+                        predictions = ""
+                        if measure == "pages":
+                            predictions = "<br>".join(
+                                f"{pages}页: {fit.predict(pages):.2f}{unit} (线性 {fit.predict_linear(pages):.2f}{unit})"
+                                for pages in prediction_pages
+                            )
+                        rows += f"""
+                <tr>
+                    <td><strong>{tool_name}</strong></td>
+                    <td>{series_name}</td>
+                    <td>{metric_names.get(metric, metric)} ~ {measure_names.get(measure, measure)}</td>
+                    <td>{fit.exponent:.2f}</td>
+                    <td>{tail}</td>
+                    <td>{fit.r_squared:.2f}</td>
+                    <td>{fit.linear_slope:.4g}{unit}</td>
+                    <td>{fit.linear_intercept:.3g}{unit}</td>
+                    <td>{fit.points} ({fit.x_min:g} - {fit.x_max:g})</td>
+                    <td>{flag}</td>
+                    <td>{predictions or "—"}</td>
+                </tr>
+                        """
+                        
+                        # 拟合曲线在双对数坐标下取等间距的点，页数曲线延伸到外推页数
+                        x_end = max([fit.x_max] + list(prediction_pages)) if measure == "pages" else fit.x_max
+                        steps = 20
+                        ratio = math.log(x_end / fit.x_min)
+                        curve = [fit.x_min * math.exp(ratio * i / steps) for i in range(steps + 1)]
+                        charts.setdefault((series, measure, metric), []).extend([
+                            {
+                                "label": f"{tool_name} 实测",
+                                "data": [{"x": x, "y": y} for x, y in fit.data],
+                                "backgroundColor": color,
+                                "borderColor": color,
+                                "showLine": False,
+                                "pointRadius": 4
+                            },
+                            {
+                                "label": f"{tool_name} 拟合 (b={fit.growth_exponent:.2f})",
+                                "data": [{"x": x, "y": fit.predict(x)} for x in curve],
+                                "borderColor": color,
+                                "borderDash": [6, 4],
+                                "showLine": True,
+                                "pointRadius": 0,
+                                "fill": False
+                            }
+                        ])
+        
+        canvases = ""
+        scripts = ""
+        for chart_index, ((series, measure, metric), datasets) in enumerate(charts.items()):
+            chart_id = f"{chart_index}_{measure}_{metric}"
+            title = (f"{series or '混合样例'}: {metric_names.get(metric, metric)} ~ "
+                     f"{measure_names.get(measure, measure)} (双对数坐标)")
+            canvases += f"""
+            <div class="chart-container" style="display: block;">
+                <h4>{title}</h4>
+                <canvas id="scalingChart_{chart_id}" width="800" height="360"></canvas>
+            </div>
+            """
+            scripts += f"""
+            new Chart(document.getElementById('scalingChart_{chart_id}').getContext('2d'), {{
+                type: 'scatter',
+                data: {{ datasets: {json.dumps(datasets, ensure_ascii=False)} }},
+                options: {{
+                    responsive: true,
+                    scales: {{
+                        x: {{ type: 'logarithmic', title: {{ display: true, text: '{measure_names.get(measure, measure)}' }} }},
+                        y: {{ type: 'logarithmic', title: {{ display: true, text: '{metric_names.get(metric, metric)} ({metric_units.get(metric, "")})' }} }}
+                    }},
+                    plugins: {{ legend: {{ position: 'bottom' }} }}
+                }}
+            }});
+            """
+        
+        insufficient = "" if charts else """
+            <p style="color: #a0aec0;">数据不足：没有拟合优度达到要求的规模曲线。请使用合成语料的规模曲线(scale:&lt;维度&gt; 标签)评估。</p>
+        """
+        
+        return f"""
+            <p>按样例规模拟合 y = a·x<sup>b</sup>，b 为双对数斜率：b≈1 为线性增长，b 明显大于1 为超线性增长。
+            合成语料按规模曲线(scale:&lt;维度&gt; 标签)分别拟合，不属于任何曲线的样例归入"混合样例"；
+            双对数拟合R²低于{MIN_R_SQUARED}的组合显示为数据不足，不做超线性判断和外推。
+            固定开销会压低小文档端的斜率，因此另外用较大的一半规模拟合"大规模端斜率"，超线性判断和外推优先使用它。
+            内存为转换期间进程树RSS的增量，仅在开启资源监控时拟合。</p>
+            {insufficient}
+            <table class="comparison-table">
+                <thead>
+                    <tr>
+                        <th>工具</th>
+                        <th>规模曲线</th>
+                        <th>指标 ~ 规模</th>
+                        <th>双对数斜率 b</th>
+                        <th>大规模端斜率</th>
+                        <th>R²</th>
+                        <th>边际成本(线性斜率)</th>
+                        <th>固定开销(线性截距)</th>
+                        <th>样本数 (规模范围)</th>
+                        <th>超线性</th>
+                        <th>外推</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {rows}
+                </tbody>
+            </table>
+            {canvases}
+            <script>
+            document.addEventListener('DOMContentLoaded', function() {{
+                {scripts}
+            }});
+            </script>
+        """
+    
     def generate_recommendations_html(self, metrics: Dict[str, EvaluationMetrics]) -> str:
         """生成推荐建议HTML"""
         # 按总分排序
@@ -4118,9 +4436,44 @@ class HTMLReportGenerator:
     
     def generate_full_report(self, results: Dict[str, List[SampleResult]], 
                            metrics: Dict[str, EvaluationMetrics],
-                           objective_metrics: Dict[str, ObjectiveMetrics] = None) -> str:
+                           objective_metrics: Dict[str, ObjectiveMetrics] = None,
+                           scaling: Dict[str, Any] = None, prediction_pages: Sequence[int] = (500,)) -> str:
         """生成简化的HTML报告，专注于客观评估指标"""
         
+        # 基准测试模式下才有耗时分布统计
+        timing_html = self.generate_timing_statistics_html(results)
+        timing_section = f"""
+                    <div class="section">
+                        <h2>⏱️ 基准测试耗时统计</h2>
+                        {timing_html}
+                    </div>
+        """ if timing_html else ""
+        
+        resource_html = self.generate_resource_usage_html(results)
+        resource_section = f"""
+                    <div class="section">
+                        <h2>💾 内存与CPU占用</h2>
+                        {resource_html}
+                    </div>
+        """ if resource_html else ""
+        
+        phase_html = self.generate_phase_breakdown_html(results)
+        phase_section = f"""
+                    <div class="section">
+                        <h2>🧩 转换阶段耗时分解</h2>
+                        {phase_html}
+                    </div>
+        """ if phase_html else ""
+        
+        # 语料包含不同规模的样例时才有规模曲线
+        scaling_html = self.generate_scaling_analysis_html(scaling, prediction_pages)
+        scaling_section = f"""
+                    <div class="section">
+                        <h2>📈 规模曲线与复杂度拟合</h2>
+                        {scaling_html}
+                    </div>
+        """ if scaling_html else ""
+        
         html = f"""
         <!DOCTYPE html>
         <html lang="zh-CN">
@@ -4128,6 +4481,7 @@ class HTMLReportGenerator:
             <meta charset="UTF-8">
             <meta name="viewport" content="width=device-width, initial-scale=1.0">
             <title>HTML转PDF工具评估报告</title>
+            <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
             {self.css_styles}
         </head>
         <body>
@@ -4152,6 +4506,10 @@ class HTMLReportGenerator:
                         <h2>🏆 整体指标对比</h2>
                         {self.generate_overall_metrics_comparison_html(results, metrics)}
                     </div>
+                    {timing_section}
+                    {phase_section}
+                    {resource_section}
+                    {scaling_section}
                     
                     <div class="section">
                         <h2>📝 详细结果</h2>
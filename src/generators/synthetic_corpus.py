@@ -0,0 +1,324 @@
+"""
+合成样例生成器
+按参数生成不同规模的HTML文档(页数、表格行数、图片数、嵌套深度、CSS规则数、中文比例)，
+并写出语料清单，用于测量各工具耗时和内存随文档规模的变化曲线
+"""
+
+import json
+import os
+import random
+import struct
+import zlib
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from utils.corpus import Corpus
+from utils.scaling_fit import count_dom_nodes
+
+# 页数估算使用的版面容量，与 _BASE_CSS 中的字号和尺寸对应
+TABLE_ROWS_PER_PAGE = 40
+IMAGES_PER_PAGE = 6
+PARAGRAPHS_PER_PAGE = 5
+
+# 每段正文的长度：西文约500字符，中文约260字，五段恰好占满一页A4
+LATIN_WORDS_PER_PARAGRAPH = 80
+CJK_CHARS_PER_PARAGRAPH = 260
+
+_LATIN_WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore "
+    "et dolore magna aliqua enim ad minim veniam quis nostrud exercitation ullamco laboris nisi aliquip "
+    "ex ea commodo consequat duis aute irure in reprehenderit voluptate velit esse cillum fugiat nulla "
+    "pariatur excepteur sint occaecat cupidatat non proident sunt culpa qui officia deserunt mollit anim"
+).split()
+
+_CJK_CHARS = (
+    "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而方后"
+    "多定行学法所民得经十三之进着等部度家电力里如水化高自二理起小物现实加量都两体制机当使点从业本去把性好应开它合"
+    "还因由其些然前外天政四日那社义事平形相全表间样与关各重新线内数正心反你明看原又么利比或但质气第向道命此变条只"
+    "没结解问意建月公无系军很情者最立代想已通并提直题党程展五果料象员革位入常文总次品式活设及管特件长求老头基资边"
+)
+
+_BASE_CSS = """
+@page { size: A4; margin: 20mm; }
+body { font-family: "Noto Sans CJK SC", "Source Han Sans SC", "Microsoft YaHei", sans-serif; font-size: 11pt; line-height: 1.5; }
+section.page { break-after: page; page-break-after: always; }
+section.page:last-child { break-after: auto; page-break-after: auto; }
+h1 { font-size: 18pt; }
+h2 { font-size: 14pt; margin: 0 0 8pt; }
+p { margin: 0 0 6pt; text-align: justify; }
+table { width: 100%; border-collapse: collapse; font-size: 9pt; }
+th, td { border: 0.5pt solid #999; padding: 1pt 4pt; }
+thead { display: table-header-group; }
+tr { break-inside: avoid; page-break-inside: avoid; }
+.figure { display: inline-block; width: 48%; margin: 0 1% 6pt; text-align: center; font-size: 9pt; }
+.figure img { width: 100%; height: 60mm; object-fit: cover; }
+.nest { margin: 0; padding: 0; border-left: 0.2pt solid #ddd; }
+"""
+
+
+@dataclass
+class SyntheticSpec:
+    """合成文档的生成参数，默认值为最小文档，每个参数单独控制一个规模维度"""
+    pages: int = 1  # 正文页数，每页一个标题和五段文字
+    table_rows: int = 0  # 表格行数(5列)
+    images: int = 0  # 图片数量，图片为独立的PNG文件
+    nesting_depth: int = 0  # 嵌套div的深度
+    css_rules: int = 0  # 额外CSS规则数，部分规则作用于正文段落
+    cjk_ratio: float = 0.0  # 中文段落所占比例 (0-1)
+    seed: int = 0
+
+    @property
+    def name(self) -> str:
+        """由参数决定的文件名，相同参数总是生成相同的文档"""
+        return (f"synthetic_p{self.pages}_r{self.table_rows}_i{self.images}_n{self.nesting_depth}"
+                f"_c{self.css_rules}_k{round(self.cjk_ratio * 100)}_s{self.seed}.html")
+
+    @property
+    def estimated_pages(self) -> int:
+        """按版面容量估算的PDF页数，各工具的实际页数会有出入"""
+        pages = self.pages
+        pages += -(-self.table_rows // TABLE_ROWS_PER_PAGE)
+        pages += -(-self.images // IMAGES_PER_PAGE)
+        pages += 1 if self.nesting_depth else 0
+        return max(1, pages)
+
+
+def scaling_series(dimension: str, values: Iterable[Any], **base) -> List[SyntheticSpec]:
+    """
+    单个维度取不同值、其他参数固定的一组参数
+
+    Args:
+        dimension: SyntheticSpec 的字段名，如 "pages"、"table_rows"
+        values: 该维度的取值
+        base: 其他字段的固定值
+    """
+    template = SyntheticSpec(**base)
+    if dimension not in asdict(template):
+        raise ValueError(f"未知的规模维度: {dimension}")
+    return [replace(template, **{dimension: value}) for value in values]
+
+
+# 默认的规模曲线，每条曲线覆盖约两个数量级
+DEFAULT_SERIES: Dict[str, List[Any]] = {
+    "pages": [1, 5, 10, 50, 100, 200],
+    "table_rows": [10, 100, 500, 1000, 5000],
+    "images": [1, 5, 10, 50, 100],
+    "nesting_depth": [10, 50, 100, 250, 500],
+    "css_rules": [10, 100, 1000, 5000, 10000],
+    "cjk_ratio": [0.0, 0.25, 0.5, 0.75, 1.0],
+}
+
+
+def _png_bytes(width: int, height: int, seed: int) -> bytes:
+    """生成渐变色PNG，不同 seed 颜色不同，避免后端按内容合并重复图片"""
+    rng = random.Random(seed)
+    red, green, blue = rng.randrange(256), rng.randrange(256), rng.randrange(256)
+    rows = []
+    for y in range(height):
+        row = bytearray([0])  # 每行的过滤类型
+        for x in range(width):
+            row += bytes(((red + x) % 256, (green + y) % 256, (blue + x + y) % 256))
+        rows.append(bytes(row))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(b"".join(rows), 6)) + chunk(b"IEND", b""))
+
+
+class SyntheticDocumentBuilder:
+    """按 SyntheticSpec 生成单个HTML文档"""
+
+    def __init__(self, spec: SyntheticSpec, assets_path: str = "assets"):
+        """
+        Args:
+            spec: 生成参数
+            assets_path: 图片目录相对HTML文件的路径
+        """
+        self.spec = spec
+        self.assets_path = assets_path
+        self.rng = random.Random(spec.seed)
+
+    def _latin_paragraph(self) -> str:
+        words = [self.rng.choice(_LATIN_WORDS) for _ in range(LATIN_WORDS_PER_PARAGRAPH)]
+        return " ".join(words).capitalize() + "."
+
+    def _cjk_paragraph(self) -> str:
+        chars = [self.rng.choice(_CJK_CHARS) for _ in range(CJK_CHARS_PER_PARAGRAPH)]
+        # 每20字左右插入一个标点
+        for index in range(20, len(chars), 20):
+            chars[index] = "，" if index % 60 else "。"
+        return "".join(chars) + "。"
+
+    def _paragraph(self, index: int) -> str:
+        css_class = f' class="r{index % self.spec.css_rules}"' if self.spec.css_rules else ""
+        cjk = self.rng.random() < self.spec.cjk_ratio
+        text = self._cjk_paragraph() if cjk else self._latin_paragraph()
+        return f"<p{css_class}>{text}</p>"
+
+    def _css(self) -> str:
+        rules = [_BASE_CSS]
+        for index in range(self.spec.css_rules):
+            color = f"#{self.rng.randrange(0x1000000):06x}"
+            if index % 3 == 0:
+                # 作用于正文段落的规则
+                rules.append(f"p.r{index} {{ color: {color}; letter-spacing: {index // 3 % 3 * 0.1:.1f}pt; }}")
+            elif index % 3 == 1:
+                # 不匹配任何元素的后代选择器，增加选择器匹配开销
+                rules.append(f"section.page div.unused{index} > span.x{index} {{ color: {color}; }}")
+            else:
+                rules.append(f".r{index}:hover, .r{index}::after {{ border-color: {color}; }}")
+        return "\n".join(rules)
+
+    def _text_pages(self) -> List[str]:
+        sections = []
+        paragraph = 0
+        for page in range(self.spec.pages):
+            body = []
+            for _ in range(PARAGRAPHS_PER_PAGE):
+                body.append(self._paragraph(paragraph))
+                paragraph += 1
+            sections.append(f'<section class="page"><h2>第 {page + 1} 页 / Page {page + 1}</h2>{"".join(body)}</section>')
+        return sections
+
+    def _table(self) -> str:
+        rows = []
+        for index in range(self.spec.table_rows):
+            amount = self.rng.uniform(0, 100000)
+            if self.rng.random() < self.spec.cjk_ratio:
+                label = "".join(self.rng.choice(_CJK_CHARS) for _ in range(4))
+            else:
+                label = self.rng.choice(_LATIN_WORDS)
+            rows.append(f"<tr><td>{index + 1}</td><td>{label}</td><td>{amount:,.2f}</td>"
+                        f"<td>{self.rng.randrange(1000)}</td><td>{self.rng.choice(('A', 'B', 'C'))}</td></tr>")
+        return ('<section class="page"><h2>表格 / Table</h2><table><thead><tr>'
+                "<th>#</th><th>名称</th><th>金额</th><th>数量</th><th>等级</th></tr></thead>"
+                f"<tbody>{''.join(rows)}</tbody></table></section>")
+
+    def _figures(self) -> str:
+        figures = [
+            f'<div class="figure"><img src="{self.assets_path}/image_{index}.png" alt="图 {index + 1}">'
+            f"<div>图 {index + 1}</div></div>"
+            for index in range(self.spec.images)
+        ]
+        return f'<section class="page"><h2>图片 / Images</h2>{"".join(figures)}</section>'
+
+    def _nesting(self) -> str:
+        depth = self.spec.nesting_depth
+        return ('<section class="page"><h2>嵌套 / Nesting</h2>' + '<div class="nest">' * depth
+                + f"<p>嵌套深度 {depth}</p>" + "</div>" * depth + "</section>")
+
+    def build(self) -> str:
+        sections = self._text_pages()
+        if self.spec.table_rows:
+            sections.append(self._table())
+        if self.spec.images:
+            sections.append(self._figures())
+        if self.spec.nesting_depth:
+            sections.append(self._nesting())
+
+        return ('<!DOCTYPE html>\n<html lang="zh-CN">\n<head>\n<meta charset="UTF-8">\n'
+                f"<title>{self.spec.name}</title>\n<style>\n{self._css()}\n</style>\n</head>\n<body>\n"
+                f"<h1>合成样例 {self.spec.name}</h1>\n" + "\n".join(sections) + "\n</body>\n</html>\n")
+
+
+class SyntheticCorpusGenerator:
+    """
+    合成语料生成器
+
+    把一组 SyntheticSpec 写成HTML文件、共用的图片目录和 manifest.jsonl 清单。
+    清单条目的 params 记录生成参数和实际规模(bytes、dom_nodes、estimated_pages)，
+    tags 包含 "synthetic" 和 "scale:<维度>"，可以用 Corpus.filter 选出单条规模曲线。
+    """
+
+    def __init__(self, output_dir: str, image_size: int = 256):
+        """
+        Args:
+            output_dir: 语料目录
+            image_size: 图片边长(像素)
+        """
+        self.output_dir = output_dir
+        self.image_size = image_size
+        self.assets_dir = os.path.join(output_dir, "assets")
+
+    def _ensure_images(self, count: int) -> None:
+        os.makedirs(self.assets_dir, exist_ok=True)
+        for index in range(count):
+            path = os.path.join(self.assets_dir, f"image_{index}.png")
+            if not os.path.exists(path):
+                with open(path, "wb") as f:
+                    f.write(_png_bytes(self.image_size, self.image_size, index))
+
+    def write_document(self, spec: SyntheticSpec, tags: Sequence[str] = ()) -> Dict[str, Any]:
+        """生成单个文档，返回清单条目"""
+        self._ensure_images(spec.images)
+        html = SyntheticDocumentBuilder(spec).build()
+        data = html.encode("utf-8")
+        with open(os.path.join(self.output_dir, spec.name), "wb") as f:
+            f.write(data)
+
+        params = asdict(spec)
+        params.update({
+            "bytes": len(data),
+            "dom_nodes": count_dom_nodes(html),
+            "estimated_pages": spec.estimated_pages
+        })
+        return {
+            "name": spec.name,
+            "description": f"合成样例 - {spec.pages}页正文, {spec.table_rows}行表格, {spec.images}张图片, "
+                           f"嵌套{spec.nesting_depth}层, {spec.css_rules}条CSS规则, 中文{spec.cjk_ratio:.0%}",
+            "weight": 1.0,
+            "expected_pages": spec.estimated_pages,
+            "tags": ["synthetic", *tags],
+            "params": params
+        }
+
+    def generate(self, specs: Iterable[SyntheticSpec], tags: Sequence[str] = ()) -> Corpus:
+        """
+        生成一组文档并写出清单
+
+        Returns:
+            基于清单的语料，可以直接传给 run_converter、TestRunner 或 HTMLToPDFEvaluator
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        manifest_path = os.path.join(self.output_dir, "manifest.jsonl")
+        written = set()
+        with open(manifest_path, "w", encoding="utf-8") as manifest:
+            for spec in specs:
+                if spec.name in written:
+                    continue
+                written.add(spec.name)
+                manifest.write(json.dumps(self.write_document(spec, tags), ensure_ascii=False) + "\n")
+
+        print(f"🧪 已生成 {len(written)} 个合成样例: {manifest_path}")
+        return Corpus.from_manifest(manifest_path)
+
+    def generate_scaling_corpus(self, series: Optional[Dict[str, List[Any]]] = None, **base) -> Corpus:
+        """
+        生成多条规模曲线
+
+        Args:
+            series: {维度: 取值列表}，默认为 DEFAULT_SERIES
+            base: 所有文档共用的其他参数
+        """
+        series = series or DEFAULT_SERIES
+        os.makedirs(self.output_dir, exist_ok=True)
+        manifest_path = os.path.join(self.output_dir, "manifest.jsonl")
+        entries: Dict[str, Dict[str, Any]] = {}
+        for dimension, values in series.items():
+            for spec in scaling_series(dimension, values, **base):
+                entry = entries.get(spec.name)
+                if entry is None:
+                    entries[spec.name] = self.write_document(spec, [f"scale:{dimension}"])
+                else:
+                    # 不同曲线的相同参数组合(如各维度的最小值)只生成一次
+                    entry["tags"].append(f"scale:{dimension}")
+
+        with open(manifest_path, "w", encoding="utf-8") as manifest:
+            for entry in entries.values():
+                manifest.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+        print(f"🧪 已生成 {len(entries)} 个合成样例 ({len(series)} 条规模曲线): {manifest_path}")
+        return Corpus.from_manifest(manifest_path)
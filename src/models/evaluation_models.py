@@ -3,8 +3,10 @@
 包含样例结果和评估指标的数据类定义
 """
 
-from dataclasses import dataclass
-from typing import Dict, List
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from utils.corpus import Corpus, default_corpus
 
 
 @dataclass
@@ -18,6 +20,13 @@ class SampleResult:
     error_message: str = ""
     quality_score: float = 0.0  # 转换质量评分 (0-100)
     notes: str = ""
+    trial_times: List[float] = field(default_factory=list)  # 基准测试模式下每次测量的耗时
+    timing_stats: Dict[str, float] = field(default_factory=dict)  # 耗时统计(分位数、标准差、置信区间)
+    phase_times: Dict[str, float] = field(default_factory=dict)  # 各转换阶段的耗时(秒)，阶段名由后端定义
+    resource_usage: Dict[str, float] = field(default_factory=dict)  # 进程树的内存(MB)和CPU(秒)占用
+    cache_status: str = ""  # 转换缓存状态: "hit" 复用了缓存结果, "miss" 重新转换, 空表示未启用缓存
+    pdf_analysis: Dict[str, Any] = field(default_factory=dict)  # 输出PDF的分析结果，增量评估时沿用
+    provenance: Dict[str, Any] = field(default_factory=dict)  # 来源信息: 内容指纹、后端版本、评估批次和时间
 
 
 @dataclass
@@ -61,31 +70,31 @@ EVALUATION_DIMENSIONS = [
     ("🪶 可定制性", "10%", "输出配置、页眉页脚、水印等")
 ]
 
-# 样例信息配置
-SAMPLES_INFO = {
-    "base.html": "基础元素测试 - 文本、图片、表格",
-    "complex.html": "复杂布局测试 - Grid布局、分页、阴影",
-    "chinese.html": "中文字体测试 - 中文排版和字体渲染",
-    "dynamic.html": "动态内容测试 - JavaScript生成内容",
-    "svg.html": "SVG图形测试 - 矢量图形渲染",
-    "print_styles.html": "打印样式测试 - @media print和@page规则",
-    "forms.html": "表单元素测试 - 各种表单控件",
-    "long_document.html": "长文档测试 - 多页分页效果",
-    "special_chars.html": "特殊字符测试 - Unicode字符和符号"
-}
-
-# 样例测试权重配置 - 基于样例复杂度和重要性
-SAMPLE_WEIGHTS = {
-    "base.html": 1.0,          # 基础功能，标准权重
-    "complex.html": 1.5,       # 复杂布局，高权重
-    "chinese.html": 1.2,       # 中文支持，重要
-    "dynamic.html": 1.8,       # 动态内容，最高权重
-    "svg.html": 1.3,           # SVG支持，较重要
-    "print_styles.html": 1.1,  # 打印样式，一般重要
-    "forms.html": 1.0,         # 表单元素，标准权重
-    "long_document.html": 1.2, # 长文档，较重要
-    "special_chars.html": 1.0  # 特殊字符，标准权重
-}
+# 样例信息和测试权重取自样例目录中的清单 test_data/samples/manifest.json
+# 权重基于样例复杂度和重要性，未在清单中列出的样例使用标准权重1.0
+# 首次使用时才扫描样例目录，导入本模块不读取文件系统
+_SAMPLE_TABLES: Dict[str, Dict[str, Any]] = {}
+
+
+def _sample_table(name: str) -> Dict[str, Any]:
+    if not _SAMPLE_TABLES:
+        specs = list(default_corpus())
+        _SAMPLE_TABLES["SAMPLES_INFO"] = {spec.name: spec.description for spec in specs}
+        _SAMPLE_TABLES["SAMPLE_WEIGHTS"] = {spec.name: spec.weight for spec in specs}
+    return _SAMPLE_TABLES[name]
+
+
+def __getattr__(name: str) -> Dict[str, Any]:
+    """SAMPLES_INFO、SAMPLE_WEIGHTS 在首次访问时由内置样例语料生成"""
+    if name in ("SAMPLES_INFO", "SAMPLE_WEIGHTS"):
+        return _sample_table(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_sample_weight(sample_name: str, corpus: Optional[Corpus] = None) -> float:
+    """样例的评分权重，优先取自给定语料的元数据"""
+    spec = (corpus or default_corpus()).get(sample_name)
+    return spec.weight if spec else _sample_table("SAMPLE_WEIGHTS").get(sample_name, 1.0)
 
 def calculate_dynamic_quality_score(tool_name: str, sample_name: str, 
                                   conversion_success: bool, conversion_time: float, 
@@ -181,9 +190,20 @@ def calculate_dimension_scores(tool_name: str, sample_results: List) -> Dict[str
     else:  # LibreOffice
         functionality = min(100, avg_quality * 0.8)  # LibreOffice功能支持较弱
     
-    # 性能稳定评分 = 成功率 + 时间性能
+    # 性能稳定评分 = 成功率 + 时间性能 (+ 内存和CPU占用)
     time_score = max(0, 100 - avg_time * 20)  # 时间越短分数越高
-    performance = success_rate * 100 * 0.6 + time_score * 0.4
+    
+    # 资源占用只有开启资源监控时才有数据，内存优先使用PSS(子进程之间的共享页不重复计算)
+    resource_usages = [r.resource_usage for r in sample_results
+                       if getattr(r, 'conversion_success', False) and getattr(r, 'resource_usage', None)]
+    if resource_usages:
+        peak_memory = sum(u.get('pss_peak_mb') or u.get('rss_peak_mb', 0) for u in resource_usages) / len(resource_usages)
+        cpu_time = sum(u.get('cpu_user', 0) + u.get('cpu_system', 0) for u in resource_usages) / len(resource_usages)
+        memory_score = max(0, 100 - peak_memory / 10)  # 每100MB扣10分，后端进程峰值1GB及以上为0(不含评估进程基线)
+        cpu_score = max(0, 100 - cpu_time * 20)  # 与时间评分相同的尺度
+        performance = success_rate * 100 * 0.4 + time_score * 0.3 + memory_score * 0.2 + cpu_score * 0.1
+    else:
+        performance = success_rate * 100 * 0.6 + time_score * 0.4
     
     # 部署可行评分 = 成功率 + 文件大小一致性
     deployment = success_rate * 100 * 0.7 + size_consistency * 0.3
@@ -4,13 +4,14 @@
 
 import os
 import sys
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 import statistics
 
 # 添加utils路径
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from utils.pdf_analyzer import PDFAnalyzer, PDFAnalysisResult
+from utils.corpus import Corpus, default_corpus
+from utils.pdf_analyzer import FORM_KEYWORDS, PDFAnalyzer, PDFAnalysisResult
 
 
 @dataclass
@@ -46,8 +47,9 @@ class ObjectiveMetrics:
 class ObjectiveEvaluator:
     """客观评估器"""
     
-    def __init__(self):
+    def __init__(self, corpus: Optional[Corpus] = None):
         self.pdf_analyzer = PDFAnalyzer()
+        self.corpus = corpus or default_corpus()
         
         # 工具名称映射(用于文件名筛选)
         self.tool_name_mapping = {
@@ -173,9 +175,6 @@ class ObjectiveEvaluator:
             
             # 基于文本长度和内容质量给出评分
             if result.text_length > 0:
-                # 检查文本内容质量
-                text_content = result.text_content.strip()
-                
                 # 基础评分：有文本就给基础分
                 base_score = 60
                 
@@ -312,10 +311,8 @@ class ObjectiveEvaluator:
                 supported_count += 1
             # 如果没有检测到表单字段，但有文本内容，可能是表单被转换为文本
             elif result.text_length > 100:  # 有一定长度的文本内容
-                # 检查文本中是否包含表单相关的关键词
-                text_content = result.text_content.lower()
-                form_keywords = ['input', 'button', 'submit', 'form', 'field', 'text', 'email', 'password']
-                if any(keyword in text_content for keyword in form_keywords):
+                # 检查文本中是否包含表单相关的关键词(分析时逐页检测，不依赖全文)
+                if any(keyword in result.keywords_found for keyword in FORM_KEYWORDS):
                     supported_count += 0.6  # 部分支持，表单转换为文本
                 else:
                     supported_count += 0.3  # 基础支持，至少有内容
@@ -367,7 +364,13 @@ class ObjectiveEvaluator:
         return '_'.join(parts[:-1]) if len(parts) > 1 else filename
     
     def _get_expected_pages(self, filename: str) -> int:
-        """获取预期页数"""
+        """获取预期页数，优先使用语料元数据中的 expected_pages"""
+        # 索引名为 <样例名去掉扩展名>_<工具后缀>.pdf，样例名可以包含子目录(如 a/b.html)
+        stem = os.path.splitext(filename)[0].rsplit('_', 1)[0]
+        spec = self.corpus.get(stem + '.html') or self.corpus.get(stem + '.htm')
+        if spec and spec.expected_pages:
+            return spec.expected_pages
+
         if 'long_document' in filename:
             return 3
         elif 'print_styles' in filename:
@@ -0,0 +1,89 @@
+import os
+import sys
+import glob
+import argparse
+
+# 获取当前文件的目录，然后构建相对于src目录的路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.dirname(current_dir)  # 上一级目录就是src
+
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from PyPDF2 import PdfReader
+
+from utils.pdf_analyzer import PDFAnalyzer
+from utils.pdf_page_walker import FontCollector, PageWalker, XObjectCollector
+from utils.pdf_structure import StructureScanError, scan_pdf_structure
+
+# 默认检查评估生成的PDF
+DEFAULT_PDF_DIR = os.path.join(os.path.dirname(src_dir), "result", "pdfs")
+
+
+def reader_structure(file_path: str) -> dict:
+    """用 PdfReader 遍历页面资源得到的结构统计，与 PDFAnalyzer 的回退路径一致"""
+    with open(file_path, 'rb') as file:
+        pdf_reader = PdfReader(file)
+        xobjects = XObjectCollector()
+        fonts = FontCollector()
+        page_count = PageWalker([xobjects, fonts]).walk(pdf_reader)
+        return {
+            "page_count": page_count,
+            "font_count": len(fonts.fonts),
+            "image_count": xobjects.image_count,
+            "form_xobject_count": xobjects.form_count,
+            "form_field_count": PDFAnalyzer()._count_form_fields(pdf_reader)
+        }
+
+
+def scanner_structure(file_path: str) -> dict:
+    """快速扫描得到的结构统计"""
+    structure = scan_pdf_structure(file_path)
+    return {
+        "page_count": structure.page_count,
+        "font_count": len(structure.font_names),
+        "image_count": structure.image_count,
+        "form_xobject_count": structure.form_xobject_count,
+        "form_field_count": structure.form_field_count
+    }
+
+
+def check_pdf_structure(paths: list) -> int:
+    """
+    比较快速扫描和 PdfReader 的结构统计
+
+    Returns:
+        不一致的文件数；无法快速扫描的文件会回退到 PdfReader，只报告不计入
+    """
+    mismatches = 0
+    for file_path in paths:
+        name = os.path.basename(file_path)
+        expected = reader_structure(file_path)
+        try:
+            actual = scanner_structure(file_path)
+        except StructureScanError as e:
+            print(f"⚠️ {name}: 无法快速扫描，回退到 PdfReader ({e})")
+            continue
+
+        diff = {key: (actual[key], expected[key]) for key in expected if actual[key] != expected[key]}
+        if diff:
+            mismatches += 1
+            details = ", ".join(f"{key} 扫描={a} PdfReader={b}" for key, (a, b) in diff.items())
+            print(f"❌ {name}: {details}")
+        else:
+            print(f"✅ {name}: {expected['page_count']}页, {expected['font_count']}个字体, "
+                  f"{expected['image_count']}个图片, {expected['form_xobject_count']}个Form XObject")
+
+    print(f"\n📊 共检查 {len(paths)} 个PDF，{mismatches} 个不一致")
+    return mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="检查PDF结构快速扫描与 PdfReader 的统计是否一致")
+    parser.add_argument("paths", nargs="*", help="PDF文件或目录，默认为 result/pdfs")
+    args = parser.parse_args()
+
+    files = []
+    for path in args.paths or [DEFAULT_PDF_DIR]:
+        files.extend(sorted(glob.glob(os.path.join(path, "*.pdf"))) if os.path.isdir(path) else [path])
+    sys.exit(1 if check_pdf_structure(files) else 0)
@@ -1,114 +1,35 @@
-from playwright.sync_api import sync_playwright
-import os, time
+import os, sys
 import logging
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-# 所有9个HTML测试样例
-samples = [
-    "base.html", "complex.html", "chinese.html", "dynamic.html",
-    "svg.html", "print_styles.html", "forms.html", 
-    "long_document.html", "special_chars.html"
-]
 
 # 获取当前文件的目录，然后构建相对于src目录的路径
 current_dir = os.path.dirname(os.path.abspath(__file__))
 src_dir = os.path.dirname(current_dir)  # 上一级目录就是src
 
-input_dir = os.path.join(src_dir, "test_data", "samples")
-output_dir = os.path.join(src_dir, "test_data", "outputs")
-os.makedirs(output_dir, exist_ok=True)
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
 
-def test_playwright():
-    """运行Playwright转换测试"""
-    results = []
-    
-    with sync_playwright() as p:
-        browser = p.chromium.launch()
-        page = browser.new_page()
-        
-        for name in samples:
-            try:
-                start = time.time()
-                html_path = os.path.join(input_dir, name)
-                output_path = os.path.join(output_dir, name.replace(".html", "_playwright.pdf"))
-                
-                # 检查HTML文件是否存在
-                if not os.path.exists(html_path):
-                    print(f"[Playwright] {name} -> 文件不存在，跳过")
-                    results.append({
-                        "sample": name,
-                        "success": False,
-                        "time": 0,
-                        "file_path": "",
-                        "error": "文件不存在"
-                    })
-                    continue
-                
-                page.goto(f"file://{os.path.abspath(html_path)}")
-                
-                # 等待页面加载完成（特别是对于动态内容）
-                if "dynamic" in name:
-                    page.wait_for_timeout(2000)  # 等待2秒让JavaScript执行
-                
-                # 对于special_chars.html，使用特殊处理
-                if "special_chars" in name:
-                    try:
-                        # 尝试简化页面内容，移除可能导致崩溃的emoji
-                        page.evaluate("""
-                            () => {
-                                const emojiSection = document.querySelector('.emoji-section');
-                                if (emojiSection) {
-                                    emojiSection.innerHTML = '<h2>表情符号 (Emoji)</h2><p>由于兼容性问题，此部分内容已简化</p>';
-                                }
-                            }
-                        """)
-                        page.wait_for_timeout(500)
-                    except Exception as e:
-                        logger.warning(f"简化special_chars页面失败: {e}")
-                
-                page.pdf(path=output_path, format="A4")
-                conversion_time = time.time() - start
-                
-                # 获取文件大小
-                file_size = os.path.getsize(output_path) if os.path.exists(output_path) else 0
-                
-                print(f"[Playwright] {name} -> done in {conversion_time:.2f}s, size: {file_size} bytes")
-                results.append({
-                    "sample": name,
-                    "success": True,
-                    "time": conversion_time,
-                    "file_size": file_size,
-                    "file_path": output_path,
-                    "error": ""
-                })
-                
-            except Exception as e:
-                conversion_time = time.time() - start
-                error_msg = str(e)
-                print(f"[Playwright] {name} -> 转换失败: {error_msg}")
-                
-                # 对于special_chars.html的特殊错误处理
-                if "special_chars" in name:
-                    if "Protocol error" in error_msg or "Printing failed" in error_msg:
-                        error_msg = "PDF转换失败：页面包含的特殊字符（如Emoji）导致Chromium PDF引擎崩溃"
-                    elif "Target crashed" in error_msg:
-                        error_msg = "浏览器进程崩溃：特殊字符渲染导致内存或字体问题"
-                
-                results.append({
-                    "sample": name,
-                    "success": False,
-                    "time": conversion_time,
-                    "file_size": 0,
-                    "file_path": "",
-                    "error": error_msg
-                })
-        
-        browser.close()
+from converters.runner import run_converter
+
+def test_playwright(pool=None, pool_size: int = 2, mode: str = "pool",
+                    concurrency: int = 4, timeout: float = 60.0, readiness=None):
+    """
+    运行Playwright转换测试
     
-    return results
+    Args:
+        pool: 已预热的 BrowserPool，为空时使用进程内共享池(跨多次运行复用)
+        pool_size: 共享池的槽位数，即并行渲染的页面数
+        mode: "pool" 使用同步浏览器池，"async" 使用异步并发引擎
+        concurrency: 异步模式下同时渲染的最大页面数
+        timeout: 单个文档的超时时间(秒)
+        readiness: 页面就绪检测策略(ReadinessStrategy)，默认检测网络空闲、字体和DOM稳定
+    """
+    return run_converter(
+        "Playwright", pool=pool, pool_size=pool_size, mode=mode,
+        concurrency=concurrency, timeout=timeout, readiness=readiness
+    )
 
 if __name__ == "__main__":
     results = test_playwright()
@@ -0,0 +1,199 @@
+"""
+PDF分析结果缓存
+以PDF内容哈希和分析器版本为键，把分析结果持久化到SQLite，重新评分或重新生成报告时无需再次解析未变化的PDF
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+from typing import Any, Dict, Optional
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """分块计算文件的SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """
+    基于SQLite的PDF分析结果缓存
+
+    analyses 表按 (内容哈希, 分析器版本和参数) 保存分析结果；files 表记录路径、大小和修改时间
+    对应的内容哈希，文件未变化时无需重新计算哈希。条目数超过上限时淘汰最久未使用的条目。
+    数据库只由评估进程读写，进程池中的工作进程不访问缓存。
+    """
+
+    def __init__(self, db_path: str, max_entries: int = 50000):
+        """
+        Args:
+            db_path: SQLite数据库文件路径
+            max_entries: 分析结果条目数上限
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "hashed": 0  # 大小或修改时间变化、需要重新计算哈希的文件数
+        }
+
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS analyses (
+                sha256 TEXT NOT NULL,
+                analyzer TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (sha256, analyzer)
+            );
+            CREATE INDEX IF NOT EXISTS analyses_last_used ON analyses (last_used);
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                last_seen REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS files_last_seen ON files (last_seen);
+        """)
+        self._conn.commit()
+
+    @property
+    def hit_rate(self) -> float:
+        """缓存命中率(0-1)"""
+        total = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / total if total else 0.0
+
+    def content_hash(self, path: str) -> str:
+        """
+        文件内容哈希
+
+        路径、大小和修改时间(纳秒)都与记录一致时直接使用记录的哈希，否则重新计算并更新记录。
+        """
+        stat = os.stat(path)
+        path = os.path.abspath(path)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, sha256 FROM files WHERE path = ?", (path,)
+            ).fetchone()
+        if row is not None and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            return row[2]
+
+        sha256 = file_sha256(path)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (path, size, mtime_ns, sha256, last_seen) VALUES (?, ?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime_ns, sha256, time.time())
+            )
+            self._conn.commit()
+            self.stats["hashed"] += 1
+        return sha256
+
+    def get(self, path: str, analyzer_key: str) -> Optional[Dict[str, Any]]:
+        """
+        查找缓存
+
+        Args:
+            path: PDF文件路径
+            analyzer_key: 分析器版本和参数的标识，见 PDFAnalyzer.cache_key
+
+        Returns:
+            命中时返回分析结果字典(file_path 为当前路径)，未命中或文件无法读取时返回 None
+        """
+        try:
+            sha256 = self.content_hash(path)
+        except OSError:
+            return None
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM analyses WHERE sha256 = ? AND analyzer = ?", (sha256, analyzer_key)
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            self._conn.execute(
+                "UPDATE analyses SET last_used = ? WHERE sha256 = ? AND analyzer = ?", (now, sha256, analyzer_key)
+            )
+            self._conn.execute("UPDATE files SET last_seen = ? WHERE path = ?", (now, os.path.abspath(path)))
+            self._conn.commit()
+            self.stats["hits"] += 1
+
+        result = json.loads(row[0])
+        # 相同内容的PDF可能位于不同路径
+        result["file_path"] = path
+        return result
+
+    def put(self, path: str, analyzer_key: str, result) -> None:
+        """保存分析结果；分析失败的结果不缓存，下次重新分析"""
+        if result.error_message:
+            return
+        try:
+            sha256 = self.content_hash(path)
+        except OSError:
+            return
+
+        now = time.time()
+        data = json.dumps(asdict(result), ensure_ascii=False, default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analyses (sha256, analyzer, result, created, last_used) VALUES (?, ?, ?, ?, ?)",
+                (sha256, analyzer_key, data, now, now)
+            )
+            self.stats["stores"] += 1
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """淘汰最久未使用的分析结果和文件记录，直到条目数回到上限以内(调用方持有锁)"""
+        count = self._conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM analyses WHERE rowid IN "
+                "(SELECT rowid FROM analyses ORDER BY last_used LIMIT ?)", (excess,)
+            )
+            self.stats["evictions"] += excess
+
+        count = self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM files WHERE rowid IN "
+                "(SELECT rowid FROM files ORDER BY last_seen LIMIT ?)", (excess,)
+            )
+
+    def clear(self) -> None:
+        """删除全部缓存条目"""
+        with self._lock:
+            self._conn.execute("DELETE FROM analyses")
+            self._conn.execute("DELETE FROM files")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def describe(self) -> str:
+        """缓存统计的单行描述"""
+        total = self.stats["hits"] + self.stats["misses"]
+        return (f"命中 {self.stats['hits']}/{total} ({self.hit_rate * 100:.1f}%), "
+                f"新增 {self.stats['stores']}, 淘汰 {self.stats['evictions']}, "
+                f"重新计算哈希 {self.stats['hashed']}")
@@ -0,0 +1,213 @@
+"""
+异步Playwright转换引擎
+基于 playwright.async_api，在多个页面/上下文间并发渲染文档
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from playwright.async_api import async_playwright
+
+from utils.page_readiness import ReadinessStrategy, DEFAULT_READINESS
+from utils.phase_timer import PhaseTimer
+
+logger = logging.getLogger(__name__)
+
+
+def failure_result(name: str, elapsed: float, error: str, phases: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """失败的转换结果字典"""
+    return {
+        "sample": name,
+        "success": False,
+        "time": elapsed,
+        "file_size": 0,
+        "file_path": "",
+        "error": error,
+        "phases": phases or {}
+    }
+
+
+class AsyncPlaywrightEngine:
+    """
+    异步Playwright转换引擎
+
+    一个浏览器下创建若干上下文，文档按轮询分配到上下文，每个文档使用独立页面。
+    信号量限制同时渲染的页面数，每个文档单独计时超时，未完成的任务可以整体取消。
+    """
+
+    def __init__(self, concurrency: int = 4, context_count: int = 2, timeout: float = 60.0,
+                 launch_options: Optional[Dict[str, Any]] = None,
+                 pdf_options: Optional[Dict[str, Any]] = None,
+                 readiness: Optional[ReadinessStrategy] = None):
+        """
+        Args:
+            concurrency: 同时渲染的最大页面数
+            context_count: 浏览器上下文数量
+            timeout: 单个文档的超时时间(秒)
+            launch_options: 传给 chromium.launch 的参数
+            pdf_options: 传给 page.pdf 的参数
+            readiness: 页面就绪检测策略
+        """
+        self.concurrency = max(1, concurrency)
+        self.context_count = max(1, context_count)
+        self.timeout = timeout
+        self.launch_options = launch_options or {}
+        self.pdf_options = pdf_options or {"format": "A4"}
+        self.readiness = readiness or DEFAULT_READINESS
+
+        self.launch_time = 0.0  # 浏览器启动耗时(秒)，与单文档耗时分开统计
+
+        self._playwright = None
+        self._browser = None
+        self._contexts: List[Any] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._next_context = 0
+
+    async def __aenter__(self) -> "AsyncPlaywrightEngine":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        """启动浏览器并创建上下文"""
+        if self._browser is not None:
+            return
+
+        start = time.perf_counter()
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(**self.launch_options)
+        self._contexts = [await self._browser.new_context() for _ in range(self.context_count)]
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self.launch_time = time.perf_counter() - start
+
+    async def close(self) -> None:
+        """取消未完成的任务并关闭浏览器"""
+        self.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks.clear()
+
+        for context in self._contexts:
+            try:
+                await context.close()
+            except Exception:
+                pass
+        self._contexts = []
+
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def cancel(self) -> None:
+        """取消所有尚未完成的转换任务"""
+        for task in self._tasks:
+            if not task.done():
+                task.cancel()
+
+    async def convert(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        转换单个文档
+
+        Args:
+            job: 转换任务，包含 sample、html_path、output_path，可选 script(页面就绪后执行的预处理脚本)
+
+        Returns:
+            与 tools/test_*.py 一致的结果字典；任务被取消时抛出 asyncio.CancelledError
+        """
+        if self._browser is None:
+            await self.start()
+
+        name = job["sample"]
+        timer = PhaseTimer()
+        start = time.perf_counter()
+
+        try:
+            async with self._semaphore:
+                # 排队等待信号量的时间不计入转换耗时
+                start = time.perf_counter()
+                await asyncio.wait_for(self._render(job, timer), timeout=self.timeout)
+                conversion_time = time.perf_counter() - start
+
+            output_path = job["output_path"]
+            file_size = os.path.getsize(output_path) if os.path.exists(output_path) else 0
+            return {
+                "sample": name,
+                "success": True,
+                "time": conversion_time,
+                "file_size": file_size,
+                "file_path": output_path,
+                "error": "",
+                "phases": timer.to_dict()
+            }
+        except asyncio.TimeoutError:
+            error_msg = f"转换超时(超过{self.timeout:.0f}秒)"
+        except Exception as e:
+            error_msg = str(e)
+        # asyncio.CancelledError 不在这里处理，取消需要传递给调用方
+
+        return failure_result(name, time.perf_counter() - start, error_msg, timer.to_dict())
+
+    async def convert_many(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        并发转换多个文档，按输入顺序返回结果
+
+        通过 cancel() 取消的文档记为失败；convert_many 本身被取消时取消全部任务并继续传递取消。
+        """
+        if self._browser is None:
+            await self.start()
+
+        tasks = [asyncio.create_task(self.convert(job)) for job in jobs]
+        self._tasks.update(tasks)
+        try:
+            outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            self._tasks.difference_update(tasks)
+
+        results = []
+        for job, outcome in zip(jobs, outcomes):
+            if isinstance(outcome, asyncio.CancelledError):
+                results.append(failure_result(job["sample"], 0.0, "转换已取消"))
+            elif isinstance(outcome, BaseException):
+                results.append(failure_result(job["sample"], 0.0, str(outcome)))
+            else:
+                results.append(outcome)
+        return results
+
+    async def _render(self, job: Dict[str, Any], timer: PhaseTimer) -> None:
+        """在独立页面中渲染文档并输出PDF，记录 page、goto、ready、pdf 四个阶段"""
+        context = self._contexts[self._next_context % len(self._contexts)]
+        self._next_context += 1
+
+        with timer.phase("page"):
+            page = await context.new_page()
+        try:
+            with timer.phase("goto"):
+                await page.goto(f"file://{os.path.abspath(job['html_path'])}")
+
+            with timer.phase("ready"):
+                await self.readiness.wait_async(page)
+
+                # 预处理脚本失败不影响转换，与浏览器池模式一致
+                if job.get("script"):
+                    try:
+                        await page.evaluate(job["script"])
+                    except Exception as e:
+                        logger.warning(f"预处理脚本执行失败 {job['sample']}: {e}")
+
+            with timer.phase("pdf"):
+                await page.pdf(path=job["output_path"], **self.pdf_options)
+        finally:
+            await page.close()
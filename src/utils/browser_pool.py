@@ -0,0 +1,330 @@
+"""
+Chromium浏览器池
+为Playwright后端提供预热、可复用的浏览器实例，摊薄启动开销并支持并行渲染
+"""
+
+import atexit
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from playwright.sync_api import sync_playwright
+
+
+class BrowserPool:
+    """
+    Chromium浏览器池
+
+    sync_playwright 创建的对象只能在创建它的线程中使用，因此池中每个槽位都是一个
+    独立的工作线程，持有自己的 Playwright 实例、浏览器和浏览器上下文。任务通过队列
+    分发给空闲槽位，在槽位线程中检出一个新页面执行，执行完毕后关闭页面。
+    """
+
+    def __init__(self, size: int = 2, launch_options: Optional[Dict[str, Any]] = None,
+                 context_options: Optional[Dict[str, Any]] = None,
+                 max_uses_per_context: int = 100, task_timeout: float = 300.0,
+                 launch_timeout: float = 120.0):
+        """
+        Args:
+            size: 槽位数量，即可同时渲染的页面数
+            launch_options: 传给 chromium.launch 的参数
+            context_options: 传给 browser.new_context 的参数
+            max_uses_per_context: 单个上下文最多渲染的页面数，超过后重建上下文以释放内存
+            task_timeout: map 等待单个任务的默认超时时间(秒)
+            launch_timeout: 等待所有槽位启动浏览器的最长时间(秒)，超时则启动失败
+        """
+        self.size = max(1, size)
+        self.launch_options = launch_options or {}
+        self.context_options = context_options or {}
+        self.max_uses_per_context = max_uses_per_context
+        self.task_timeout = task_timeout
+        self.launch_timeout = launch_timeout
+
+        # 启动开销与单文档耗时分开统计
+        self.launch_time = 0.0  # 预热阶段墙钟耗时(秒)，各槽位并行启动
+        self.slot_launch_times: List[float] = []  # 每个槽位的浏览器启动耗时
+        self.restart_count = 0  # 健康检查触发的浏览器重启次数
+        self.pages_rendered = 0
+
+        self._tasks: "queue.Queue" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._ready_events: List[threading.Event] = []
+        self._lock = threading.Lock()
+        self._started = False
+        self._closed = False
+        self._alive_slots = 0
+        self.slot_errors: List[Exception] = []  # 启动后异常退出的槽位的错误
+
+    def __enter__(self) -> "BrowserPool":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @property
+    def started(self) -> bool:
+        return self._started and not self._closed
+
+    def start(self) -> "BrowserPool":
+        """启动并预热所有槽位，阻塞直到每个浏览器都可用或超过 launch_timeout"""
+        if self._started:
+            return self
+
+        start = time.perf_counter()
+        errors: List[Exception] = []
+
+        for slot_id in range(self.size):
+            ready = threading.Event()
+            thread = threading.Thread(
+                target=self._worker,
+                args=(slot_id, ready, errors),
+                name=f"browser-pool-{slot_id}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+            self._ready_events.append(ready)
+
+        deadline = start + self.launch_timeout
+        for slot_id, ready in enumerate(self._ready_events):
+            if not ready.wait(timeout=max(0.0, deadline - time.perf_counter())):
+                errors.append(TimeoutError(f"槽位 {slot_id} 启动浏览器超时(超过{self.launch_timeout:.0f}秒)"))
+                break
+
+        self.launch_time = time.perf_counter() - start
+        self._started = True
+
+        if errors:
+            self.close()
+            raise RuntimeError(f"浏览器池启动失败: {errors[0]}")
+
+        return self
+
+    def close(self) -> None:
+        """
+        关闭所有槽位的浏览器
+
+        仍在启动浏览器的槽位线程(启动超时)不等待，它们是守护线程，启动完成后会取到关闭标记退出。
+        """
+        if self._closed:
+            return
+        self._closed = True
+
+        for _ in self._threads:
+            self._tasks.put(None)
+        for thread, ready in zip(self._threads, self._ready_events):
+            if ready.is_set():
+                thread.join(timeout=30)
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """
+        提交一个渲染任务
+
+        Args:
+            fn: 以检出的 page 为第一个参数的可调用对象，在槽位线程中执行
+
+        Returns:
+            任务结果的 Future
+        """
+        if self._closed:
+            raise RuntimeError("浏览器池已关闭")
+        if not self._started:
+            self.start()
+
+        future: Future = Future()
+        with self._lock:
+            if self._alive_slots == 0:
+                raise RuntimeError(f"浏览器池没有可用的槽位: {self.slot_errors[-1] if self.slot_errors else '已退出'}")
+            self._tasks.put((fn, args, kwargs, future))
+        return future
+
+    def wait_all(self, futures: List[Future], timeout: Optional[float] = None,
+                 return_exceptions: bool = False) -> List[Any]:
+        """
+        按顺序等待一组任务的结果
+
+        所有任务共用一个截止时间：按槽位数分批计算，每批最多 timeout 秒。
+        超时的任务若尚未开始则被取消。
+
+        Args:
+            return_exceptions: 为 True 时超时或失败的任务以异常对象的形式放在结果中，
+                否则抛出第一个异常(超时为 concurrent.futures.TimeoutError)
+        """
+        timeout = self.task_timeout if timeout is None else timeout
+        waves = math.ceil(len(futures) / self.size) if futures else 0
+        deadline = time.perf_counter() + timeout * waves + 10
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result(timeout=max(0.0, deadline - time.perf_counter())))
+            except FutureTimeoutError:
+                future.cancel()
+                if not return_exceptions:
+                    raise
+                results.append(FutureTimeoutError(f"渲染超时(超过{timeout:.0f}秒)"))
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
+    def map(self, fn: Callable[..., Any], items: Iterable[Any], timeout: Optional[float] = None) -> List[Any]:
+        """
+        并行执行 fn(page, item)，按输入顺序返回结果
+
+        Args:
+            timeout: 单个任务的超时时间(秒)，默认为 task_timeout；超时抛出 concurrent.futures.TimeoutError
+        """
+        futures = [self.submit(fn, item) for item in items]
+        try:
+            return self.wait_all(futures, timeout)
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def health_check(self) -> Dict[str, Any]:
+        """返回浏览器池的健康状态"""
+        alive = sum(1 for thread in self._threads if thread.is_alive())
+        return {
+            "size": self.size,
+            "alive_slots": alive,
+            "healthy": self.started and alive == self.size,
+            "slot_errors": [str(e) for e in self.slot_errors],
+            "restart_count": self.restart_count,
+            "pages_rendered": self.pages_rendered,
+            "launch_time": self.launch_time
+        }
+
+    def _launch(self, playwright):
+        """启动浏览器并创建上下文，预热一个空白页"""
+        browser = playwright.chromium.launch(**self.launch_options)
+        context = browser.new_context(**self.context_options)
+        warmup_page = context.new_page()
+        warmup_page.goto("about:blank")
+        warmup_page.close()
+        return browser, context
+
+    def _fail_pending(self, error: Exception) -> None:
+        """使队列中所有尚未开始的任务失败(调用方持有锁)"""
+        while True:
+            try:
+                task = self._tasks.get_nowait()
+            except queue.Empty:
+                return
+            if task is not None and task[3].set_running_or_notify_cancel():
+                task[3].set_exception(error)
+
+    def _slot_exited(self, error: Optional[BaseException]) -> None:
+        """槽位线程退出：异常退出时记录错误，最后一个槽位退出后队列中剩余的任务全部失败"""
+        with self._lock:
+            self._alive_slots -= 1
+            if error is not None:
+                self.slot_errors.append(error)
+            if self._alive_slots == 0:
+                self._fail_pending(RuntimeError(f"浏览器池所有槽位已退出: {error or '已关闭'}"))
+
+    def _worker(self, slot_id: int, ready: threading.Event, errors: List[Exception]) -> None:
+        """槽位工作线程：持有一个浏览器，循环处理队列中的任务"""
+        started = False
+        try:
+            with sync_playwright() as p:
+                launch_start = time.perf_counter()
+                browser, context = self._launch(p)
+                with self._lock:
+                    self.slot_launch_times.append(time.perf_counter() - launch_start)
+                    self._alive_slots += 1
+                started = True
+                ready.set()
+
+                uses = 0
+                while True:
+                    task = self._tasks.get()
+                    if task is None:
+                        break
+
+                    fn, args, kwargs, future = task
+                    if not future.set_running_or_notify_cancel():
+                        continue
+
+                    try:
+                        # 健康检查：浏览器断开则重启，上下文使用过多则重建
+                        if not browser.is_connected():
+                            browser, context = self._launch(p)
+                            uses = 0
+                            with self._lock:
+                                self.restart_count += 1
+                        elif uses >= self.max_uses_per_context:
+                            context.close()
+                            context = browser.new_context(**self.context_options)
+                            uses = 0
+                    except Exception as e:
+                        future.set_exception(e)
+                        continue
+
+                    page = None
+                    try:
+                        page = context.new_page()
+                        future.set_result(fn(page, *args, **kwargs))
+                    except BaseException as e:
+                        future.set_exception(e)
+                    finally:
+                        uses += 1
+                        with self._lock:
+                            self.pages_rendered += 1
+                        if page is not None:
+                            try:
+                                page.close()
+                            except Exception:
+                                pass
+
+                try:
+                    browser.close()
+                except Exception:
+                    pass
+        except BaseException as e:
+            if not started:
+                errors.append(e)
+                ready.set()
+                return
+            # 启动后异常退出：其余槽位继续处理队列，没有槽位时剩余任务立即失败
+            self._slot_exited(e)
+            return
+        if started:
+            self._slot_exited(None)
+
+
+# 进程内共享的浏览器池，跨多次运行复用以摊薄启动开销
+_shared_pool: Optional[BrowserPool] = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_shared_pool(size: int = 2) -> BrowserPool:
+    """
+    获取(必要时创建并预热)进程内共享的浏览器池
+
+    已有的共享池槽位数与 size 不同或已有槽位异常退出时重建：旧池在处理完已提交的任务后关闭。
+    """
+    global _shared_pool
+    with _shared_pool_lock:
+        pool = _shared_pool
+        if pool is None or not pool.started or pool.size != max(1, size) or not pool.health_check()["healthy"]:
+            if pool is not None and pool.started:
+                threading.Thread(target=pool.close, name="browser-pool-close", daemon=True).start()
+            _shared_pool = BrowserPool(size=size).start()
+        return _shared_pool
+
+
+def close_shared_pool() -> None:
+    """关闭进程内共享的浏览器池"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is not None:
+            _shared_pool.close()
+            _shared_pool = None
+
+
+# 只注册一次，退出时关闭当时的共享池，重建共享池不会累积退出处理函数
+atexit.register(close_shared_pool)
@@ -0,0 +1,340 @@
+"""
+转换结果缓存
+按输入HTML、引用的本地资源、后端名称/版本和转换参数的哈希缓存生成的PDF及结果元数据
+"""
+
+import dataclasses
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple, Union
+
+
+# 缓存格式变化时递增，使旧条目全部失效
+CACHE_FORMAT_VERSION = 1
+
+# HTML属性和CSS中引用外部资源的写法
+_ATTRIBUTE_REF = re.compile(r"""\b(?:src|href|data|poster)\s*=\s*["']([^"']+)["']""", re.IGNORECASE)
+_CSS_URL_REF = re.compile(r"""url\(\s*['"]?([^'")]+?)['"]?\s*\)""", re.IGNORECASE)
+_CSS_IMPORT_REF = re.compile(r"""@import\s+['"]([^'"]+)['"]""", re.IGNORECASE)
+
+# 不是本地文件的引用
+_NON_FILE_PREFIXES = ("data:", "http://", "https://", "ftp://", "mailto:", "javascript:", "about:", "#")
+
+# 只在这些类型的资源中继续查找引用
+_TEXT_RESOURCES = (".css", ".svg", ".html", ".htm")
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def find_references(content: str) -> Set[str]:
+    """HTML或CSS内容中引用的资源地址"""
+    refs = set()
+    for pattern in (_ATTRIBUTE_REF, _CSS_URL_REF, _CSS_IMPORT_REF):
+        refs.update(match.strip() for match in pattern.findall(content))
+    return refs
+
+
+def resource_fingerprint(content: bytes, base_dir: Optional[str], max_depth: int = 3) -> Dict[str, str]:
+    """
+    文档引用的本地资源的内容哈希
+
+    递归查找HTML、CSS、SVG中引用的本地文件；网络资源只记录URL，不获取内容。
+    引用的文件不存在时记为 "missing"，文件补上后缓存会失效。
+
+    Returns:
+        {资源路径或URL: 内容哈希、"remote" 或 "missing"}
+    """
+    fingerprint: Dict[str, str] = {}
+    pending = [(content, base_dir, 0)]
+    visited: Set[str] = set()
+
+    while pending:
+        data, directory, depth = pending.pop()
+        for ref in find_references(data.decode("utf-8", errors="replace")):
+            if ref.lower().startswith(("http://", "https://", "ftp://")):
+                fingerprint[ref] = "remote"
+                continue
+            if ref.lower().startswith(_NON_FILE_PREFIXES) or directory is None:
+                continue
+
+            path = ref[len("file://"):] if ref.startswith("file://") else ref
+            path = path.split("#", 1)[0].split("?", 1)[0]
+            if not path:
+                continue
+            path = os.path.normpath(os.path.join(directory, path))
+            if path in visited:
+                continue
+            visited.add(path)
+
+            if not os.path.isfile(path):
+                fingerprint[path] = "missing"
+                continue
+            fingerprint[path] = _file_digest(path)
+
+            if depth < max_depth and path.lower().endswith(_TEXT_RESOURCES):
+                with open(path, "rb") as f:
+                    pending.append((f.read(), os.path.dirname(path), depth + 1))
+
+    return fingerprint
+
+
+def _option_value(value: Any) -> Any:
+    """转换参数的可哈希表示；指向文件的字符串参数(如样式表路径)同时记录文件内容哈希"""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if isinstance(value, (list, tuple)):
+        return [_option_value(item) for item in value]
+    if isinstance(value, dict):
+        return {str(k): _option_value(v) for k, v in value.items()}
+    if isinstance(value, str) and os.path.isfile(value):
+        return {"path": value, "sha256": _file_digest(value)}
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    # 其他对象(浏览器池、会话等)只记录类型
+    return f"<{type(value).__name__}>"
+
+
+_backend_versions: Dict[str, str] = {}
+_versions_lock = threading.Lock()
+
+
+def backend_version(converter) -> str:
+    """
+    后端版本号，每种后端和参数组合在进程内只查询一次，查询失败时为 unknown
+
+    版本可能取决于参数(如 LibreOffice 的 soffice_binary)，因此按影响输出的参数分别查询。
+    """
+    key = f"{converter.name}:{sorted((k, repr(v)) for k, v in converter.output_options().items())}"
+    with _versions_lock:
+        if key not in _backend_versions:
+            try:
+                _backend_versions[key] = str(converter.version())
+            except Exception:
+                _backend_versions[key] = "unknown"
+        return _backend_versions[key]
+
+
+def conversion_key(converter, source: Union[str, bytes], extra: Optional[Dict[str, Any]] = None) -> str:
+    """
+    转换结果的内容指纹
+
+    输入HTML、引用的本地资源、后端名称和版本、影响输出的转换参数任一变化时指纹随之变化。
+
+    Args:
+        converter: 转换器实例，提供名称、版本和影响输出的参数
+        source: HTML文件路径或HTML字节内容
+        extra: 其他影响结果的参数，如基准测试的预热和测量次数
+    """
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            content = f.read()
+        base_dir = os.path.dirname(os.path.abspath(source))
+    else:
+        content = source
+        base_dir = None
+
+    payload = {
+        "format": CACHE_FORMAT_VERSION,
+        "html": hashlib.sha256(content).hexdigest(),
+        "resources": resource_fingerprint(content, base_dir),
+        "backend": converter.name,
+        "version": backend_version(converter),
+        "options": _option_value(converter.output_options()),
+        "extra": _option_value(extra or {})
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class ConversionCache:
+    """
+    内容寻址的转换结果缓存
+
+    缓存键为输入HTML、引用的本地资源、后端名称和版本、影响输出的转换参数共同的哈希。
+    每个条目保存PDF文件和转换结果的元数据(耗时、阶段耗时、资源占用等)，
+    目录结构为 objects/<键前两位>/<键>.pdf 和 .json。总大小超过上限时淘汰最久未使用的条目。
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 1024 * 1024 * 1024):
+        """
+        Args:
+            cache_dir: 缓存目录
+            max_bytes: PDF文件总字节数上限
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "time_saved": 0.0  # 命中缓存而省去的转换耗时(秒)
+        }
+
+        self._lock = threading.Lock()
+        self._index: Optional["OrderedDict[str, int]"] = None
+        self._total_bytes = 0
+
+        os.makedirs(os.path.join(cache_dir, "objects"), exist_ok=True)
+
+    @property
+    def hit_rate(self) -> float:
+        """缓存命中率(0-1)"""
+        total = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / total if total else 0.0
+
+    def key_for(self, converter, source: Union[str, bytes], extra: Optional[Dict[str, Any]] = None) -> str:
+        """计算缓存键，见 conversion_key"""
+        return conversion_key(converter, source, extra)
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        base = os.path.join(self.cache_dir, "objects", key[:2], key)
+        return base + ".pdf", base + ".json"
+
+    def _load_index(self) -> None:
+        """首次使用时扫描缓存目录，按最近访问时间建立LRU索引"""
+        if self._index is not None:
+            return
+
+        entries = []
+        objects_dir = os.path.join(self.cache_dir, "objects")
+        for prefix in os.listdir(objects_dir):
+            prefix_dir = os.path.join(objects_dir, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for filename in os.listdir(prefix_dir):
+                if not filename.endswith(".json"):
+                    continue
+                key = filename[:-len(".json")]
+                pdf_path, meta_path = self._paths(key)
+                try:
+                    entries.append((os.path.getmtime(meta_path), key, os.path.getsize(pdf_path)))
+                except OSError:
+                    continue
+
+        self._index = OrderedDict((key, size) for _, key, size in sorted(entries))
+        self._total_bytes = sum(self._index.values())
+
+    def get(self, key: str, output_path: str, sample_name: str):
+        """
+        查找缓存，命中时把PDF复制到 output_path
+
+        Returns:
+            命中时返回 ConversionResult，extra["cache"] 为 "hit"；未命中返回 None
+        """
+        from converters.base import ConversionResult
+
+        pdf_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+            shutil.copyfile(pdf_path, output_path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+
+        # 元数据文件的修改时间作为最近访问时间
+        try:
+            os.utime(meta_path, None)
+        except OSError:
+            pass
+
+        with self._lock:
+            self._load_index()
+            if key in self._index:
+                self._index.move_to_end(key)
+            self.stats["hits"] += 1
+            self.stats["time_saved"] += meta.get("time", 0.0)
+
+        extra = dict(meta.get("extra", {}))
+        extra["cache"] = "hit"
+        return ConversionResult(
+            sample_name=sample_name,
+            success=True,
+            time=meta.get("time", 0.0),
+            file_size=os.path.getsize(output_path),
+            file_path=output_path,
+            extra=extra
+        )
+
+    def put(self, key: str, result) -> None:
+        """保存成功的转换结果；失败的结果不缓存，下次重新转换"""
+        if not result.success or not result.file_path or not os.path.exists(result.file_path):
+            return
+
+        pdf_path, meta_path = self._paths(key)
+        size = os.path.getsize(result.file_path)
+        if size > self.max_bytes:
+            return
+
+        meta = {
+            "sample_name": result.sample_name,
+            "time": result.time,
+            "file_size": result.file_size,
+            "extra": {k: v for k, v in result.extra.items() if k != "cache"},
+            "created": time.time()
+        }
+
+        try:
+            os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
+            suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+            shutil.copyfile(result.file_path, pdf_path + suffix)
+            os.replace(pdf_path + suffix, pdf_path)
+            # 元数据最后写入，读取时以元数据文件存在作为条目完整的标志
+            with open(meta_path + suffix, "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False, default=str)
+            os.replace(meta_path + suffix, meta_path)
+        except OSError:
+            # 缓存写入失败不影响转换
+            return
+
+        with self._lock:
+            self._load_index()
+            if key in self._index:
+                self._total_bytes -= self._index.pop(key)
+            self._index[key] = size
+            self._total_bytes += size
+            self.stats["stores"] += 1
+            self._evict()
+
+    def _evict(self) -> None:
+        """淘汰最久未使用的条目，直到总大小回到上限以内(调用方持有锁)"""
+        while self._total_bytes > self.max_bytes and self._index:
+            key, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self.stats["evictions"] += 1
+
+    def clear(self) -> None:
+        """删除全部缓存条目"""
+        with self._lock:
+            shutil.rmtree(os.path.join(self.cache_dir, "objects"), ignore_errors=True)
+            os.makedirs(os.path.join(self.cache_dir, "objects"), exist_ok=True)
+            self._index = OrderedDict()
+            self._total_bytes = 0
+
+    def describe(self) -> str:
+        """缓存统计的单行描述"""
+        total = self.stats["hits"] + self.stats["misses"]
+        return (f"命中 {self.stats['hits']}/{total} ({self.hit_rate * 100:.1f}%), "
+                f"新增 {self.stats['stores']}, 淘汰 {self.stats['evictions']}, "
+                f"节省转换耗时 {self.stats['time_saved']:.2f}s")
@@ -0,0 +1,248 @@
+"""
+测试语料
+从目录、通配符或清单文件中发现HTML样例，按需逐个产出，避免一次性列出大型语料
+"""
+
+import fnmatch
+import glob
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+
+# 获取当前文件的目录，然后构建相对于src目录的路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.dirname(current_dir)  # 上一级目录就是src
+
+DEFAULT_SAMPLES_DIR = os.path.join(src_dir, "test_data", "samples")
+MANIFEST_NAMES = ("manifest.json", "manifest.jsonl")
+
+
+@dataclass
+class SampleSpec:
+    """单个样例的描述"""
+    name: str  # 样例名，相对语料根目录的路径，作为结果中的 sample_name
+    path: str  # HTML文件的绝对路径
+    weight: float = 1.0  # 评分权重
+    expected_pages: Optional[int] = None  # 预期页数，为空时按默认规则推断
+    tags: List[str] = field(default_factory=list)
+    description: str = ""
+    params: Dict[str, Any] = field(default_factory=dict)  # 附加元数据，如合成样例的生成参数和规模
+
+    @classmethod
+    def from_entry(cls, entry: Dict[str, Any], root: str) -> "SampleSpec":
+        """从清单条目创建，name 和 path 均相对于清单所在目录"""
+        name = entry.get("name") or entry["path"]
+        path = entry.get("path") or name
+        if not os.path.isabs(path):
+            path = os.path.join(root, path)
+        return cls(
+            name=name,
+            path=os.path.abspath(path),
+            weight=float(entry.get("weight", 1.0)),
+            expected_pages=entry.get("expected_pages"),
+            tags=list(entry.get("tags", [])),
+            description=entry.get("description", ""),
+            params=dict(entry.get("params", {}))
+        )
+
+
+def _iter_manifest(manifest_path: str) -> Iterator[SampleSpec]:
+    """
+    逐条读取清单
+
+    .jsonl 清单每行一个条目，逐行解析；.json 清单为 {"samples": [...]} 或条目列表，
+    需要整体解析，适合中小规模语料。
+    """
+    root = os.path.dirname(os.path.abspath(manifest_path))
+
+    if manifest_path.endswith(".jsonl"):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield SampleSpec.from_entry(json.loads(line), root)
+        return
+
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    entries = data.get("samples", []) if isinstance(data, dict) else data
+    for entry in entries:
+        yield SampleSpec.from_entry(entry, root)
+
+
+def _iter_directory(root: str, pattern: str, recursive: bool) -> Iterator[str]:
+    """按文件名顺序逐个产出目录中匹配的文件，相对 root 的路径"""
+    pending = [""]
+    while pending:
+        relative_dir = pending.pop(0)
+        with os.scandir(os.path.join(root, relative_dir)) as entries:
+            entries = sorted(entries, key=lambda entry: entry.name)
+        subdirs = []
+        for entry in entries:
+            relative = os.path.join(relative_dir, entry.name) if relative_dir else entry.name
+            if entry.is_dir():
+                if recursive:
+                    subdirs.append(relative)
+            elif fnmatch.fnmatch(entry.name, pattern):
+                yield relative
+        pending[0:0] = subdirs
+
+
+def find_manifest(directory: str) -> Optional[str]:
+    """目录中的清单文件路径"""
+    for manifest_name in MANIFEST_NAMES:
+        manifest_path = os.path.join(directory, manifest_name)
+        if os.path.isfile(manifest_path):
+            return manifest_path
+    return None
+
+
+class Corpus:
+    """
+    测试语料
+
+    语料只记录来源，每次迭代时重新扫描并逐个产出 SampleSpec，
+    因此包含数万个HTML文件的语料也不会被一次性加载到内存中。
+    """
+
+    def __init__(self, factory: Callable[[], Iterator[SampleSpec]], source: str = ""):
+        self._factory = factory
+        self.source = source
+        self._index: Optional[Dict[str, SampleSpec]] = None
+
+    def __iter__(self) -> Iterator[SampleSpec]:
+        return self._factory()
+
+    def __repr__(self) -> str:
+        return f"Corpus({self.source!r})"
+
+    @classmethod
+    def from_directory(cls, directory: str, pattern: str = "*.html", recursive: bool = False) -> "Corpus":
+        """
+        扫描目录中的HTML文件
+
+        目录中存在 manifest.json / manifest.jsonl 时，先按清单顺序产出清单中的样例
+        (带元数据)，再产出清单未列出的文件。
+        """
+        root = os.path.abspath(directory)
+
+        def factory() -> Iterator[SampleSpec]:
+            listed = set()
+            manifest_path = find_manifest(root)
+            if manifest_path:
+                for spec in _iter_manifest(manifest_path):
+                    listed.add(spec.name)
+                    yield spec
+            for relative in _iter_directory(root, pattern, recursive):
+                name = relative.replace(os.sep, "/")
+                if name not in listed:
+                    yield SampleSpec(name=name, path=os.path.join(root, relative))
+
+        return cls(factory, root)
+
+    @classmethod
+    def from_glob(cls, pattern: str, root: Optional[str] = None) -> "Corpus":
+        """
+        匹配通配符的HTML文件，支持 ** 递归匹配
+
+        Args:
+            pattern: 通配符，如 "corpus/**/*.html"
+            root: 样例名相对的目录，默认为通配符中第一个含通配字符的部分之前的目录
+        """
+        if root is None:
+            prefix = []
+            for part in pattern.split("/"):
+                if glob.has_magic(part):
+                    break
+                prefix.append(part)
+            root = "/".join(prefix) or "."
+        root = os.path.abspath(root)
+
+        def factory() -> Iterator[SampleSpec]:
+            for path in glob.iglob(pattern, recursive=True):
+                if os.path.isfile(path):
+                    path = os.path.abspath(path)
+                    yield SampleSpec(name=os.path.relpath(path, root).replace(os.sep, "/"), path=path)
+
+        return cls(factory, pattern)
+
+    @classmethod
+    def from_manifest(cls, manifest_path: str) -> "Corpus":
+        """读取清单文件中列出的样例"""
+        manifest_path = os.path.abspath(manifest_path)
+        return cls(lambda: _iter_manifest(manifest_path), manifest_path)
+
+    @classmethod
+    def from_names(cls, names: Iterable[str], directory: str = DEFAULT_SAMPLES_DIR) -> "Corpus":
+        """指定目录中的若干样例，元数据取自该目录的清单"""
+        names = list(names)
+        root = os.path.abspath(directory)
+
+        def factory() -> Iterator[SampleSpec]:
+            metadata = {}
+            manifest_path = find_manifest(root)
+            if manifest_path:
+                metadata = {spec.name: spec for spec in _iter_manifest(manifest_path) if spec.name in names}
+            for name in names:
+                yield metadata.get(name) or SampleSpec(name=name, path=os.path.join(root, name))
+
+        return cls(factory, root)
+
+    @classmethod
+    def from_source(cls, source: str) -> "Corpus":
+        """按来源自动选择：目录、清单文件(.json/.jsonl)或通配符"""
+        if os.path.isdir(source):
+            return cls.from_directory(source)
+        if source.endswith((".json", ".jsonl")) and os.path.isfile(source):
+            return cls.from_manifest(source)
+        return cls.from_glob(source)
+
+    def filter(self, tags: Iterable[str]) -> "Corpus":
+        """只保留带有任一指定标签的样例"""
+        tags = set(tags)
+        return Corpus(lambda: (spec for spec in self if tags & set(spec.tags)), f"{self.source}[{','.join(sorted(tags))}]")
+
+    def subset(self, names: Iterable[str]) -> "Corpus":
+        """只保留指定名称的样例，保持语料顺序"""
+        names = set(names)
+        return Corpus(lambda: (spec for spec in self if spec.name in names), f"{self.source}[{len(names)} samples]")
+
+    def names(self) -> Iterator[str]:
+        for spec in self:
+            yield spec.name
+
+    def get(self, name: str) -> Optional[SampleSpec]:
+        """按样例名查找元数据，首次调用时遍历语料建立索引"""
+        if self._index is None:
+            self._index = {spec.name: spec for spec in self}
+        return self._index.get(name)
+
+
+def as_corpus(samples: Any = None, directory: str = DEFAULT_SAMPLES_DIR) -> Corpus:
+    """
+    将各种样例来源统一为 Corpus
+
+    Args:
+        samples: None(扫描 directory)、Corpus、目录/清单/通配符字符串，或样例名列表
+        directory: samples 为空或为样例名列表时使用的样例目录
+    """
+    if samples is None:
+        return Corpus.from_directory(directory)
+    if isinstance(samples, Corpus):
+        return samples
+    if isinstance(samples, str):
+        return Corpus.from_source(samples)
+    return Corpus.from_names(samples, directory)
+
+
+_default_corpus: Optional[Corpus] = None
+
+
+def default_corpus() -> Corpus:
+    """内置的测试样例语料"""
+    global _default_corpus
+    if _default_corpus is None:
+        _default_corpus = Corpus.from_directory(DEFAULT_SAMPLES_DIR)
+    return _default_corpus
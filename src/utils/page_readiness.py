@@ -0,0 +1,120 @@
+"""
+页面就绪检测
+替代固定时长的等待，在页面真正稳定后立即开始输出PDF
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict
+
+
+# 在页面内执行的就绪检测脚本，返回各项信号的结果
+# 所有等待共享同一个截止时间，保证总耗时不超过 maxWaitMs
+READINESS_SCRIPT = """
+async ({ fonts, quietMs, flag, maxWaitMs }) => {
+    const deadline = performance.now() + maxWaitMs;
+    const remaining = () => Math.max(0, deadline - performance.now());
+    const sleep = (ms) => new Promise(resolve => setTimeout(() => resolve('timeout'), ms));
+    const signals = {};
+
+    if (fonts && document.fonts) {
+        signals.fonts = await Promise.race([
+            document.fonts.ready.then(() => 'ready'),
+            sleep(remaining())
+        ]);
+    }
+
+    // 仅当页面主动声明了就绪标志时才等待，未声明的页面不受影响
+    if (flag && flag in window) {
+        while (!window[flag] && remaining() > 0) {
+            await sleep(Math.min(25, remaining()));
+        }
+        signals.flag = window[flag] ? 'ready' : 'timeout';
+    }
+
+    if (quietMs > 0) {
+        signals.dom = await new Promise(resolve => {
+            let quietTimer = null;
+            let ceilingTimer = null;
+            const observer = new MutationObserver(() => {
+                clearTimeout(quietTimer);
+                quietTimer = setTimeout(() => done('quiet'), quietMs);
+            });
+            const done = (reason) => {
+                observer.disconnect();
+                clearTimeout(quietTimer);
+                clearTimeout(ceilingTimer);
+                resolve(reason);
+            };
+            observer.observe(document, {
+                subtree: true, childList: true, attributes: true, characterData: true
+            });
+            quietTimer = setTimeout(() => done('quiet'), Math.min(quietMs, remaining()));
+            ceilingTimer = setTimeout(() => done('timeout'), remaining());
+        });
+    }
+
+    return signals;
+}
+"""
+
+
+@dataclass
+class ReadinessStrategy:
+    """页面就绪检测策略"""
+    network_idle: bool = True  # 等待网络空闲(500ms内无请求)
+    fonts: bool = True  # 等待 document.fonts.ready
+    dom_quiet_ms: int = 100  # DOM无变化持续该时长视为稳定，0表示不检测
+    ready_flag: str = "__pdfReady"  # 页面可选声明的就绪标志，空字符串表示不检测
+    max_wait_ms: int = 5000  # 总等待时间上限
+
+    def _script_args(self, elapsed_ms: float) -> Dict[str, Any]:
+        return {
+            "fonts": self.fonts,
+            "quietMs": self.dom_quiet_ms,
+            "flag": self.ready_flag,
+            "maxWaitMs": max(0, self.max_wait_ms - elapsed_ms)
+        }
+
+    def wait(self, page) -> Dict[str, Any]:
+        """
+        等待同步API页面就绪
+
+        Returns:
+            各项就绪信号的结果及实际等待时间(秒)
+        """
+        start = time.perf_counter()
+        signals: Dict[str, Any] = {}
+
+        if self.network_idle:
+            try:
+                page.wait_for_load_state("networkidle", timeout=self.max_wait_ms)
+                signals["network"] = "idle"
+            except Exception:
+                signals["network"] = "timeout"
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        signals.update(page.evaluate(READINESS_SCRIPT, self._script_args(elapsed_ms)) or {})
+        signals["waited"] = time.perf_counter() - start
+        return signals
+
+    async def wait_async(self, page) -> Dict[str, Any]:
+        """等待异步API页面就绪，返回值同 wait"""
+        start = time.perf_counter()
+        signals: Dict[str, Any] = {}
+
+        if self.network_idle:
+            try:
+                await page.wait_for_load_state("networkidle", timeout=self.max_wait_ms)
+                signals["network"] = "idle"
+            except Exception:
+                signals["network"] = "timeout"
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        signals.update(await page.evaluate(READINESS_SCRIPT, self._script_args(elapsed_ms)) or {})
+        signals["waited"] = time.perf_counter() - start
+        return signals
+
+
+# 默认策略：网络空闲 + 字体加载 + DOM静默 + 可选就绪标志
+DEFAULT_READINESS = ReadinessStrategy()
@@ -3,11 +3,31 @@ PDF内容分析器
 基于实际PDF文件内容提取客观评估指标
 """
 
+import hashlib
+import multiprocessing
 import os
 import re
-from typing import Dict, List, Tuple, Any
+import signal
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple, Any
 from PyPDF2 import PdfReader
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+from utils.pdf_page_walker import (
+    ContentOperatorCollector, FontCollector, PageWalker, TextStatsCollector, XObjectCollector
+)
+from utils.pdf_structure import StructureScanError, scan_pdf_structure
+
+
+# 分析器版本，分析逻辑或结果字段变化时递增，使分析结果缓存中的旧条目失效
+ANALYZER_VERSION = 1
+
+# 默认保留的文本样本长度(字符)
+TEXT_SAMPLE_CHARS = 2000
+
+# 表单被转换为文本时常见的关键词，用于评估表单支持
+FORM_KEYWORDS = ('input', 'button', 'submit', 'form', 'field', 'text', 'email', 'password')
 
 
 @dataclass
@@ -16,7 +36,7 @@ class PDFAnalysisResult:
     file_path: str
     file_size: int  # 文件大小(字节)
     page_count: int  # 页数
-    text_content: str  # 提取的文本内容
+    text_content: str  # 提取的文本内容；默认只保留开头的样本，keep_full_text 时为全文
     text_length: int  # 文本长度
     has_images: bool  # 是否包含图片
     has_fonts: bool  # 是否包含字体信息
@@ -27,15 +47,86 @@ class PDFAnalysisResult:
     content_density: float  # 内容密度(文本长度/文件大小)
     compression_ratio: float  # 压缩比估算
     error_message: str = ""
+    text_digest: str = ""  # 全文的SHA-256摘要
+    text_truncated: bool = False  # text_content 是否只是样本
+    keywords_found: List[str] = field(default_factory=list)  # 文本中出现的关键词(小写)
+    structure_only: bool = False  # 只做了结构分析，文本相关字段为空
+
+
+# 工作进程内的状态，由初始化函数填充
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_worker(analyzer: "PDFAnalyzer", timeout: float) -> None:
+    """工作进程初始化：保存本进程使用的分析器和单文件超时"""
+    _worker_state["analyzer"] = analyzer
+    _worker_state["timeout"] = timeout
+
+
+def _on_task_timeout(signum, frame):
+    raise TimeoutError("分析超时")
+
+
+def _analyze_with_timeout(analyzer: "PDFAnalyzer", file_path: str, timeout: Optional[float]) -> "PDFAnalysisResult":
+    """分析单个文件，超时或异常时返回带错误信息的结果"""
+    # PyPDF2 是纯Python解析，进程定时器可以打断；只有主线程能接收信号
+    use_alarm = (bool(timeout) and hasattr(signal, "setitimer")
+                 and threading.current_thread() is threading.main_thread())
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _on_task_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    try:
+        return analyzer.analyze_pdf(file_path)
+    except TimeoutError:
+        return analyzer.failed_result(file_path, f"分析超时(超过{timeout:.0f}秒)")
+    except Exception as e:
+        return analyzer.failed_result(file_path, str(e))
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+
+def analyze_in_worker(file_path: str) -> "PDFAnalysisResult":
+    """在工作进程中分析单个文件"""
+    return _analyze_with_timeout(_worker_state["analyzer"], file_path, _worker_state.get("timeout"))
 
 
 class PDFAnalyzer:
     """PDF内容分析器"""
     
-    def __init__(self):
+    def __init__(self, keep_full_text: bool = False, text_sample_chars: int = TEXT_SAMPLE_CHARS,
+                 keywords: Tuple[str, ...] = FORM_KEYWORDS, cache=None, extract_text: bool = True):
+        """
+        Args:
+            keep_full_text: 是否在结果中保存全文；默认逐页流式统计，只保留开头的文本样本和全文摘要
+            text_sample_chars: 保留的文本样本长度
+            keywords: 检测是否出现在文本中的关键词
+            cache: AnalysisCache，analyze_many 对内容未变化的PDF直接使用缓存的分析结果
+            extract_text: 是否提取文本；为 False 时只做结构分析(页数、字体、图片、表单)，
+                由 pdf_structure 直接扫描PDF对象，无法扫描时回退到 PdfReader
+        """
+        self.cache = cache
+        self.extract_text = extract_text
+        self.keep_full_text = keep_full_text
+        self.text_sample_chars = text_sample_chars
+        self.keywords = tuple(keywords)
         self.chinese_pattern = re.compile(r'[\u4e00-\u9fff]')
         self.special_char_pattern = re.compile(r'[^\w\s\u4e00-\u9fff]')
     
+    def __getstate__(self) -> Dict[str, Any]:
+        # 分析器会被传给工作进程，缓存的数据库连接只在评估进程中使用
+        state = dict(self.__dict__)
+        state['cache'] = None
+        return state
+    
+    @property
+    def cache_key(self) -> str:
+        """分析器版本和影响结果的参数，作为分析结果缓存键的一部分"""
+        options = f"v{ANALYZER_VERSION}|text={int(self.extract_text)}|full={int(self.keep_full_text)}|sample={self.text_sample_chars}|kw={','.join(self.keywords)}"
+        return hashlib.sha256(options.encode('utf-8')).hexdigest()[:16]
+    
     def analyze_pdf(self, file_path: str) -> PDFAnalysisResult:
         """
         分析PDF文件，提取客观指标
@@ -46,6 +137,9 @@ class PDFAnalyzer:
         Returns:
             PDF分析结果
         """
+        if not self.extract_text:
+            return self.analyze_structure(file_path)
+        
         try:
             # 基本文件信息
             file_size = os.path.getsize(file_path)
@@ -54,29 +148,33 @@ class PDFAnalyzer:
             with open(file_path, 'rb') as file:
                 pdf_reader = PdfReader(file)
                 
-                # 页数
-                page_count = len(pdf_reader.pages)
-                
-                # 提取文本内容
-                text_content = ""
-                for page in pdf_reader.pages:
-                    text_content += page.extract_text()
-                
-                text_length = len(text_content)
+                # 单次遍历所有页面，同时提取文本、XObject、字体和内容流操作符
+                text = TextStatsCollector(
+                    patterns={'chinese': self.chinese_pattern, 'special': self.special_char_pattern},
+                    keywords=self.keywords,
+                    sample_chars=self.text_sample_chars,
+                    keep_full_text=self.keep_full_text
+                )
+                xobjects = XObjectCollector()
+                fonts = FontCollector()
+                operators = ContentOperatorCollector()
+                page_count = PageWalker([text, xobjects, fonts, operators]).walk(pdf_reader)
                 
-                # 分析中文字符
-                chinese_chars = self.chinese_pattern.findall(text_content)
-                chinese_char_count = len(chinese_chars)
+                # 文本提取失败时整个文件视为无法分析
+                if text.error:
+                    raise RuntimeError(text.error)
+                text_content = text.text
+                text_length = text.length
                 
-                # 分析特殊字符
-                special_chars = self.special_char_pattern.findall(text_content)
-                special_char_count = len(special_chars)
+                # 中文字符和特殊字符在遍历时逐页计数
+                chinese_char_count = text.counts['chinese']
+                special_char_count = text.counts['special']
                 
-                # 检查是否有图片(通过检查PDF对象)
-                has_images = self._check_images(pdf_reader)
+                # 是否有图片：页面资源中有图片/Form XObject，否则看内容流中是否有图形绘制命令
+                has_images = not xobjects.error and (xobjects.has_graphics or bool(operators.found))
                 
                 # 检查字体信息
-                font_info = self._analyze_fonts(pdf_reader)
+                font_info = self._font_info(fonts, text_length)
                 has_fonts = font_info['has_fonts']
                 font_count = font_info['font_count']
                 
@@ -103,106 +201,187 @@ class PDFAnalyzer:
                     special_char_count=special_char_count,
                     form_field_count=form_field_count,
                     content_density=content_density,
-                    compression_ratio=compression_ratio
+                    compression_ratio=compression_ratio,
+                    text_digest=text.digest,
+                    text_truncated=text.truncated,
+                    keywords_found=sorted(text.keywords_found)
                 )
                 
         except Exception as e:
+            return self.failed_result(file_path, str(e))
+    
+    def analyze_structure(self, file_path: str) -> PDFAnalysisResult:
+        """
+        只分析PDF结构(页数、字体、图片、表单)，不提取文本
+        
+        优先按交叉引用直接读取页面树和资源字典，不构造PyPDF2对象树；加密或无法扫描的文件回退到 PdfReader 遍历页面资源。
+        图片只按页面资源中的图片/Form XObject判断，不解码内容流。
+        """
+        try:
+            file_size = os.path.getsize(file_path)
+            try:
+                structure = scan_pdf_structure(file_path)
+                page_count = structure.page_count
+                has_images = structure.has_images
+                font_count = len(structure.font_names)
+                form_field_count = structure.form_field_count
+            except StructureScanError:
+                with open(file_path, 'rb') as file:
+                    pdf_reader = PdfReader(file)
+                    xobjects = XObjectCollector()
+                    fonts = FontCollector()
+                    page_count = PageWalker([xobjects, fonts]).walk(pdf_reader)
+                    has_images = not xobjects.error and xobjects.has_graphics
+                    font_count = self._font_info(fonts, 0)['font_count']
+                    form_field_count = self._count_form_fields(pdf_reader)
+            
             return PDFAnalysisResult(
                 file_path=file_path,
-                file_size=file_size if 'file_size' in locals() else 0,
-                page_count=0,
+                file_size=file_size,
+                page_count=page_count,
                 text_content="",
                 text_length=0,
-                has_images=False,
-                has_fonts=False,
-                font_count=0,
+                has_images=has_images,
+                has_fonts=font_count > 0,
+                font_count=font_count,
                 chinese_char_count=0,
                 special_char_count=0,
-                form_field_count=0,
+                form_field_count=form_field_count,
                 content_density=0,
                 compression_ratio=0,
-                error_message=str(e)
+                structure_only=True
             )
-    
-    def _check_images(self, pdf_reader: PdfReader) -> bool:
-        """检查PDF是否包含图片"""
-        try:
-            for page in pdf_reader.pages:
-                resources = page.get('/Resources', {})
-                if hasattr(resources, 'get_object'):
-                    resources = resources.get_object()
-                
-                if '/XObject' in resources:
-                    xobjects = resources['/XObject']
-                    if hasattr(xobjects, 'get_object'):
-                        xobjects = xobjects.get_object()
-                    
-                    for obj_name in xobjects:
-                        obj = xobjects[obj_name]
-                        if hasattr(obj, 'get_object'):
-                            obj = obj.get_object()
-                        
-                        if obj.get('/Subtype') == '/Image':
-                            return True
-                        # 检查Form XObject (可能包含图形内容)
-                        elif obj.get('/Subtype') == '/Form':
-                            return True
-            
-            # 如果没有找到XObject，检查是否有图形相关的内容
-            # 通过检查页面内容流中是否有图形操作符
-            for page in pdf_reader.pages:
-                try:
-                    if hasattr(page, 'get_contents'):
-                        contents = page.get_contents()
-                        if contents:
-                            if hasattr(contents, 'get_object'):
-                                contents = contents.get_object()
-                            if hasattr(contents, 'get_data'):
-                                content_data = contents.get_data().decode('latin-1', errors='ignore')
-                                # 检查是否有图形绘制命令
-                                if any(cmd in content_data for cmd in ['Do', 're', 'f', 'S', 'B']):
-                                    return True
-                except:
-                    pass
-            
-            return False
         except Exception as e:
-            # 如果检测失败，根据文件名判断
-            return False
+            return self.failed_result(file_path, str(e))
     
-    def _analyze_fonts(self, pdf_reader: PdfReader) -> Dict[str, Any]:
-        """分析PDF字体信息"""
+    def failed_result(self, file_path: str, error_message: str) -> PDFAnalysisResult:
+        """无法分析的文件对应的结果"""
         try:
-            fonts = set()
-            for page in pdf_reader.pages:
-                resources = page.get('/Resources', {})
-                if hasattr(resources, 'get_object'):
-                    resources = resources.get_object()
-                
-                if '/Font' in resources:
-                    font_dict = resources['/Font']
-                    if hasattr(font_dict, 'get_object'):
-                        font_dict = font_dict.get_object()
-                    
-                    for font_name in font_dict:
-                        fonts.add(font_name)
+            file_size = os.path.getsize(file_path)
+        except OSError:
+            file_size = 0
+        return PDFAnalysisResult(
+            file_path=file_path,
+            file_size=file_size,
+            page_count=0,
+            text_content="",
+            text_length=0,
+            has_images=False,
+            has_fonts=False,
+            font_count=0,
+            chinese_char_count=0,
+            special_char_count=0,
+            form_field_count=0,
+            content_density=0,
+            compression_ratio=0,
+            error_message=error_message
+        )
+    
+    def analyze_many(self, paths: Sequence[str], workers: Optional[int] = None,
+                     timeout: float = 60.0) -> List[PDFAnalysisResult]:
+        """
+        使用进程池并行分析多个PDF文件
+        
+        PyPDF2 的解析是受GIL限制的纯Python计算，多进程可以用满所有CPU核。
+        单个文件的异常和超时只影响该文件的结果；若某个工作进程卡死或崩溃，
+        在其余文件完成后强制结束进程池，未完成的文件换新的进程池重试一次，
+        仍未完成的记为失败。
+        
+        Args:
+            paths: PDF文件路径列表
+            workers: 工作进程数，默认为CPU核数；为1或文件少于2个时在当前进程中分析
+            timeout: 单个文件的超时时间(秒)
             
+        Returns:
+            按输入顺序排列的分析结果
+        """
+        paths = list(paths)
+        results: List[Optional[PDFAnalysisResult]] = [None] * len(paths)
+        
+        # 内容未变化的PDF直接使用缓存的分析结果
+        if self.cache is not None:
+            for index, path in enumerate(paths):
+                cached = self.cache.get(path, self.cache_key)
+                if cached is not None:
+                    results[index] = PDFAnalysisResult(**cached)
+        missing = [index for index, result in enumerate(results) if result is None]
+        
+        remaining = missing
+        workers = max(1, min(workers or os.cpu_count() or 1, len(missing) or 1))
+        if workers == 1 or len(missing) < 2:
+            for index in missing:
+                results[index] = _analyze_with_timeout(self, paths[index], timeout)
+            remaining = []
+        
+        for attempt in range(2):
+            if not remaining:
+                break
+            remaining = self._analyze_round(paths, remaining, results, workers, timeout)
+        
+        for index in remaining:
+            results[index] = self.failed_result(
+                paths[index], f"分析超时(超过{timeout:.0f}秒)或工作进程异常退出，工作进程已被终止"
+            )
+        
+        if self.cache is not None:
+            for index in missing:
+                self.cache.put(paths[index], self.cache_key, results[index])
+        return results
+    
+    def _analyze_round(self, paths: List[str], indices: List[int], results: List[Optional[PDFAnalysisResult]],
+                       workers: int, timeout: float) -> List[int]:
+        """用一个进程池分析指定的文件，结果写入 results，返回未能完成的文件序号"""
+        pool = multiprocessing.Pool(
+            processes=min(workers, len(indices)),
+            initializer=_init_worker,
+            initargs=(self, timeout)
+        )
+        pending = [(index, pool.apply_async(analyze_in_worker, (paths[index],))) for index in indices]
+        
+        # 单个文件由工作进程内的定时器限时，正常情况下总有任务在 timeout 内完成；
+        # 崩溃的工作进程会被进程池替换，但它的任务不会再返回，因此以"长时间没有任何任务完成"判定卡死
+        stall_limit = timeout + 10
+        last_progress = time.perf_counter()
+        completed = 0
+        
+        unfinished = []
+        hung = False
+        for index, async_result in pending:
+            while not hung and not async_result.ready():
+                async_result.wait(1.0)
+                done = sum(1 for _, other in pending if other.ready())
+                if done > completed:
+                    completed = done
+                    last_progress = time.perf_counter()
+                elif time.perf_counter() - last_progress > stall_limit:
+                    hung = True
+            if not async_result.ready():
+                unfinished.append(index)
+                continue
+            try:
+                results[index] = async_result.get()
+            except Exception as e:
+                results[index] = self.failed_result(paths[index], f"工作进程异常: {e}")
+        
+        if hung:
+            pool.terminate()
+        else:
+            pool.close()
+        pool.join()
+        return unfinished
+    
+    def _font_info(self, fonts: FontCollector, text_length: int) -> Dict[str, Any]:
+        """汇总字体信息"""
+        if not fonts.error:
             return {
-                'has_fonts': len(fonts) > 0,
-                'font_count': len(fonts),
-                'fonts': list(fonts)
+                'has_fonts': len(fonts.fonts) > 0,
+                'font_count': len(fonts.fonts),
+                'fonts': list(fonts.fonts)
             }
-        except Exception as e:
-            # 如果出错，尝试简单检测
-            try:
-                for page in pdf_reader.pages:
-                    page_text = page.extract_text()
-                    if page_text and len(page_text) > 0:
-                        # 如果能提取到文本，说明有字体
-                        return {'has_fonts': True, 'font_count': 1, 'fonts': ['default']}
-                return {'has_fonts': False, 'font_count': 0, 'fonts': []}
-            except:
-                return {'has_fonts': False, 'font_count': 0, 'fonts': []}
+        # 字体资源无法解析时，能提取到文本说明有字体
+        if text_length > 0:
+            return {'has_fonts': True, 'font_count': 1, 'fonts': ['default']}
+        return {'has_fonts': False, 'font_count': 0, 'fonts': []}
     
     def _count_form_fields(self, pdf_reader: PdfReader) -> int:
         """统计表单字段数量"""
@@ -0,0 +1,216 @@
+"""
+PDF页面遍历器
+每个页面只访问一次、只解析一次 /Resources，由可插拔的收集器从同一次遍历中提取文本、XObject、字体和内容流操作符
+"""
+
+import hashlib
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+
+def resolve(obj: Any) -> Any:
+    """解析间接引用"""
+    if hasattr(obj, "get_object"):
+        return obj.get_object()
+    return obj
+
+
+class PageCollector:
+    """
+    页面收集器基类
+
+    子类实现 visit_page，在遍历每个页面时被调用；设置 done 后不再被调用。
+    单个收集器出错只记录在 error 中并停止该收集器，不影响其余收集器。
+    """
+    name = "collector"
+
+    def __init__(self):
+        self.done = False
+        self.error = ""
+
+    def visit_page(self, page: Any, resources: Dict[str, Any], page_index: int) -> None:
+        raise NotImplementedError
+
+    def finish(self) -> None:
+        """遍历结束后调用，用于汇总结果"""
+
+
+class TextStatsCollector(PageCollector):
+    """
+    逐页流式统计文本，不保存全文
+
+    每页提取的文本只用于更新计数、摘要和关键词，随后即可释放，千页文档的内存占用也保持平稳。
+    只保留开头 sample_chars 个字符作为样本；keep_full_text 时另外保存全文。
+    """
+    name = "text_stats"
+
+    def __init__(self, patterns: Optional[Dict[str, "re.Pattern"]] = None, keywords: Sequence[str] = (),
+                 sample_chars: int = 2000, keep_full_text: bool = False):
+        """
+        Args:
+            patterns: {计数名: 单字符正则}，统计每个正则在全文中的匹配数
+            keywords: 需要检测是否出现的关键词(不区分大小写)
+            sample_chars: 保留的文本样本长度
+            keep_full_text: 是否保存全文
+        """
+        super().__init__()
+        self.patterns = patterns or {}
+        self.keywords = tuple(keyword.lower() for keyword in keywords)
+        self.sample_chars = sample_chars
+        self.keep_full_text = keep_full_text
+
+        self.length = 0
+        self.counts: Dict[str, int] = {name: 0 for name in self.patterns}
+        self.keywords_found: Set[str] = set()
+        self.sample = ""
+        self.parts: List[str] = []
+        self._digest = hashlib.sha256()
+        # 上一页末尾的小写文本，用于匹配跨页的关键词
+        self._tail = ""
+        self._tail_chars = max((len(keyword) for keyword in self.keywords), default=1) - 1
+
+    def visit_page(self, page, resources, page_index):
+        page_text = page.extract_text() or ""
+        if not page_text:
+            return
+
+        self.length += len(page_text)
+        for name, pattern in self.patterns.items():
+            self.counts[name] += len(pattern.findall(page_text))
+        self._digest.update(page_text.encode("utf-8", errors="surrogatepass"))
+
+        if len(self.sample) < self.sample_chars:
+            self.sample += page_text[:self.sample_chars - len(self.sample)]
+        if self.keep_full_text:
+            self.parts.append(page_text)
+
+        if len(self.keywords_found) < len(self.keywords):
+            lowered = self._tail + page_text.lower()
+            self.keywords_found.update(keyword for keyword in self.keywords if keyword in lowered)
+            self._tail = lowered[-self._tail_chars:] if self._tail_chars else ""
+
+    @property
+    def digest(self) -> str:
+        """全文的SHA-256摘要"""
+        return self._digest.hexdigest()
+
+    @property
+    def text(self) -> str:
+        """keep_full_text 时为全文，否则为文本样本"""
+        return "".join(self.parts) if self.keep_full_text else self.sample
+
+    @property
+    def truncated(self) -> bool:
+        """text 是否短于全文"""
+        return len(self.text) < self.length
+
+
+class XObjectCollector(PageCollector):
+    """统计页面资源中的图片和Form XObject"""
+    name = "xobjects"
+
+    def __init__(self):
+        super().__init__()
+        self.image_count = 0
+        self.form_count = 0
+
+    def visit_page(self, page, resources, page_index):
+        xobjects = resolve(resources.get("/XObject")) if "/XObject" in resources else None
+        if not xobjects:
+            return
+        for obj_name in xobjects:
+            subtype = resolve(xobjects[obj_name]).get("/Subtype")
+            if subtype == "/Image":
+                self.image_count += 1
+            elif subtype == "/Form":
+                # Form XObject 可能包含图形内容
+                self.form_count += 1
+
+    @property
+    def has_graphics(self) -> bool:
+        return self.image_count > 0 or self.form_count > 0
+
+
+class FontCollector(PageCollector):
+    """收集页面资源中的字体名称"""
+    name = "fonts"
+
+    def __init__(self):
+        super().__init__()
+        self.fonts: Set[str] = set()
+
+    def visit_page(self, page, resources, page_index):
+        if "/Font" in resources:
+            for font_name in resolve(resources["/Font"]):
+                self.fonts.add(font_name)
+
+
+class ContentOperatorCollector(PageCollector):
+    """
+    检查内容流中出现的图形操作符
+
+    与原有检测一致按子串匹配；stop_when_found 时找到后不再解码后续页面的内容流。
+    """
+    name = "operators"
+
+    def __init__(self, operators: Sequence[str] = ("Do", "re", "f", "S", "B"), stop_when_found: bool = True):
+        super().__init__()
+        self.operators = tuple(operators)
+        self.stop_when_found = stop_when_found
+        self.found: Set[str] = set()
+
+    def visit_page(self, page, resources, page_index):
+        try:
+            contents = page.get_contents() if hasattr(page, "get_contents") else None
+            contents = resolve(contents) if contents else None
+            if contents is None or not hasattr(contents, "get_data"):
+                return
+            content_data = contents.get_data().decode("latin-1", errors="ignore")
+        except Exception:
+            # 单页内容流无法解码时跳过该页
+            return
+
+        self.found.update(op for op in self.operators if op in content_data)
+        if self.found and self.stop_when_found:
+            self.done = True
+
+
+class PageWalker:
+    """单次遍历PDF页面，把每页及其解析后的资源字典交给所有收集器"""
+
+    def __init__(self, collectors: Iterable[PageCollector]):
+        self.collectors = list(collectors)
+
+    def walk(self, pdf_reader: Any, pages: Optional[Iterable[Any]] = None) -> int:
+        """
+        遍历页面
+
+        Args:
+            pdf_reader: PdfReader
+            pages: 要遍历的页面，默认为全部页面
+
+        Returns:
+            遍历的页数
+        """
+        page_count = 0
+        for page_index, page in enumerate(pages if pages is not None else pdf_reader.pages):
+            page_count += 1
+            active = [collector for collector in self.collectors if not collector.done]
+            if not active:
+                continue
+
+            try:
+                resources = resolve(page.get("/Resources", {})) or {}
+            except Exception:
+                resources = {}
+
+            for collector in active:
+                try:
+                    collector.visit_page(page, resources, page_index)
+                except Exception as e:
+                    collector.error = str(e)
+                    collector.done = True
+
+        for collector in self.collectors:
+            collector.finish()
+        return page_count
@@ -0,0 +1,521 @@
+"""
+PDF结构快速扫描
+内存映射PDF文件，按 startxref、交叉引用表(含交叉引用流)和 trailer 定位对象，
+只解析页面树、资源字典和表单所需的对象统计页数、字体、图片XObject和表单，
+不构造PyPDF2对象树，也不解码页面内容流
+"""
+
+import mmap
+import re
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+
+class StructureScanError(ValueError):
+    """无法快速扫描的PDF(加密、交叉引用损坏、对象流使用不支持的编码等)，应回退到 PdfReader"""
+
+
+class Ref(NamedTuple):
+    """间接引用 n g R"""
+    number: int
+    generation: int = 0
+
+
+_STARTXREF_RE = re.compile(rb"startxref\s+(\d+)")
+_OBJ_HEADER_RE = re.compile(rb"\s*(\d+)\s+(\d+)\s+obj")
+_SUBSECTION_RE = re.compile(rb"\s*(\d+)\s+(\d+)")
+_ENTRY_RE = re.compile(rb"\s*(\d{1,10})\s+(\d{1,5})\s+([nf])")
+
+_WHITESPACE_RE = re.compile(rb"(?:[\s\0]+|%[^\r\n]*)*")
+# 一次匹配一个记号及其前面的空白和注释
+_TOKEN_RE = re.compile(rb"""
+    (?:[\s\0]+|%[^\r\n]*)*
+    (?:(?P<ref>\d+\s+\d+\s+R)(?![^\s\0()<>\[\]{}/%])
+    | (?P<number>[+-]?(?:\d+\.?\d*|\.\d+))
+    | (?P<name>/[^\s\0()<>\[\]{}/%]*)
+    | (?P<open><<|\[)
+    | (?P<close>>>|\])
+    | (?P<hex><[^>]*>)
+    | (?P<string>\()
+    | (?P<keyword>[^\s\0()<>\[\]{}/%]+))
+""", re.VERBOSE)
+_KEYWORDS = {b"true": True, b"false": False, b"null": None}
+
+# 页面树的最大深度，防止循环引用
+MAX_TREE_DEPTH = 64
+
+
+@dataclass
+class PDFStructure:
+    """PDF结构扫描结果"""
+    page_count: int
+    font_names: Set[str] = field(default_factory=set)  # 资源字典中的字体名称(如 F1)
+    image_count: int = 0  # 页面资源引用的图片XObject数量，按页面引用计数
+    form_xobject_count: int = 0  # 页面资源引用的Form XObject数量，按页面引用计数
+    has_acroform: bool = False
+    form_field_count: int = 0  # 文本表单字段数量
+    object_count: int = 0  # 交叉引用中使用中的对象数
+    object_stream_count: int = 0
+
+    @property
+    def has_images(self) -> bool:
+        return self.image_count > 0 or self.form_xobject_count > 0
+
+
+class _Parser:
+    """PDF对象语法的最小解析器，只解析字典、数组、名称、数字、字符串和间接引用"""
+
+    def __init__(self, data, pos: int = 0):
+        self.data = data
+        self.pos = pos
+
+    def skip_whitespace(self) -> None:
+        self.pos = _WHITESPACE_RE.match(self.data, self.pos).end()
+
+    def parse(self) -> Any:
+        """解析 pos 处的一个完整对象，容器用显式栈展开，避免逐层递归调用"""
+        data = self.data
+        pos = self.pos
+        # 栈中每项为 (是否字典, 已解析的元素)
+        stack: List[Tuple[bool, List[Any]]] = []
+        while True:
+            token = _TOKEN_RE.match(data, pos)
+            if token is None:
+                raise StructureScanError(f"无法解析的内容，偏移量 {pos}")
+            pos = token.end()
+            kind = token.lastgroup
+
+            text = token.group(kind)
+            if kind == "open":
+                stack.append((text == b"<<", []))
+                continue
+            if kind == "close":
+                if not stack:
+                    raise StructureScanError(f"多余的 {text!r}，偏移量 {pos}")
+                is_dict, items = stack.pop()
+                if is_dict:
+                    keys = items[0::2]
+                    if len(items) % 2 or not all(isinstance(key, str) for key in keys):
+                        raise StructureScanError("字典的键不是名称")
+                    value = dict(zip(keys, items[1::2]))
+                else:
+                    value = items
+            elif kind == "name":
+                value = text.decode("latin-1")
+            elif kind == "ref":
+                number, generation, _ = text.split()
+                value = Ref(int(number), int(generation))
+            elif kind == "number":
+                value = float(text) if b"." in text else int(text)
+            elif kind == "hex":
+                value = text[1:-1]
+            elif kind == "string":
+                pos, value = self._literal_string(pos - 1)
+            else:
+                value = _KEYWORDS.get(text, text)
+
+            if not stack:
+                self.pos = pos
+                return value
+            stack[-1][1].append(value)
+
+    def _literal_string(self, pos: int) -> Tuple[int, bytes]:
+        """跳过 pos 处的字符串，按括号嵌套和转义找到结尾，返回 (结尾之后的偏移量, 内容)"""
+        depth = 0
+        start = pos
+        data = self.data
+        while pos < len(data):
+            char = data[pos:pos + 1]
+            if char == b"\\":
+                pos += 2
+                continue
+            if char == b"(":
+                depth += 1
+            elif char == b")":
+                depth -= 1
+                if depth == 0:
+                    return pos + 1, bytes(data[start + 1:pos])
+            pos += 1
+        raise StructureScanError("字符串意外结束")
+
+
+def _png_unpredict(data: bytes, columns: int) -> bytes:
+    """还原交叉引用流常用的 PNG 预测(/Predictor >= 10)"""
+    row_size = columns + 1
+    previous = bytearray(columns)
+    output = bytearray()
+    for start in range(0, len(data) - row_size + 1, row_size):
+        kind = data[start]
+        row = bytearray(data[start + 1:start + row_size])
+        if kind == 1:
+            for i in range(1, columns):
+                row[i] = (row[i] + row[i - 1]) & 0xFF
+        elif kind == 2:
+            for i in range(columns):
+                row[i] = (row[i] + previous[i]) & 0xFF
+        elif kind == 3:
+            for i in range(columns):
+                left = row[i - 1] if i else 0
+                row[i] = (row[i] + (left + previous[i]) // 2) & 0xFF
+        elif kind == 4:
+            for i in range(columns):
+                left = row[i - 1] if i else 0
+                up_left = previous[i - 1] if i else 0
+                estimate = left + previous[i] - up_left
+                distances = (abs(estimate - left), abs(estimate - previous[i]), abs(estimate - up_left))
+                row[i] = (row[i] + (left, previous[i], up_left)[distances.index(min(distances))]) & 0xFF
+        elif kind != 0:
+            raise StructureScanError(f"不支持的PNG预测类型 {kind}")
+        output += row
+        previous = row
+    return bytes(output)
+
+
+class PDFStructureScanner:
+    """
+    按交叉引用扫描PDF结构
+
+    从文件末尾的 startxref 找到最新的交叉引用节(传统 xref 表或交叉引用流)，沿 /Prev 链
+    读取更早的节，较新的节中的条目优先，因此增量更新中被替换或释放的对象不会被计入。
+    页面从 trailer 的 /Root 开始沿页面树遍历，/Resources 等属性按页面树从父节点继承，
+    与 PyPDF2 展开页面树后的页面字典一致。对象按需解析并缓存，对象流解压后整体缓存。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        # {对象号: (类型, 偏移量或对象流号, 代号或对象流内序号)}，类型1为普通对象，2为对象流中的对象
+        self.xref: Dict[int, Tuple[int, int, int]] = {}
+        self.trailer: Dict[str, Any] = {}
+        self._data = None
+        self._objects: Dict[int, Any] = {}
+        self._object_streams: Dict[int, Dict[int, bytes]] = {}
+
+    def scan(self) -> PDFStructure:
+        with open(self.path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if data[:5] != b"%PDF-":
+                    raise StructureScanError("不是PDF文件")
+                self._data = data
+                try:
+                    self._read_xref_chain()
+                    if "/Encrypt" in self.trailer:
+                        raise StructureScanError("加密的PDF")
+                    return self._summarize()
+                except (IndexError, KeyError, TypeError, ValueError, zlib.error) as e:
+                    if isinstance(e, StructureScanError):
+                        raise
+                    raise StructureScanError(f"PDF结构解析失败: {e}")
+                finally:
+                    self._data = None
+
+    # 交叉引用
+
+    def _read_xref_chain(self) -> None:
+        data = self._data
+        match = None
+        for match in _STARTXREF_RE.finditer(data, max(0, len(data) - 2048)):
+            pass
+        if match is None:
+            raise StructureScanError("找不到 startxref")
+
+        offset = int(match.group(1))
+        visited: Set[int] = set()
+        while offset is not None:
+            if offset in visited or offset >= len(data):
+                raise StructureScanError(f"交叉引用偏移量无效: {offset}")
+            visited.add(offset)
+            trailer = self._read_xref_section(offset)
+            for key, value in trailer.items():
+                # 较新的 trailer 优先
+                self.trailer.setdefault(key, value)
+            # 混合格式文件的 /XRefStm 补充 xref 表中没有列出的对象
+            if isinstance(trailer.get("/XRefStm"), int) and trailer["/XRefStm"] not in visited:
+                visited.add(trailer["/XRefStm"])
+                self._read_xref_section(trailer["/XRefStm"])
+            offset = trailer.get("/Prev") if isinstance(trailer.get("/Prev"), int) else None
+
+        if "/Root" not in self.trailer:
+            raise StructureScanError("trailer 中缺少 /Root")
+
+    def _read_xref_section(self, offset: int) -> Dict[str, Any]:
+        """读取一个交叉引用节，返回其 trailer 字典；已有的条目(来自较新的节)不覆盖"""
+        data = self._data
+        start = offset
+        start = _WHITESPACE_RE.match(data, start).end()
+        if data[start:start + 4] == b"xref":
+            return self._read_xref_table(start + 4)
+        if _OBJ_HEADER_RE.match(data, start):
+            return self._read_xref_stream(start)
+        raise StructureScanError(f"偏移量 {offset} 处不是交叉引用")
+
+    def _read_xref_table(self, pos: int) -> Dict[str, Any]:
+        data = self._data
+        while True:
+            parser = _Parser(data, pos)
+            parser.skip_whitespace()
+            pos = parser.pos
+            if data[pos:pos + 7] == b"trailer":
+                trailer = _Parser(data, pos + 7).parse()
+                if not isinstance(trailer, dict):
+                    raise StructureScanError("trailer 不是字典")
+                return trailer
+            subsection = _SUBSECTION_RE.match(data, pos)
+            if subsection is None:
+                raise StructureScanError("交叉引用表格式错误")
+            first, count = int(subsection.group(1)), int(subsection.group(2))
+            pos = subsection.end()
+            for number in range(first, first + count):
+                entry = _ENTRY_RE.match(data, pos)
+                if entry is None:
+                    raise StructureScanError("交叉引用表条目格式错误")
+                pos = entry.end()
+                if number in self.xref:
+                    continue
+                if entry.group(3) == b"n":
+                    self.xref[number] = (1, int(entry.group(1)), int(entry.group(2)))
+                else:
+                    self.xref[number] = (0, 0, 0)
+
+    def _read_xref_stream(self, pos: int) -> Dict[str, Any]:
+        head, stream = self._read_indirect(pos, with_stream=True)
+        if not isinstance(head, dict) or head.get("/Type") != "/XRef" or stream is None:
+            raise StructureScanError("交叉引用流格式错误")
+        stream = self._decode(head, stream)
+
+        widths = head.get("/W")
+        if not isinstance(widths, list) or len(widths) != 3:
+            raise StructureScanError("交叉引用流缺少 /W")
+        index = head.get("/Index") or [0, head.get("/Size", 0)]
+        row_size = sum(widths)
+        row = 0
+        for first, count in zip(index[0::2], index[1::2]):
+            for number in range(first, first + count):
+                fields = []
+                offset = row * row_size
+                for width in widths:
+                    fields.append(int.from_bytes(stream[offset:offset + width], "big") if width else None)
+                    offset += width
+                row += 1
+                if number in self.xref:
+                    continue
+                kind = 1 if fields[0] is None else fields[0]
+                if kind in (1, 2):
+                    self.xref[number] = (kind, fields[1] or 0, fields[2] or 0)
+                else:
+                    self.xref[number] = (0, 0, 0)
+        return head
+
+    # 对象
+
+    def _read_indirect(self, pos: int, with_stream: bool = False) -> Tuple[Any, Optional[bytes]]:
+        """读取 pos 处的 "n g obj"，返回 (对象, 流数据)；with_stream 为 False 时不读取流数据"""
+        data = self._data
+        header = _OBJ_HEADER_RE.match(data, pos)
+        if header is None:
+            raise StructureScanError(f"偏移量 {pos} 处不是对象")
+        parser = _Parser(data, header.end())
+        value = parser.parse()
+        if not isinstance(value, dict):
+            return value, None
+
+        parser.skip_whitespace()
+        if data[parser.pos:parser.pos + 6] != b"stream":
+            return value, None
+        if not with_stream:
+            return value, b""
+
+        start = parser.pos + 6
+        if data[start:start + 2] == b"\r\n":
+            start += 2
+        elif data[start:start + 1] in (b"\n", b"\r"):
+            start += 1
+        length = value.get("/Length")
+        if isinstance(length, Ref):
+            length = self.resolve(length)
+        end = start + length if isinstance(length, int) else -1
+        if end < 0 or end > len(data) or not data[end:end + 20].lstrip().startswith(b"endstream"):
+            # 长度与实际不符时查找 endstream
+            end = data.find(b"endstream", start)
+            if end < 0:
+                raise StructureScanError("流对象缺少 endstream")
+        return value, bytes(data[start:end])
+
+    def _decode(self, head: Dict[str, Any], stream: bytes) -> bytes:
+        filters = head.get("/Filter")
+        filters = filters if isinstance(filters, list) else [filters] if filters else []
+        if filters and filters != ["/FlateDecode"]:
+            raise StructureScanError(f"不支持的流编码: {','.join(map(str, filters))}")
+        if not filters:
+            return stream
+        stream = zlib.decompressobj().decompress(stream)
+
+        params = head.get("/DecodeParms")
+        if isinstance(params, list):
+            params = params[0] if params else None
+        if isinstance(params, dict) and params.get("/Predictor", 1) >= 10:
+            stream = _png_unpredict(stream, params.get("/Columns", 1) * params.get("/Colors", 1))
+        elif isinstance(params, dict) and params.get("/Predictor", 1) > 1:
+            raise StructureScanError(f"不支持的预测类型 {params.get('/Predictor')}")
+        return stream
+
+    def resolve(self, value: Any) -> Any:
+        """解析间接引用，非引用值原样返回；释放或不存在的对象为 None"""
+        depth = 0
+        while isinstance(value, Ref):
+            depth += 1
+            if depth > 16:
+                raise StructureScanError("间接引用链过长")
+            value = self._object(value.number)
+        return value
+
+    def _object(self, number: int) -> Any:
+        if number in self._objects:
+            return self._objects[number]
+        entry = self.xref.get(number)
+        if entry is None or entry[0] == 0:
+            value = None
+        elif entry[0] == 1:
+            value, _ = self._read_indirect(entry[1])
+        else:
+            raw = self._object_stream(entry[1]).get(number)
+            value = _Parser(raw).parse() if raw is not None else None
+        self._objects[number] = value
+        return value
+
+    def _object_stream(self, number: int) -> Dict[int, bytes]:
+        """解压对象流，返回 {对象号: 对象内容}"""
+        if number in self._object_streams:
+            return self._object_streams[number]
+        entry = self.xref.get(number)
+        if entry is None or entry[0] != 1:
+            raise StructureScanError(f"对象流 {number} 不在交叉引用中")
+        head, stream = self._read_indirect(entry[1], with_stream=True)
+        if not isinstance(head, dict) or stream is None:
+            raise StructureScanError(f"对象 {number} 不是对象流")
+        stream = self._decode(head, stream)
+
+        count, first = head.get("/N"), head.get("/First")
+        if not isinstance(count, int) or not isinstance(first, int):
+            raise StructureScanError("对象流缺少 /N 或 /First")
+        numbers = [int(value) for value in stream[:first].split()]
+        pairs = list(zip(numbers[0::2], numbers[1::2]))[:count]
+        objects = {}
+        for index, (inner_number, offset) in enumerate(pairs):
+            end = first + pairs[index + 1][1] if index + 1 < len(pairs) else len(stream)
+            objects[inner_number] = stream[first + offset:end]
+        self._object_streams[number] = objects
+        return objects
+
+    # 汇总
+
+    def _pages(self, node: Any, inherited: Dict[str, Any], visited: Set[int], depth: int = 0) -> Iterator[Dict[str, Any]]:
+        """沿页面树产出叶子页面，/Resources 取自页面本身或最近的祖先节点"""
+        if depth > MAX_TREE_DEPTH:
+            raise StructureScanError("页面树过深")
+        if isinstance(node, Ref):
+            if node.number in visited:
+                return
+            visited.add(node.number)
+        node = self.resolve(node)
+        if not isinstance(node, dict):
+            return
+
+        if "/Resources" in node:
+            inherited = dict(inherited, **{"/Resources": node["/Resources"]})
+        kids = node.get("/Kids")
+        if node.get("/Type") == "/Pages" or (node.get("/Type") != "/Page" and kids is not None):
+            for kid in self.resolve(kids) or []:
+                yield from self._pages(kid, inherited, visited, depth + 1)
+        else:
+            yield dict(inherited, **node)
+
+    def _collect_fields(self, fields: Any, collected: Dict[bytes, Dict[str, Any]], visited: Set[int]) -> None:
+        """沿表单字段树收集有名称的字段，与 PdfReader.get_fields 一致按 /TM 或 /T 去重"""
+        for field_ref in self.resolve(fields) or []:
+            if isinstance(field_ref, Ref):
+                if field_ref.number in visited:
+                    continue
+                visited.add(field_ref.number)
+            node = self.resolve(field_ref)
+            if not isinstance(node, dict):
+                continue
+            if "/Kids" in node:
+                self._collect_fields(node["/Kids"], collected, visited)
+            key = node.get("/TM", node.get("/T"))
+            if key is not None:
+                collected[key] = node
+
+    def _count_text_fields(self, acroform: Dict[str, Any]) -> int:
+        """
+        统计文本表单字段，与 PdfReader.get_form_text_fields 的结果数一致:
+        只看字段自身的 /FT(不从父字段继承)，同名字段只计一次
+        """
+        collected: Dict[bytes, Dict[str, Any]] = {}
+        self._collect_fields(acroform.get("/Fields"), collected, set())
+        return len({node.get("/T") for node in collected.values() if node.get("/FT") == "/Tx"})
+
+    def _summarize(self) -> PDFStructure:
+        root = self.resolve(self.trailer["/Root"])
+        if not isinstance(root, dict) or "/Pages" not in root:
+            raise StructureScanError("文档目录缺少 /Pages")
+
+        page_count = 0
+        font_names: Set[str] = set()
+        image_count = 0
+        form_count = 0
+        subtypes: Dict[int, Any] = {}
+        # 与 XObjectCollector、FontCollector 一致: 字体按名称去重，XObject 按页面引用计数
+        for page in self._pages(root["/Pages"], {}, set()):
+            page_count += 1
+            resources = self.resolve(page.get("/Resources"))
+            if not isinstance(resources, dict):
+                continue
+            fonts = self.resolve(resources.get("/Font"))
+            if isinstance(fonts, dict):
+                font_names.update(fonts)
+            xobjects = self.resolve(resources.get("/XObject"))
+            if not isinstance(xobjects, dict):
+                continue
+            for value in xobjects.values():
+                if isinstance(value, Ref):
+                    if value.number not in subtypes:
+                        head = self.resolve(value)
+                        subtypes[value.number] = head.get("/Subtype") if isinstance(head, dict) else None
+                    subtype = subtypes[value.number]
+                else:
+                    subtype = value.get("/Subtype") if isinstance(value, dict) else None
+                if subtype == "/Image":
+                    image_count += 1
+                elif subtype == "/Form":
+                    form_count += 1
+
+        if page_count == 0:
+            raise StructureScanError("未找到页面")
+
+        acroform = self.resolve(root.get("/AcroForm"))
+        has_acroform = isinstance(acroform, dict)
+        form_field_count = self._count_text_fields(acroform) if has_acroform else 0
+
+        in_use = [entry for entry in self.xref.values() if entry[0] in (1, 2)]
+        return PDFStructure(
+            page_count=page_count,
+            font_names=font_names,
+            image_count=image_count,
+            form_xobject_count=form_count,
+            has_acroform=has_acroform,
+            form_field_count=form_field_count,
+            object_count=len(in_use),
+            object_stream_count=len({entry[1] for entry in in_use if entry[0] == 2})
+        )
+
+
+def scan_pdf_structure(path: str) -> PDFStructure:
+    """
+    快速扫描PDF结构
+
+    Raises:
+        StructureScanError: 无法快速扫描，应回退到 PdfReader
+        OSError: 文件无法读取
+    """
+    return PDFStructureScanner(path).scan()
@@ -0,0 +1,89 @@
+"""
+阶段计时
+后端在转换过程中记录命名阶段(如 load、layout、write)的耗时，用于定位各工具的瓶颈
+"""
+
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+class PhaseTimer:
+    """
+    单次转换的阶段计时器
+
+    用法:
+        timer = PhaseTimer()
+        with timer.phase("load"):
+            ...
+        timer.phases  # {"load": 0.012}
+
+    同名阶段多次进入时耗时累加，阶段按首次出现的顺序保存。
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """记录代码块的耗时，代码块抛出异常时也会记录"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float) -> None:
+        """直接记录一段已测得的耗时"""
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @property
+    def total(self) -> float:
+        return sum(self.phases.values())
+
+    def to_dict(self) -> Dict[str, float]:
+        return dict(self.phases)
+
+
+@contextmanager
+def optional_phase(timer: Optional[PhaseTimer], name: str) -> Iterator[None]:
+    """timer 为空时不计时，便于后端函数把计时器作为可选参数"""
+    if timer is None:
+        yield
+        return
+    with timer.phase(name):
+        yield
+
+
+def median_phases(phase_dicts: Iterable[Dict[str, float]]) -> Dict[str, float]:
+    """合并多次测量的阶段耗时，每个阶段取中位数"""
+    collected: Dict[str, List[float]] = {}
+    for phases in phase_dicts:
+        for name, seconds in phases.items():
+            collected.setdefault(name, []).append(seconds)
+    return {name: statistics.median(values) for name, values in collected.items()}
+
+
+def summarize_phases(phase_dicts: Iterable[Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    """
+    汇总一个工具所有样例的阶段耗时
+
+    Returns:
+        {阶段名: {"mean": 平均耗时, "total": 总耗时, "share": 占全部阶段耗时的百分比, "count": 样例数}}
+    """
+    collected: Dict[str, List[float]] = {}
+    for phases in phase_dicts:
+        for name, seconds in phases.items():
+            collected.setdefault(name, []).append(seconds)
+
+    grand_total = sum(sum(values) for values in collected.values())
+    return {
+        name: {
+            "mean": statistics.fmean(values),
+            "total": sum(values),
+            "share": sum(values) / grand_total * 100 if grand_total > 0 else 0.0,
+            "count": len(values)
+        }
+        for name, values in collected.items()
+    }
@@ -0,0 +1,280 @@
+"""
+资源监控
+采样当前进程及其全部子孙进程(Chromium、soffice、工作进程等)的内存和CPU占用
+"""
+
+import os
+import resource
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+PROC_DIR = "/proc"
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+MB = 1024 * 1024
+
+
+def proc_available() -> bool:
+    """是否可以通过 /proc 读取进程信息(Linux)"""
+    return os.path.isdir(os.path.join(PROC_DIR, str(os.getpid())))
+
+
+def _read_stat(pid: str) -> Optional[Tuple[int, float, float]]:
+    """读取 /proc/<pid>/stat，返回 (父进程ID, 用户态CPU秒数, 内核态CPU秒数)"""
+    try:
+        with open(os.path.join(PROC_DIR, pid, "stat"), "r") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # 进程名可能包含空格和括号，从最后一个右括号之后开始按字段切分
+    fields = stat[stat.rfind(")") + 2:].split()
+    return int(fields[1]), int(fields[11]) / CLOCK_TICKS, int(fields[12]) / CLOCK_TICKS
+
+
+def process_tree(root_pid: Optional[int] = None,
+                 exclude: Iterable[int] = ()) -> Dict[int, Tuple[float, float]]:
+    """
+    进程树中所有进程的CPU时间
+
+    Args:
+        root_pid: 进程树的根，默认为当前进程
+        exclude: 不统计的进程ID，其子孙进程也不统计
+
+    Returns:
+        {进程ID: (用户态CPU秒数, 内核态CPU秒数)}，包含根进程本身
+    """
+    root_pid = root_pid or os.getpid()
+    exclude = set(exclude)
+    parents: Dict[int, List[int]] = {}
+    cpu: Dict[int, Tuple[float, float]] = {}
+    for entry in os.listdir(PROC_DIR):
+        if not entry.isdigit():
+            continue
+        stat = _read_stat(entry)
+        if stat is None:
+            continue
+        parents.setdefault(stat[0], []).append(int(entry))
+        cpu[int(entry)] = stat[1:]
+
+    tree = {}
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        if pid in exclude:
+            continue
+        if pid in cpu:
+            tree[pid] = cpu[pid]
+        pending.extend(parents.get(pid, []))
+    return tree
+
+
+def read_rss(pid: int) -> int:
+    """进程的常驻内存(字节)"""
+    try:
+        with open(os.path.join(PROC_DIR, str(pid), "statm"), "r") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def read_pss(pid: int) -> int:
+    """
+    进程的比例集大小(字节)
+
+    共享页按共享进程数平均分摊，多进程浏览器的PSS之和比RSS之和更接近实际占用。
+    需要 Linux 4.14+ 的 smaps_rollup，读取失败时返回0。
+    """
+    try:
+        with open(os.path.join(PROC_DIR, str(pid), "smaps_rollup"), "r") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, IndexError, ValueError):
+        pass
+    return 0
+
+
+def _thread_cpu() -> Tuple[float, float]:
+    """当前线程的 (用户态CPU秒数, 内核态CPU秒数)，不支持 RUSAGE_THREAD 时全部计为用户态"""
+    if hasattr(resource, "RUSAGE_THREAD"):
+        usage = resource.getrusage(resource.RUSAGE_THREAD)
+        return usage.ru_utime, usage.ru_stime
+    return time.thread_time(), 0.0
+
+
+def current_descendants(root_pid: Optional[int] = None) -> List[int]:
+    """当前仍在运行的子孙进程ID(不含根进程)，无法读取 /proc 时为空"""
+    if not proc_available():
+        return []
+    root_pid = root_pid or os.getpid()
+    return [pid for pid in process_tree(root_pid) if pid != root_pid]
+
+
+class ResourceMonitor:
+    """
+    进程树资源监控
+
+    在后台线程中按固定间隔采样进程树的 RSS/PSS，并统计监控期间进程树消耗的CPU时间。
+    只统计被测后端的占用:
+    - exclude_pids 中的进程及其子孙(如监控开始前已在运行、属于其他后端的浏览器或监听进程)不统计
+    - 根进程(评估进程)的内存只统计相对监控开始时的增长，开始时的占用作为基线单独报告
+    - 采样本身(后台采样线程和开始、结束时的采样)消耗的CPU从根进程的CPU时间中扣除
+
+    CPU时间 = 本进程的增量(getrusage(RUSAGE_SELF)，扣除采样线程)
+            + 已结束并被回收的子进程(getrusage(RUSAGE_CHILDREN)的增量，覆盖每次转换启动的短命进程)
+            + 仍在运行的子孙进程的增量(/proc/<pid>/stat，覆盖常驻浏览器、监听进程和工作进程)
+
+    用法:
+        with ResourceMonitor() as monitor:
+            convert(...)
+        monitor.summary()
+    """
+
+    def __init__(self, interval: float = 0.05, pss: bool = True, root_pid: Optional[int] = None,
+                 exclude_pids: Iterable[int] = ()):
+        """
+        Args:
+            interval: 采样间隔(秒)
+            pss: 是否采样PSS，读取 smaps_rollup 的开销高于RSS
+            root_pid: 进程树的根，默认为当前进程
+            exclude_pids: 不统计的进程ID(及其子孙)，通常是后端启动前已存在的子进程
+        """
+        self.interval = interval
+        self.pss = pss
+        self.root_pid = root_pid or os.getpid()
+        self.exclude_pids = set(exclude_pids)
+        self.available = proc_available()
+
+        # 被测后端的内存: 子孙进程之和加上根进程相对基线的增长
+        self.rss_samples: List[int] = []
+        self.pss_samples: List[int] = []
+        self.process_counts: List[int] = []  # 被测后端的子孙进程数，不含根进程
+        self.sample_times: List[float] = []  # 每次采样相对 start 的秒数
+        self.baseline_rss = 0  # 监控开始时根进程的RSS(字节)
+        self.baseline_pss = 0
+        self.wall_time = 0.0
+        self.cpu_user = 0.0
+        self.cpu_system = 0.0
+        self.sampler_cpu = 0.0  # 采样消耗的CPU秒数，已从 cpu_user/cpu_system 中扣除
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_time = 0.0
+        self._start_self: Optional[resource.struct_rusage] = None
+        self._start_children: Optional[resource.struct_rusage] = None
+        self._start_tree: Dict[int, Tuple[float, float]] = {}
+        self._sampler_user = 0.0
+        self._sampler_system = 0.0
+        self._sampler_lock = threading.Lock()
+
+    def __enter__(self) -> "ResourceMonitor":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        self._start_time = time.perf_counter()
+        if self.available:
+            # 开始时的扫描和首次采样在CPU计量窗口之外
+            self._start_tree = process_tree(self.root_pid, self.exclude_pids)
+            self.baseline_rss = read_rss(self.root_pid)
+            self.baseline_pss = read_pss(self.root_pid) if self.pss else 0
+            self._sample()
+
+        self._start_self = resource.getrusage(resource.RUSAGE_SELF)
+        self._start_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+        if self.available:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="resource-monitor", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+        self.wall_time = time.perf_counter() - self._start_time
+        end_self = resource.getrusage(resource.RUSAGE_SELF)
+        end_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        # 采样线程的CPU时间在该线程退出前已累计，从本进程的增量中扣除
+        self.sampler_cpu = self._sampler_user + self._sampler_system
+        self.cpu_user = max(0.0, end_self.ru_utime - self._start_self.ru_utime - self._sampler_user) \
+            + end_children.ru_utime - self._start_children.ru_utime
+        self.cpu_system = max(0.0, end_self.ru_stime - self._start_self.ru_stime - self._sampler_system) \
+            + end_children.ru_stime - self._start_children.ru_stime
+
+        if self.available:
+            # 结束时的扫描和最后一次采样在CPU计量窗口之外
+            self._sample()
+            # 仍在运行的子孙进程尚未被回收，不包含在 RUSAGE_CHILDREN 中
+            for pid, (user, system) in process_tree(self.root_pid, self.exclude_pids).items():
+                if pid != self.root_pid:
+                    start_user, start_system = self._start_tree.get(pid, (0.0, 0.0))
+                    self.cpu_user += user - start_user
+                    self.cpu_system += system - start_system
+
+    def _run(self) -> None:
+        start_user, start_system = _thread_cpu()
+        try:
+            while not self._stop.wait(self.interval):
+                self._sample()
+        finally:
+            end_user, end_system = _thread_cpu()
+            with self._sampler_lock:
+                self._sampler_user += end_user - start_user
+                self._sampler_system += end_system - start_system
+
+    def _sample(self) -> None:
+        pids = [pid for pid in process_tree(self.root_pid, self.exclude_pids) if pid != self.root_pid]
+        # 根进程(评估进程)只计入相对基线的增长
+        root_rss = max(0, read_rss(self.root_pid) - self.baseline_rss)
+        self.sample_times.append(time.perf_counter() - self._start_time)
+        self.process_counts.append(len(pids))
+        self.rss_samples.append(root_rss + sum(read_rss(pid) for pid in pids))
+        if self.pss:
+            root_pss = max(0, read_pss(self.root_pid) - self.baseline_pss)
+            self.pss_samples.append(root_pss + sum(read_pss(pid) for pid in pids))
+
+    def summary(self, documents: int = 1) -> Dict[str, float]:
+        """
+        监控结果
+
+        Args:
+            documents: 监控期间转换的文档数，CPU时间按文档数平均分摊
+
+        Returns:
+            内存单位为MB，CPU时间单位为秒；无法读取 /proc 时只有CPU时间。
+            rss_*/pss_* 是被测后端的占用(不含评估进程的基线)，baseline_* 是评估进程开始时的占用
+        """
+        documents = max(1, documents)
+        cpu_total = self.cpu_user + self.cpu_system
+        result = {
+            "cpu_user": self.cpu_user / documents,
+            "cpu_system": self.cpu_system / documents,
+            "cpu_percent": cpu_total / self.wall_time * 100 if self.wall_time > 0 else 0.0,
+            "wall_time": self.wall_time,
+            "sampler_cpu": self.sampler_cpu
+        }
+        if self.rss_samples:
+            result.update({
+                "rss_start_mb": self.rss_samples[0] / MB,
+                "rss_peak_mb": max(self.rss_samples) / MB,
+                "rss_avg_mb": sum(self.rss_samples) / len(self.rss_samples) / MB,
+                "processes_peak": max(self.process_counts),
+                "samples": len(self.rss_samples),
+                "baseline_rss_mb": self.baseline_rss / MB
+            })
+            if self.baseline_pss:
+                result["baseline_pss_mb"] = self.baseline_pss / MB
+        if any(self.pss_samples):
+            result.update({
+                "pss_peak_mb": max(self.pss_samples) / MB,
+                "pss_avg_mb": sum(self.pss_samples) / len(self.pss_samples) / MB
+            })
+        return result
@@ -0,0 +1,286 @@
+"""
+规模曲线拟合
+按文档规模(页数、字节数、DOM节点数)拟合各工具的转换耗时和内存占用，
+用双对数斜率判断增长是否超线性，并外推大文档的耗时。
+合成语料中带 "scale:<维度>" 标签的样例按规模曲线分别拟合，只有拟合优度足够的结果才做判断和外推
+"""
+
+import math
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 规模度量和资源指标
+SIZE_MEASURES = ("pages", "bytes", "dom_nodes")
+METRICS = ("time", "memory")
+
+# 双对数斜率超过该值视为超线性增长
+SUPERLINEAR_THRESHOLD = 1.15
+# 拟合优度低于该值时视为数据不足，不做判断和外推
+MIN_R_SQUARED = 0.8
+# 至少需要的不同规模数和规模跨度(最大/最小)
+MIN_POINTS = 3
+MIN_SPAN = 4.0
+
+# 默认外推的页数
+PREDICTION_PAGES = (500,)
+
+# 规模曲线标签前缀；没有该标签的样例归入 MIXED_SERIES
+SERIES_TAG_PREFIX = "scale:"
+MIXED_SERIES = ""
+
+
+def count_dom_nodes(html: str) -> int:
+    """元素节点数量(按开始标签计数)"""
+    return len(re.findall(r"<[a-zA-Z][a-zA-Z0-9]*", html))
+
+
+def least_squares(xs: Sequence[float], ys: Sequence[float]) -> Tuple[float, float, float]:
+    """
+    一元线性最小二乘
+
+    Returns:
+        (斜率, 截距, 决定系数R²)
+    """
+    n = len(xs)
+    mean_x = sum(xs) / n
+    mean_y = sum(ys) / n
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    if sxx == 0:
+        return 0.0, mean_y, 0.0
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / sxx
+    intercept = mean_y - slope * mean_x
+    total = sum((y - mean_y) ** 2 for y in ys)
+    residual = sum((y - (slope * x + intercept)) ** 2 for x, y in zip(xs, ys))
+    r_squared = 1 - residual / total if total > 0 else 1.0
+    return slope, intercept, r_squared
+
+
+@dataclass
+class ScalingFit:
+    """
+    单个工具、单条规模曲线、单个规模度量、单个指标的拟合结果
+
+    幂律 y = coefficient * x^exponent 在双对数坐标下为直线，exponent 即双对数斜率：
+    约等于1为线性增长，明显大于1为超线性增长。固定开销(启动、字体加载)会压低小文档端的斜率，
+    因此另外只用较大的一半规模拟合 tail_exponent，超线性判断和外推优先使用它。
+    双对数拟合的R²低于 MIN_R_SQUARED 时 reliable 为 False，报告中显示为数据不足。
+    """
+    series: str  # 规模曲线(合成语料的 scale 维度)，MIXED_SERIES 为不属于任何曲线的样例
+    measure: str  # 规模度量: pages / bytes / dom_nodes
+    metric: str  # 指标: time(秒) / memory(MB，转换期间进程树RSS的增量)
+    points: int
+    x_min: float
+    x_max: float
+    exponent: float  # 双对数斜率
+    coefficient: float  # 幂律系数
+    r_squared: float  # 双对数拟合的R²
+    linear_slope: float  # 线性拟合 y = slope * x + intercept 的斜率，即每单位规模的边际成本
+    linear_intercept: float  # 线性拟合的截距，即固定开销
+    linear_r_squared: float
+    tail_exponent: Optional[float] = None  # 较大的一半规模的双对数斜率
+    tail_coefficient: Optional[float] = None
+    data: List[Tuple[float, float]] = field(default_factory=list)  # 参与拟合的点，同一规模已取平均
+
+    @property
+    def growth_exponent(self) -> float:
+        return self.tail_exponent if self.tail_exponent is not None else self.exponent
+
+    @property
+    def reliable(self) -> bool:
+        """拟合优度是否足以判断增长趋势和外推"""
+        return self.r_squared >= MIN_R_SQUARED
+
+    @property
+    def superlinear(self) -> bool:
+        """增长是否超线性；拟合优度不足时不判断"""
+        return self.reliable and self.growth_exponent > SUPERLINEAR_THRESHOLD
+
+    def predict(self, x: float) -> float:
+        """按幂律外推，有尾部拟合时使用尾部拟合"""
+        if self.tail_exponent is not None:
+            return self.tail_coefficient * x ** self.tail_exponent
+        return self.coefficient * x ** self.exponent
+
+    def predict_linear(self, x: float) -> float:
+        """按线性拟合外推"""
+        return self.linear_slope * x + self.linear_intercept
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = asdict(self)
+        result["reliable"] = self.reliable
+        result["superlinear"] = self.superlinear
+        return result
+
+
+def fit_scaling(measure: str, metric: str, points: Iterable[Tuple[float, float]],
+                series: str = MIXED_SERIES) -> Optional[ScalingFit]:
+    """
+    拟合一组 (规模, 指标值) 点
+
+    同一规模的多个点取平均；不同规模数少于 MIN_POINTS 或跨度小于 MIN_SPAN 时无法拟合，返回 None。
+    """
+    grouped: Dict[float, List[float]] = {}
+    for x, y in points:
+        if x > 0 and y > 0:
+            grouped.setdefault(float(x), []).append(float(y))
+    if len(grouped) < MIN_POINTS:
+        return None
+
+    xs = sorted(grouped)
+    ys = [sum(grouped[x]) / len(grouped[x]) for x in xs]
+    if xs[-1] / xs[0] < MIN_SPAN:
+        return None
+
+    log_xs = [math.log(x) for x in xs]
+    log_ys = [math.log(y) for y in ys]
+    exponent, log_intercept, r_squared = least_squares(log_xs, log_ys)
+    linear_slope, linear_intercept, linear_r_squared = least_squares(xs, ys)
+
+    fit = ScalingFit(
+        series=series,
+        measure=measure,
+        metric=metric,
+        points=len(xs),
+        x_min=xs[0],
+        x_max=xs[-1],
+        exponent=exponent,
+        coefficient=math.exp(log_intercept),
+        r_squared=r_squared,
+        linear_slope=linear_slope,
+        linear_intercept=linear_intercept,
+        linear_r_squared=linear_r_squared,
+        data=list(zip(xs, ys))
+    )
+
+    tail = len(xs) // 2
+    if len(xs) - tail >= MIN_POINTS:
+        tail_exponent, tail_intercept, _ = least_squares(log_xs[tail:], log_ys[tail:])
+        fit.tail_exponent = tail_exponent
+        fit.tail_coefficient = math.exp(tail_intercept)
+    return fit
+
+
+def sample_sizes(result, spec=None, cache: Optional[Dict[str, Dict[str, float]]] = None) -> Dict[str, float]:
+    """
+    样例的规模
+
+    页数优先使用输出PDF的实际页数，其次是清单中的预期页数；
+    字节数和DOM节点数优先使用清单 params 中记录的值，否则读取HTML文件计算。
+
+    Args:
+        result: SampleResult
+        spec: 语料中的 SampleSpec
+        cache: 按样例名缓存读取HTML文件得到的规模，字节数和DOM节点数与工具无关
+    """
+    params = spec.params if spec is not None else {}
+    sizes: Dict[str, float] = {}
+
+    pages = (result.pdf_analysis or {}).get("page_count") or params.get("estimated_pages")
+    if not pages and spec is not None:
+        pages = spec.expected_pages
+    if pages:
+        sizes["pages"] = pages
+
+    if "bytes" in params and "dom_nodes" in params:
+        sizes["bytes"] = params["bytes"]
+        sizes["dom_nodes"] = params["dom_nodes"]
+    elif spec is not None and os.path.exists(spec.path):
+        cache = cache if cache is not None else {}
+        if spec.name not in cache:
+            with open(spec.path, "rb") as f:
+                data = f.read()
+            cache[spec.name] = {
+                "bytes": len(data),
+                "dom_nodes": count_dom_nodes(data.decode("utf-8", errors="replace"))
+            }
+        sizes.update(cache[spec.name])
+    return sizes
+
+
+def sample_metrics(result) -> Dict[str, float]:
+    """样例的资源指标：耗时，以及开启资源监控时的内存增量"""
+    metrics = {"time": result.conversion_time}
+    usage = result.resource_usage or {}
+    if "rss_peak_mb" in usage and "rss_start_mb" in usage:
+        # 进程树的基线内存(评估进程本身、常驻浏览器)与文档规模无关，只拟合增量
+        metrics["memory"] = usage["rss_peak_mb"] - usage["rss_start_mb"]
+    return metrics
+
+
+def sample_series(spec) -> List[str]:
+    """
+    样例所属的规模曲线
+
+    合成语料的样例带 "scale:<维度>" 标签，同一组参数可能同时属于多条曲线(如各维度的最小值)；
+    没有该标签的样例归入 MIXED_SERIES，它们的规模变化来自不同类型的内容，不能当作同一条曲线。
+    """
+    tags = spec.tags if spec is not None else []
+    series = [tag[len(SERIES_TAG_PREFIX):] for tag in tags if tag.startswith(SERIES_TAG_PREFIX)]
+    return series or [MIXED_SERIES]
+
+
+def analyze_scaling(results: Dict[str, List[Any]],
+                    corpus=None) -> Dict[str, Dict[str, Dict[str, Dict[str, ScalingFit]]]]:
+    """
+    拟合每个工具的规模曲线
+
+    Args:
+        results: {工具名: SampleResult 列表}
+        corpus: 提供样例规模元数据和规模曲线标签的语料
+
+    Returns:
+        {工具名: {规模曲线: {规模度量: {指标: ScalingFit}}}}，只包含不同规模数和规模跨度足够的组合；
+        拟合优度不足的结果仍然保留，由 ScalingFit.reliable 标记
+    """
+    analysis: Dict[str, Dict[str, Dict[str, Dict[str, ScalingFit]]]] = {}
+    size_cache: Dict[str, Dict[str, float]] = {}
+
+    for tool_name, tool_results in results.items():
+        points: Dict[Tuple[str, str, str], List[Tuple[float, float]]] = {}
+        for result in tool_results:
+            if not result.conversion_success:
+                continue
+            spec = corpus.get(result.sample_name) if corpus is not None else None
+            sizes = sample_sizes(result, spec, size_cache)
+            metrics = sample_metrics(result)
+            for series in sample_series(spec):
+                for measure, x in sizes.items():
+                    for metric, y in metrics.items():
+                        points.setdefault((series, measure, metric), []).append((x, y))
+
+        tool_analysis: Dict[str, Dict[str, Dict[str, ScalingFit]]] = {}
+        for (series, measure, metric), series_points in points.items():
+            fit = fit_scaling(measure, metric, series_points, series)
+            if fit is not None:
+                tool_analysis.setdefault(series, {}).setdefault(measure, {})[metric] = fit
+        if tool_analysis:
+            analysis[tool_name] = tool_analysis
+
+    return analysis
+
+
+def iter_fits(analysis: Dict[str, Dict[str, Dict[str, Dict[str, ScalingFit]]]]) -> Iterable[Tuple[str, ScalingFit]]:
+    """按 (工具名, ScalingFit) 逐个产出拟合结果"""
+    for tool_name, series_fits in analysis.items():
+        for measures in series_fits.values():
+            for fits in measures.values():
+                for fit in fits.values():
+                    yield tool_name, fit
+
+
+def scaling_to_dict(analysis: Dict[str, Dict[str, Dict[str, Dict[str, ScalingFit]]]],
+                    prediction_pages: Sequence[int] = PREDICTION_PAGES) -> Dict[str, Any]:
+    """转换为可写入JSON的字典，拟合优度足够的页数拟合附带外推结果；混合样例的曲线名为 "mixed" """
+    data: Dict[str, Any] = {}
+    for tool_name, fit in iter_fits(analysis):
+        entry = fit.to_dict()
+        if fit.measure == "pages" and fit.reliable:
+            entry["predictions"] = {
+                str(pages): {"power_law": fit.predict(pages), "linear": fit.predict_linear(pages)}
+                for pages in prediction_pages
+            }
+        series = fit.series or "mixed"
+        data.setdefault(tool_name, {}).setdefault(series, {}).setdefault(fit.measure, {})[fit.metric] = entry
+    return data
@@ -0,0 +1,367 @@
+"""
+LibreOffice UNO监听服务
+启动常驻的 headless soffice 进程，通过本地 socket 使用 UNO 提交转换，避免每个文件都启动一次办公套件
+"""
+
+import atexit
+import os
+import queue
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from typing import List, Optional
+
+from utils.phase_timer import PhaseTimer, optional_phase
+
+# python3-uno 随 LibreOffice 一起安装，不在 PyPI 上，缺失时只有 UNO 模式不可用
+try:
+    import uno
+    from com.sun.star.beans import PropertyValue
+except ImportError:
+    uno = None
+    PropertyValue = None
+
+
+# HTML文档导出为PDF使用的过滤器，与 soffice --convert-to pdf 对HTML的默认选择一致
+HTML_PDF_FILTER = "writer_web_pdf_Export"
+
+
+def find_free_port() -> int:
+    """由系统分配一个当前空闲的本地端口"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _props(**kwargs) -> tuple:
+    """构造 UNO PropertyValue 元组"""
+    props = []
+    for name, value in kwargs.items():
+        prop = PropertyValue()
+        prop.Name = name
+        prop.Value = value
+        props.append(prop)
+    return tuple(props)
+
+
+class SofficeServer:
+    """单个常驻的 headless soffice 监听进程"""
+
+    # 自动选择端口时启动失败的重试次数(端口在探测后被其他进程占用)
+    PORT_RETRIES = 3
+
+    def __init__(self, port: Optional[int] = None, soffice_binary: str = "soffice",
+                 profile_dir: Optional[str] = None, startup_timeout: float = 30.0):
+        """
+        Args:
+            port: 监听的本地端口，为空时每次启动由系统分配空闲端口，
+                避免与其他评估进程或用户自己的 LibreOffice 冲突
+            soffice_binary: soffice 可执行文件
+            profile_dir: 独立的用户配置目录，多个实例同时运行时必须互不相同
+            startup_timeout: 等待监听就绪的最长时间(秒)
+        """
+        self.fixed_port = port
+        self.port = port or 0
+        self.soffice_binary = soffice_binary
+        self.profile_dir = profile_dir
+        self.startup_timeout = startup_timeout
+
+        self.launch_time = 0.0  # 最近一次启动耗时(秒)
+        self.restart_count = 0
+
+        self._process: Optional[subprocess.Popen] = None
+        self._desktop = None
+        # 转换和关闭互斥；转换中崩溃时会在持有锁的情况下重启，因此可重入
+        self._lock = threading.RLock()
+        self._closed = False
+
+    @property
+    def connection_string(self) -> str:
+        return f"socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext"
+
+    def start(self) -> None:
+        """启动 soffice 并等待 UNO 连接可用"""
+        if uno is None:
+            raise RuntimeError("未安装 python3-uno，无法使用 LibreOffice UNO 模式")
+
+        start = time.perf_counter()
+        attempts = 1 if self.fixed_port else self.PORT_RETRIES
+        for attempt in range(attempts):
+            if not self.fixed_port:
+                self.port = find_free_port()
+            try:
+                self._launch()
+                break
+            except RuntimeError:
+                self._kill()
+                if attempt == attempts - 1:
+                    raise
+        self.launch_time = time.perf_counter() - start
+
+    def _launch(self) -> None:
+        cmd = [
+            self.soffice_binary, "--headless", "--invisible", "--nologo",
+            "--nodefault", "--norestore", "--nolockcheck",
+            f"--accept={self.connection_string}"
+        ]
+        if self.profile_dir:
+            cmd.append(f"-env:UserInstallation={uno.systemPathToFileUrl(self.profile_dir)}")
+
+        self._process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self._desktop = self._connect()
+
+    def _kill(self) -> None:
+        """强制结束启动失败的进程"""
+        self._desktop = None
+        if self._process is not None and self._process.poll() is None:
+            self._process.kill()
+            self._process.wait()
+        self._process = None
+
+    def _connect(self):
+        """轮询连接监听端口，直到成功或超时"""
+        local_context = uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local_context
+        )
+
+        deadline = time.perf_counter() + self.startup_timeout
+        last_error = None
+        while time.perf_counter() < deadline:
+            if self._process.poll() is not None:
+                raise RuntimeError(f"soffice 进程启动后退出，返回码 {self._process.returncode}")
+            try:
+                context = resolver.resolve(f"uno:{self.connection_string}")
+                return context.ServiceManager.createInstanceWithContext(
+                    "com.sun.star.frame.Desktop", context
+                )
+            except Exception as e:
+                last_error = e
+                time.sleep(0.2)
+
+        raise RuntimeError(f"连接 soffice 监听端口 {self.port} 超时: {last_error}")
+
+    def is_alive(self) -> bool:
+        """检查进程是否存活且 UNO 连接可用"""
+        if self._process is None or self._process.poll() is not None or self._desktop is None:
+            return False
+        try:
+            self._desktop.getComponents()
+            return True
+        except Exception:
+            return False
+
+    def restart(self) -> None:
+        """崩溃后重启监听进程"""
+        self.stop()
+        self.start()
+        self.restart_count += 1
+
+    def stop(self) -> None:
+        """关闭监听进程，等待正在进行的转换完成"""
+        with self._lock:
+            self._stop()
+
+    def close(self) -> None:
+        """关闭监听进程，之后的转换不再重启进程"""
+        with self._lock:
+            self._closed = True
+            self._stop()
+
+    def _stop(self) -> None:
+        if self._desktop is not None:
+            try:
+                self._desktop.terminate()
+            except Exception:
+                pass
+            self._desktop = None
+
+        if self._process is not None:
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+            self._process = None
+
+    def convert(self, input_path: str, output_path: str, timer: Optional[PhaseTimer] = None) -> None:
+        """
+        通过 UNO 转换单个文件，连接失效时重启进程并重试一次
+
+        Args:
+            input_path: 输入HTML文件路径
+            output_path: 输出PDF文件路径
+            timer: 阶段计时器，记录 load、export 两个阶段，重启耗时记为 restart
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("LibreOffice 监听进程已关闭")
+            if not self.is_alive():
+                with optional_phase(timer, "restart"):
+                    self.restart()
+            try:
+                self._convert(input_path, output_path, timer)
+            except Exception:
+                # 文档本身的错误不会导致进程退出，此时直接抛出
+                if self.is_alive():
+                    raise
+                with optional_phase(timer, "restart"):
+                    self.restart()
+                self._convert(input_path, output_path, timer)
+
+    def _convert(self, input_path: str, output_path: str, timer: Optional[PhaseTimer] = None) -> None:
+        input_url = uno.systemPathToFileUrl(os.path.abspath(input_path))
+        output_url = uno.systemPathToFileUrl(os.path.abspath(output_path))
+
+        with optional_phase(timer, "load"):
+            document = self._desktop.loadComponentFromURL(input_url, "_blank", 0, _props(Hidden=True))
+        if document is None:
+            raise RuntimeError("LibreOffice 无法加载文档")
+        try:
+            with optional_phase(timer, "export"):
+                document.storeToURL(output_url, _props(FilterName=HTML_PDF_FILTER))
+        finally:
+            document.close(True)
+
+
+class SofficeServerPool:
+    """多个 soffice 监听进程组成的池，每个进程使用独立的用户配置目录"""
+
+    def __init__(self, size: int = 1, base_port: Optional[int] = None, soffice_binary: str = "soffice",
+                 checkout_timeout: float = 600.0):
+        """
+        Args:
+            size: 监听进程数
+            base_port: 第一个进程的端口，其余依次加1；为空时每个进程由系统分配空闲端口
+            soffice_binary: soffice 可执行文件
+            checkout_timeout: 等待空闲监听进程的最长时间(秒)
+        """
+        self.size = max(1, size)
+        self.base_port = base_port
+        self.soffice_binary = soffice_binary
+        self.checkout_timeout = checkout_timeout
+
+        self.servers: List[SofficeServer] = []
+        self.launch_time = 0.0  # 启动全部监听进程的墙钟耗时(秒)
+
+        # 关闭时放入 None，唤醒所有等待空闲进程的调用方
+        self._available: "queue.Queue[Optional[SofficeServer]]" = queue.Queue()
+        self._profile_root: Optional[str] = None
+        self._started = False
+        self._closed = False
+
+    def __enter__(self) -> "SofficeServerPool":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    def start(self) -> "SofficeServerPool":
+        """并行启动所有监听进程"""
+        if self._started:
+            return self
+        if self._closed:
+            raise RuntimeError("LibreOffice 监听池已关闭")
+
+        start = time.perf_counter()
+        self._profile_root = tempfile.mkdtemp(prefix="soffice_profiles_")
+        self.servers = [
+            SofficeServer(
+                port=self.base_port + i if self.base_port else None,
+                soffice_binary=self.soffice_binary,
+                profile_dir=os.path.join(self._profile_root, f"profile_{i}")
+            )
+            for i in range(self.size)
+        ]
+
+        errors = []
+
+        def _start(server: SofficeServer) -> None:
+            try:
+                server.start()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=_start, args=(server,)) for server in self.servers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self._started = True
+        if errors:
+            self.close()
+            raise RuntimeError(f"LibreOffice 监听进程启动失败: {errors[0]}")
+
+        for server in self.servers:
+            self._available.put(server)
+        self.launch_time = time.perf_counter() - start
+        return self
+
+    def convert(self, input_path: str, output_path: str, timer: Optional[PhaseTimer] = None) -> None:
+        """检出一个空闲监听进程执行转换，等待空闲进程的时间记为 checkout 阶段"""
+        if not self._started:
+            self.start()
+
+        with optional_phase(timer, "checkout"):
+            try:
+                server = self._available.get(timeout=self.checkout_timeout)
+            except queue.Empty:
+                raise TimeoutError(f"等待空闲的 LibreOffice 监听进程超时(超过{self.checkout_timeout:.0f}秒)")
+        if server is None:
+            # 把关闭标记放回队列，唤醒其余等待者
+            self._available.put(None)
+            raise RuntimeError("LibreOffice 监听池已关闭")
+        try:
+            server.convert(input_path, output_path, timer)
+        finally:
+            self._available.put(server)
+
+    def close(self) -> None:
+        """关闭所有监听进程并清理配置目录；正在转换的进程在转换完成后关闭，之后才删除配置目录"""
+        self._closed = True
+        self._available.put(None)
+        for server in self.servers:
+            server.close()
+        self.servers = []
+        self._started = False
+
+        if self._profile_root:
+            shutil.rmtree(self._profile_root, ignore_errors=True)
+            self._profile_root = None
+
+
+# 进程内共享的监听池，跨多次运行复用
+_shared_pool: Optional[SofficeServerPool] = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_shared_server_pool(size: int = 1) -> SofficeServerPool:
+    """获取(必要时创建并启动)进程内共享的 soffice 监听池，进程数与 size 不同时重建"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is not None and _shared_pool.started and _shared_pool.size != max(1, size):
+            _shared_pool.close()
+        if _shared_pool is None or not _shared_pool.started:
+            _shared_pool = SofficeServerPool(size=size).start()
+        return _shared_pool
+
+
+def close_shared_server_pool() -> None:
+    """关闭进程内共享的 soffice 监听池"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is not None:
+            _shared_pool.close()
+            _shared_pool = None
+
+
+# 只注册一次，退出时关闭当时的共享池，重建共享池不会累积退出处理函数
+atexit.register(close_shared_server_pool)
@@ -0,0 +1,217 @@
+"""
+LibreOffice并行工作进程池
+每个工作进程使用独立的用户配置目录和临时输出目录，避免配置锁冲突和输出文件名竞争
+"""
+
+import errno
+import os
+import pathlib
+import queue
+import shutil
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+def move_output(source: str, destination: str) -> None:
+    """
+    把临时目录中的输出移动到目标路径
+
+    临时目录通常在 /tmp，与输出目录可能位于不同文件系统，此时 os.replace 会因 EXDEV 失败；
+    跨文件系统时先复制到目标目录中的临时文件，再在同一文件系统内原子替换。
+    """
+    try:
+        os.replace(source, destination)
+        return
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+    fd, staging = tempfile.mkstemp(suffix=".pdf", dir=os.path.dirname(os.path.abspath(destination)))
+    os.close(fd)
+    try:
+        shutil.move(source, staging)
+        os.replace(staging, destination)
+    except BaseException:
+        if os.path.exists(staging):
+            os.remove(staging)
+        raise
+
+
+@dataclass
+class SofficeWorker:
+    """单个工作槽位的隔离环境"""
+    worker_id: int
+    profile_dir: str  # -env:UserInstallation 指向的用户配置目录
+    scratch_dir: str  # 该工作槽位专用的输出目录
+
+    @property
+    def profile_url(self) -> str:
+        return pathlib.Path(self.profile_dir).as_uri()
+
+
+class SofficeWorkerPool:
+    """
+    soffice 命令行工作池
+
+    LibreOffice 不允许两个实例共用同一个用户配置目录，因此每个槽位都有自己的配置目录；
+    转换结果先写到槽位专用的临时目录，再移动到目标路径(同一文件系统内为原子替换)。
+    """
+
+    def __init__(self, workers: Optional[int] = None, soffice_binary: str = "soffice",
+                 profile_root: Optional[str] = None, timeout: float = 120.0):
+        """
+        Args:
+            workers: 工作槽位数，默认为CPU核数
+            soffice_binary: soffice 可执行文件
+            profile_root: 配置目录的根目录，指定后跨运行保留，可省去配置初始化开销
+            timeout: 单次转换的超时时间(秒)
+        """
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.soffice_binary = soffice_binary
+        self.timeout = timeout
+
+        self._keep_profiles = profile_root is not None
+        self._root = profile_root or tempfile.mkdtemp(prefix="soffice_workers_")
+        self._slots: List[SofficeWorker] = []
+        self._available: "queue.Queue[SofficeWorker]" = queue.Queue()
+
+        for worker_id in range(self.workers):
+            worker = SofficeWorker(
+                worker_id=worker_id,
+                profile_dir=os.path.join(self._root, f"profile_{worker_id}"),
+                scratch_dir=os.path.join(self._root, f"scratch_{worker_id}")
+            )
+            os.makedirs(worker.profile_dir, exist_ok=True)
+            os.makedirs(worker.scratch_dir, exist_ok=True)
+            self._slots.append(worker)
+            self._available.put(worker)
+
+    def __enter__(self) -> "SofficeWorkerPool":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def build_command(self, worker: SofficeWorker, input_paths: List[str]) -> List[str]:
+        """构造使用槽位独立配置和输出目录的 soffice 命令"""
+        return [
+            self.soffice_binary, "--headless", "--norestore", "--nolockcheck",
+            f"-env:UserInstallation={worker.profile_url}",
+            "--convert-to", "pdf", "--outdir", worker.scratch_dir,
+            *input_paths
+        ]
+
+    def convert(self, input_path: str, output_path: str) -> float:
+        """
+        检出一个空闲槽位转换单个文件
+
+        Returns:
+            soffice 进程耗时(秒)
+
+        Raises:
+            RuntimeError: 转换命令失败或没有生成输出文件
+        """
+        worker = self._available.get()
+        try:
+            start = time.perf_counter()
+            result = subprocess.run(
+                self.build_command(worker, [input_path]),
+                capture_output=True, text=True, timeout=self.timeout
+            )
+            elapsed = time.perf_counter() - start
+
+            stem = os.path.splitext(os.path.basename(input_path))[0]
+            scratch_output = os.path.join(worker.scratch_dir, stem + ".pdf")
+
+            if result.returncode != 0:
+                raise RuntimeError(result.stderr or "转换命令执行失败")
+            if not os.path.exists(scratch_output):
+                raise RuntimeError("输出文件未生成")
+
+            move_output(scratch_output, output_path)
+            return elapsed
+        finally:
+            self._clear_scratch(worker)
+            self._available.put(worker)
+
+    def convert_batch(self, jobs: List[Tuple[str, str]]) -> Tuple[Dict[str, str], float]:
+        """
+        在一次 soffice 调用中转换多个文件，多个文件分摊一次启动开销
+
+        soffice 以输入文件名决定输出文件名，同名输入会被拆分到不同的调用中。
+
+        Args:
+            jobs: (输入路径, 输出路径) 列表
+
+        Returns:
+            (输入路径到错误信息的映射，成功为空字符串；所有 soffice 调用的总耗时)
+        """
+        errors: Dict[str, str] = {}
+        total_elapsed = 0.0
+
+        worker = self._available.get()
+        try:
+            for batch in self._split_unique_stems(jobs):
+                start = time.perf_counter()
+                try:
+                    result = subprocess.run(
+                        self.build_command(worker, [input_path for input_path, _ in batch]),
+                        capture_output=True, text=True, timeout=self.timeout * len(batch)
+                    )
+                    batch_error = "" if result.returncode == 0 else (result.stderr or "转换命令执行失败")
+                except subprocess.TimeoutExpired:
+                    batch_error = "批量转换超时"
+                total_elapsed += time.perf_counter() - start
+
+                # 按输出文件是否生成，把结果归属到每个输入文件
+                for input_path, output_path in batch:
+                    stem = os.path.splitext(os.path.basename(input_path))[0]
+                    scratch_output = os.path.join(worker.scratch_dir, stem + ".pdf")
+                    if os.path.exists(scratch_output):
+                        try:
+                            move_output(scratch_output, output_path)
+                            errors[input_path] = ""
+                        except OSError as e:
+                            errors[input_path] = f"移动输出失败: {e}"
+                    else:
+                        errors[input_path] = batch_error or "输出文件未生成"
+
+                self._clear_scratch(worker)
+        finally:
+            self._available.put(worker)
+
+        return errors, total_elapsed
+
+    @staticmethod
+    def _split_unique_stems(jobs: List[Tuple[str, str]]) -> List[List[Tuple[str, str]]]:
+        """将任务拆分为若干批次，保证同一批次内的输入文件名互不相同"""
+        batches: List[List[Tuple[str, str]]] = []
+        stems: List[set] = []
+        for job in jobs:
+            stem = os.path.splitext(os.path.basename(job[0]))[0]
+            for batch, batch_stems in zip(batches, stems):
+                if stem not in batch_stems:
+                    batch.append(job)
+                    batch_stems.add(stem)
+                    break
+            else:
+                batches.append([job])
+                stems.append({stem})
+        return batches
+
+    def _clear_scratch(self, worker: SofficeWorker) -> None:
+        for filename in os.listdir(worker.scratch_dir):
+            try:
+                os.remove(os.path.join(worker.scratch_dir, filename))
+            except OSError:
+                pass
+
+    def close(self) -> None:
+        """清理临时目录，指定了 profile_root 时保留配置目录"""
+        if self._keep_profiles:
+            for worker in self._slots:
+                shutil.rmtree(worker.scratch_dir, ignore_errors=True)
+        else:
+            shutil.rmtree(self._root, ignore_errors=True)
@@ -1,66 +1,124 @@
 """
 测试运行器
-负责动态导入和运行各种测试脚本
+通过转换器注册表运行各个HTML转PDF后端
 """
 
-import os
-import importlib.util
-from typing import Dict, List, Any
+from typing import Any, Dict, List, Optional
+
+from utils.conversion_cache import ConversionCache
 
 
 class TestRunner:
-    """测试脚本运行器"""
-    
-    def __init__(self):
-        # 获取当前文件的目录，然后构建相对于src目录的路径
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        src_dir = os.path.dirname(current_dir)  # 上一级目录就是src
-        
-        self.test_scripts = {
-            "WeasyPrint": os.path.join(src_dir, "tools", "test_weasyprint.py"),
-            "Playwright": os.path.join(src_dir, "tools", "test_playwright.py"),
-            "LibreOffice": os.path.join(src_dir, "tools", "test_soffice.py")
-        }
-    
-    def import_test_module(self, module_path: str):
-        """动态导入测试模块"""
-        try:
-            spec = importlib.util.spec_from_file_location("test_module", module_path)
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-            return module
-        except Exception as e:
-            print(f"导入模块失败 {module_path}: {e}")
-            return None
-    
-    def run_actual_tests(self) -> Dict[str, List[Dict]]:
-        """运行实际的测试脚本"""
+    """测试运行器"""
+
+    def __init__(self, tools: Optional[List[str]] = None,
+                 converter_options: Optional[Dict[str, Dict[str, Any]]] = None,
+                 samples: Any = None, warmup: int = 0, trials: int = 1, monitor_resources: bool = False,
+                 concurrent: bool = False, max_concurrency: Optional[int] = None,
+                 backend_limits: Optional[Dict[str, int]] = None, cache_dir: Optional[str] = None):
+        """
+        Args:
+            tools: 要运行的工具名称，默认为所有已注册的转换器
+            converter_options: 按工具名称传给转换器的参数，如 {"Playwright": {"mode": "async"}}
+            samples: 样例来源，可以是 Corpus、目录/清单/通配符字符串或样例名列表，默认为内置样例
+            warmup: 基准测试模式下每个文档不计入统计的预热次数
+            trials: 基准测试模式下每个文档的测量次数，大于1时报告分位数和置信区间
+            monitor_resources: 是否记录每个文档转换期间进程树的内存和CPU占用；
+                各后端同时运行时无法区分进程归属，开启后按顺序逐个运行
+            concurrent: 是否让各后端同时运行，默认按顺序逐个运行。各后端互相争用CPU和内存，
+                并行运行时的耗时不能用于评分和规模曲线拟合，只适合快速检查转换是否成功；
+                trials 大于1(基准测试)或开启资源监控时忽略此参数，按顺序运行
+            max_concurrency: 并行运行时全局同时转换的最大文档数
+            backend_limits: 并行运行时按工具名称限制单个后端的并发数
+            cache_dir: 转换缓存目录，设置后输入和参数未变化的文档直接复用上次的PDF和结果
+        """
+        self.tools = tools
+        self.converter_options = converter_options or {}
+        self.samples = samples
+        self.warmup = warmup
+        self.trials = trials
+        self.monitor_resources = monitor_resources
+        self.concurrent = concurrent
+        self.max_concurrency = max_concurrency
+        self.backend_limits = backend_limits or {}
+        self.cache = ConversionCache(cache_dir) if cache_dir else None
+
+    @property
+    def run_concurrently(self) -> bool:
+        """是否实际并行运行各后端；测量耗时分布或资源占用时强制按顺序运行"""
+        return self.concurrent and self.trials <= 1 and not self.monitor_resources
+
+    def resolve_tools(self) -> List[str]:
+        """本次要运行的工具名称，包括模块导入失败的工具(其结果全部记为失败)"""
+        from converters.registry import available_converters, failed_converters
+        return self.tools or available_converters() + list(failed_converters())
+
+    def run_actual_tests(self, tools: Optional[List[str]] = None, samples: Any = None) -> Dict[str, List[Dict]]:
+        """
+        运行实际的转换测试
+
+        Args:
+            tools: 本次运行的工具，默认为初始化时指定的工具
+            samples: 本次运行的样例来源，默认为初始化时指定的样例
+        """
         print("🚀 开始运行实际转换测试...")
-        
+        # converters 依赖 utils.corpus，在这里导入以避免 utils 包初始化时循环导入
+        from converters.registry import failed_converters
+        from converters.runner import run_converter, unavailable_results
+
+        tools = tools or self.resolve_tools()
+        samples = samples if samples is not None else self.samples
+
+        # 模块导入失败的工具不运行，每个样例记为失败
+        failed = {name: error for name, error in failed_converters().items() if name in tools}
         test_results = {}
-        
-        for tool_name, script_name in self.test_scripts.items():
+        for tool_name, error in failed.items():
+            print(f"❌ {tool_name} 不可用: {error}")
+            test_results[tool_name] = unavailable_results(error, samples)
+        tools = [tool_name for tool_name in tools if tool_name not in failed]
+
+        if self.concurrent and not self.run_concurrently:
+            print("⚠️ 基准测试或资源监控模式下各后端按顺序运行，避免互相争用资源影响测量")
+        if tools and self.run_concurrently:
+            test_results.update(self._run_concurrent(tools, samples))
+            return test_results
+
+        for tool_name in tools:
             print(f"\n📋 运行 {tool_name} 测试...")
-            
+
             try:
-                # 导入并运行测试模块
-                module = self.import_test_module(script_name)
-                if module:
-                    if tool_name == "WeasyPrint":
-                        results = module.test_weasyprint()
-                    elif tool_name == "Playwright":
-                        results = module.test_playwright()
-                    elif tool_name == "LibreOffice":
-                        results = module.test_soffice()
-                    
-                    test_results[tool_name] = results
-                    print(f"✅ {tool_name} 测试完成，处理了 {len(results)} 个样例")
-                else:
-                    print(f"❌ {tool_name} 测试模块导入失败")
-                    test_results[tool_name] = []
-                    
+                results = run_converter(tool_name, samples=samples, warmup=self.warmup, trials=self.trials,
+                                        monitor_resources=self.monitor_resources, cache=self.cache,
+                                        **self.converter_options.get(tool_name, {}))
+                test_results[tool_name] = results
+                print(f"✅ {tool_name} 测试完成，处理了 {len(results)} 个样例")
+
             except Exception as e:
                 print(f"❌ {tool_name} 测试执行失败: {e}")
                 test_results[tool_name] = []
-        
-        return test_results
\ No newline at end of file
+
+        self._report_cache()
+        return test_results
+
+    def _report_cache(self) -> None:
+        if self.cache is not None:
+            print(f"🗃️ 转换缓存: {self.cache.describe()}")
+
+    def _run_concurrent(self, tools: List[str], samples: Any) -> Dict[str, List[Dict]]:
+        """各后端同时运行，总耗时接近最慢的后端"""
+        print(f"\n📋 并行运行 {', '.join(tools)} 测试...")
+        from converters.scheduler import ConversionScheduler
+
+        scheduler = ConversionScheduler(max_concurrency=self.max_concurrency, backend_limits=self.backend_limits,
+                                        cache=self.cache)
+        try:
+            test_results = scheduler.run(tools, self.converter_options, samples=samples,
+                                         warmup=self.warmup, trials=self.trials)
+        except Exception as e:
+            print(f"❌ 并行测试执行失败: {e}")
+            return {tool_name: [] for tool_name in tools}
+
+        for tool_name, results in test_results.items():
+            print(f"✅ {tool_name} 测试完成，处理了 {len(results)} 个样例")
+        self._report_cache()
+        return test_results
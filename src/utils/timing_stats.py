@@ -0,0 +1,111 @@
+"""
+计时统计
+对多次测量的转换耗时计算分位数、标准差和自助法(bootstrap)置信区间
+"""
+
+import math
+import random
+import statistics
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """
+    线性插值分位数
+
+    Args:
+        values: 测量值
+        q: 分位点 (0-100)
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return ordered[lower]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def bootstrap_ci(values: Sequence[float], statistic=statistics.median, confidence: float = 0.95,
+                 resamples: int = 1000, seed: Optional[int] = 0) -> Tuple[float, float]:
+    """
+    自助法置信区间
+
+    对测量值有放回地重复抽样，取统计量分布的两侧分位数作为区间。
+
+    Args:
+        values: 测量值
+        statistic: 统计量函数，默认为中位数
+        confidence: 置信水平
+        resamples: 重抽样次数
+        seed: 随机种子，固定后同一组测量值得到相同区间
+    """
+    if not values:
+        return 0.0, 0.0
+    if len(values) == 1:
+        return values[0], values[0]
+
+    rng = random.Random(seed)
+    n = len(values)
+    estimates = [statistic([values[rng.randrange(n)] for _ in range(n)]) for _ in range(resamples)]
+    alpha = (1 - confidence) / 2 * 100
+    return percentile(estimates, alpha), percentile(estimates, 100 - alpha)
+
+
+@dataclass
+class TimingStats:
+    """多次测量的耗时统计(秒)"""
+    trials: int
+    min: float
+    median: float
+    mean: float
+    p90: float
+    p95: float
+    p99: float
+    stdev: float
+    median_ci_low: float
+    median_ci_high: float
+    mean_ci_low: float
+    mean_ci_high: float
+    confidence: float = 0.95
+
+    @classmethod
+    def from_samples(cls, times: Sequence[float], confidence: float = 0.95,
+                     resamples: int = 1000, seed: Optional[int] = 0) -> "TimingStats":
+        times = list(times)
+        if not times:
+            return cls(0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, confidence)
+
+        median_ci = bootstrap_ci(times, statistics.median, confidence, resamples, seed)
+        mean_ci = bootstrap_ci(times, statistics.fmean, confidence, resamples, seed)
+        return cls(
+            trials=len(times),
+            min=min(times),
+            median=statistics.median(times),
+            mean=statistics.fmean(times),
+            p90=percentile(times, 90),
+            p95=percentile(times, 95),
+            p99=percentile(times, 99),
+            stdev=statistics.stdev(times) if len(times) > 1 else 0.0,
+            median_ci_low=median_ci[0],
+            median_ci_high=median_ci[1],
+            mean_ci_low=mean_ci[0],
+            mean_ci_high=mean_ci[1],
+            confidence=confidence
+        )
+
+    @property
+    def relative_ci_width(self) -> float:
+        """中位数置信区间相对中位数的宽度，用于判断测量是否稳定"""
+        return (self.median_ci_high - self.median_ci_low) / self.median if self.median > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        return asdict(self)
+
+
+def summarize_timings(times: List[float], **options) -> Dict[str, float]:
+    """计算耗时统计并转换为可写入JSON的字典"""
+    return TimingStats.from_samples(times, **options).to_dict()
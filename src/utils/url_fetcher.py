@@ -0,0 +1,192 @@
+"""
+带缓存的资源获取器
+作为WeasyPrint的 url_fetcher，在文档之间复用图片、字体和样式表
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+# 离线模式下禁止访问的URL协议
+NETWORK_SCHEMES = ("http://", "https://", "ftp://")
+
+
+class CachingURLFetcher:
+    """
+    带缓存的资源获取器
+
+    内存中按URL维护一个以字节数为上限的LRU缓存；可选的磁盘缓存按内容哈希存储资源，
+    跨运行复用网络资源。离线模式下网络请求只能命中磁盘缓存，否则直接拒绝。
+    """
+
+    def __init__(self, max_memory_bytes: int = 64 * 1024 * 1024,
+                 disk_cache_dir: Optional[str] = None, offline: bool = False,
+                 fetcher: Optional[Callable[[str], Dict[str, Any]]] = None):
+        """
+        Args:
+            max_memory_bytes: 内存缓存的字节数上限
+            disk_cache_dir: 磁盘缓存目录，为空时不使用磁盘缓存
+            offline: 离线模式，禁止网络请求
+            fetcher: 实际获取资源的函数，默认使用 weasyprint.default_url_fetcher
+        """
+        self.max_memory_bytes = max_memory_bytes
+        self.disk_cache_dir = disk_cache_dir
+        self.offline = offline
+        self._fetcher = fetcher
+
+        self.stats = {
+            "requests": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "blocked": 0,
+            "bytes_fetched": 0,
+            "bytes_saved": 0  # 命中缓存而无需重新获取的字节数
+        }
+
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        if disk_cache_dir:
+            os.makedirs(os.path.join(disk_cache_dir, "objects"), exist_ok=True)
+            os.makedirs(os.path.join(disk_cache_dir, "index"), exist_ok=True)
+
+    @property
+    def hit_rate(self) -> float:
+        """缓存命中率(0-1)"""
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+    def __call__(self, url: str) -> Dict[str, Any]:
+        with self._lock:
+            self.stats["requests"] += 1
+
+        # data: URL 已经内联在文档中，缓存没有意义
+        if url.startswith("data:"):
+            return self._fetch(url)
+
+        entry = self._memory_get(url)
+        if entry is not None:
+            with self._lock:
+                self.stats["memory_hits"] += 1
+                self.stats["bytes_saved"] += len(entry["string"])
+            return dict(entry)
+
+        is_network = url.startswith(NETWORK_SCHEMES)
+
+        if is_network and self.disk_cache_dir:
+            entry = self._disk_get(url)
+            if entry is not None:
+                with self._lock:
+                    self.stats["disk_hits"] += 1
+                    self.stats["bytes_saved"] += len(entry["string"])
+                self._memory_put(url, entry)
+                return dict(entry)
+
+        if is_network and self.offline:
+            with self._lock:
+                self.stats["blocked"] += 1
+            raise PermissionError(f"离线模式下禁止网络请求: {url}")
+
+        entry = self._fetch(url)
+        with self._lock:
+            self.stats["misses"] += 1
+            self.stats["bytes_fetched"] += len(entry["string"])
+
+        self._memory_put(url, entry)
+        if is_network and self.disk_cache_dir:
+            self._disk_put(url, entry)
+        return dict(entry)
+
+    def _fetch(self, url: str) -> Dict[str, Any]:
+        """调用实际的获取函数，并把文件流读取为字节以便缓存"""
+        if self._fetcher is None:
+            from weasyprint import default_url_fetcher
+            self._fetcher = default_url_fetcher
+
+        result = dict(self._fetcher(url))
+        if "file_obj" in result:
+            file_obj = result.pop("file_obj")
+            try:
+                result["string"] = file_obj.read()
+            finally:
+                file_obj.close()
+        if isinstance(result.get("string"), str):
+            result["string"] = result["string"].encode(result.get("encoding") or "utf-8")
+        return result
+
+    def _memory_get(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._memory.get(url)
+            if entry is not None:
+                self._memory.move_to_end(url)
+            return entry
+
+    def _memory_put(self, url: str, entry: Dict[str, Any]) -> None:
+        size = len(entry["string"])
+        if size > self.max_memory_bytes:
+            return
+
+        with self._lock:
+            if url in self._memory:
+                self._memory_bytes -= len(self._memory.pop(url)["string"])
+            self._memory[url] = entry
+            self._memory_bytes += size
+
+            # 淘汰最久未使用的条目，直到总字节数回到上限以内
+            while self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted["string"])
+
+    def _index_path(self, url: str) -> str:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_cache_dir, "index", key + ".json")
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.disk_cache_dir, "objects", digest[:2], digest)
+
+    def _disk_get(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._index_path(url), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(self._object_path(meta["sha256"]), "rb") as f:
+                content = f.read()
+        except (OSError, ValueError, KeyError):
+            return None
+
+        if hashlib.sha256(content).hexdigest() != meta["sha256"]:
+            return None
+
+        entry = {k: v for k, v in meta.items() if k != "sha256"}
+        entry["string"] = content
+        return entry
+
+    def _disk_put(self, url: str, entry: Dict[str, Any]) -> None:
+        content = entry["string"]
+        digest = hashlib.sha256(content).hexdigest()
+        object_path = self._object_path(digest)
+
+        try:
+            if not os.path.exists(object_path):
+                os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                tmp_path = f"{object_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(content)
+                os.replace(tmp_path, object_path)
+
+            meta = {k: v for k, v in entry.items() if k != "string" and isinstance(v, (str, int, float, type(None)))}
+            meta["sha256"] = digest
+            index_path = self._index_path(url)
+            tmp_path = f"{index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, index_path)
+        except OSError:
+            # 磁盘缓存写入失败不影响转换
+            pass
@@ -0,0 +1,252 @@
+"""
+WeasyPrint进程池
+WeasyPrint的排版是受GIL限制的纯Python计算，使用多进程在所有CPU核上并行转换
+"""
+
+import math
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from utils.phase_timer import PhaseTimer
+
+
+# 工作进程内的状态，由初始化函数填充，每个进程只导入一次WeasyPrint
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_worker(timeout: float, session_options: Dict[str, Any]) -> None:
+    """工作进程初始化：导入WeasyPrint，创建本进程共用的会话并记录单任务超时"""
+    from utils.weasyprint_session import WeasyPrintSession
+
+    _worker_state["session"] = WeasyPrintSession(**session_options)
+    _worker_state["timeout"] = timeout
+
+
+def _on_task_timeout(signum, frame):
+    raise TimeoutError("转换超时")
+
+
+def convert_document(html_path: str, output_path: str) -> Dict[str, Any]:
+    """
+    在工作进程中转换单个文档
+
+    Returns:
+        包含 success、time、file_size、error、phases(各阶段耗时) 的结果字典
+    """
+    timeout = _worker_state.get("timeout")
+    timer = PhaseTimer()
+    start = time.perf_counter()
+
+    # 使用进程定时器实现单任务超时，超时后工作进程可以继续处理下一个任务
+    use_alarm = bool(timeout) and hasattr(signal, "setitimer")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_task_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    try:
+        _worker_state["session"].convert(html_path, output_path, timer=timer)
+
+        return {
+            "success": True,
+            "time": time.perf_counter() - start,
+            "file_size": os.path.getsize(output_path) if os.path.exists(output_path) else 0,
+            "error": "",
+            "phases": timer.to_dict()
+        }
+    except TimeoutError:
+        return {
+            "success": False,
+            "time": time.perf_counter() - start,
+            "file_size": 0,
+            "error": f"转换超时(超过{timeout:.0f}秒)",
+            "phases": timer.to_dict()
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "time": time.perf_counter() - start,
+            "file_size": 0,
+            "error": str(e),
+            "phases": timer.to_dict()
+        }
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def default_start_method() -> str:
+    """
+    进程池的启动方式
+
+    评估进程中同时运行着Playwright等后台线程，在多线程进程中 fork 可能复制到被其他线程持有的锁，
+    因此优先使用 forkserver，不支持时使用 spawn。
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return "forkserver" if "forkserver" in methods else "spawn"
+
+
+class WeasyPrintProcessPool:
+    """
+    WeasyPrint多进程转换池
+
+    调度器的多个通道或负载测试的多个线程可能同时调用 map。每次 map 都持有当前进程池的引用计数；
+    某次 map 超时后该进程池只是被标记为需要重建，新的 map 使用新建的进程池，
+    旧进程池在最后一个使用者结束后才被强制结束，不会中断其他调用方正在等待的任务。
+    """
+
+    def __init__(self, workers: Optional[int] = None, timeout: float = 120.0,
+                 max_tasks_per_child: Optional[int] = None,
+                 session_options: Optional[Dict[str, Any]] = None,
+                 start_method: Optional[str] = None):
+        """
+        Args:
+            workers: 工作进程数，默认为CPU核数
+            timeout: 单个文档的超时时间(秒)
+            max_tasks_per_child: 每个工作进程处理的最大任务数，超过后重建进程以回收内存
+            session_options: 传给每个工作进程中 WeasyPrintSession 的参数，
+                             如共用样式表、离线模式和资源缓存目录
+            start_method: 工作进程的启动方式，默认见 default_start_method
+        """
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.timeout = timeout
+        self.max_tasks_per_child = max_tasks_per_child
+        self.session_options = session_options or {}
+        self.start_method = start_method or default_start_method()
+
+        self.startup_time = 0.0  # 创建进程池的耗时(秒)
+        self.restart_count = 0  # 因任务超时而重建进程池的次数
+        self._pool = None
+
+        # 进程池生命周期由锁保护；_users 记录每个进程池上正在进行的 map 数，
+        # _hung 记录出现过超时、退役时需要强制结束的进程池
+        self._lock = threading.Lock()
+        self._users: Dict[int, int] = {}
+        self._hung: Set[int] = set()
+
+    def __enter__(self) -> "WeasyPrintProcessPool":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """创建进程池"""
+        with self._lock:
+            self._start_locked()
+
+    def _start_locked(self) -> None:
+        if self._pool is not None:
+            return
+        start = time.perf_counter()
+        context = multiprocessing.get_context(self.start_method)
+        self._pool = context.Pool(
+            processes=self.workers,
+            initializer=_init_worker,
+            initargs=(self.timeout, self.session_options),
+            maxtasksperchild=self.max_tasks_per_child
+        )
+        self.startup_time = time.perf_counter() - start
+
+    def close(self) -> None:
+        """关闭进程池；仍有 map 在使用时由最后一个使用者关闭"""
+        self._retire(force=False)
+
+    def terminate(self) -> None:
+        """强制结束所有工作进程；仍有 map 在使用时由最后一个使用者结束"""
+        self._retire(force=True)
+
+    def _retire(self, force: bool) -> None:
+        with self._lock:
+            pool = self._pool
+            if pool is None:
+                return
+            self._pool = None
+            if force:
+                self._hung.add(id(pool))
+            in_use = self._users.get(id(pool), 0) > 0
+        if not in_use:
+            self._shutdown(pool)
+
+    def _shutdown(self, pool) -> None:
+        with self._lock:
+            force = id(pool) in self._hung
+            self._hung.discard(id(pool))
+        if force:
+            pool.terminate()
+        else:
+            pool.close()
+        pool.join()
+
+    def _acquire(self):
+        """取得当前进程池并增加引用计数，必要时先创建"""
+        with self._lock:
+            self._start_locked()
+            pool = self._pool
+            self._users[id(pool)] = self._users.get(id(pool), 0) + 1
+            return pool
+
+    def _release(self, pool, hung: bool) -> None:
+        """减少引用计数；出现超时的进程池不再分配给新的 map，最后一个使用者结束后退役"""
+        with self._lock:
+            if hung:
+                self._hung.add(id(pool))
+                if self._pool is pool:
+                    self._pool = None
+                    self.restart_count += 1
+            self._users[id(pool)] -= 1
+            retire = self._users[id(pool)] == 0 and self._pool is not pool
+            if self._users[id(pool)] == 0:
+                del self._users[id(pool)]
+        if retire:
+            self._shutdown(pool)
+
+    def map(self, jobs: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """
+        并行转换多个文档
+
+        工作进程内的定时器负责单任务超时；若某个任务卡在无法被信号中断的原生代码中，
+        超过整体截止时间后未完成的任务记为超时，进程池在所有使用者结束后被强制结束并在下次使用时重建。
+
+        Args:
+            jobs: (HTML路径, 输出PDF路径) 列表
+
+        Returns:
+            按输入顺序排列的结果字典列表
+        """
+        pool = self._acquire()
+        hung = False
+        try:
+            pending = [pool.apply_async(convert_document, job) for job in jobs]
+            waves = math.ceil(len(jobs) / self.workers) if jobs else 0
+            deadline = time.perf_counter() + self.timeout * waves + 10
+
+            results = []
+            for async_result in pending:
+                try:
+                    if hung and not async_result.ready():
+                        raise multiprocessing.TimeoutError()
+                    results.append(async_result.get(timeout=max(0.0, deadline - time.perf_counter())))
+                except multiprocessing.TimeoutError:
+                    hung = True
+                    results.append({
+                        "success": False,
+                        "time": self.timeout,
+                        "file_size": 0,
+                        "error": f"转换超时(超过{self.timeout:.0f}秒)，工作进程已被终止"
+                    })
+                except Exception as e:
+                    results.append({
+                        "success": False,
+                        "time": 0,
+                        "file_size": 0,
+                        "error": f"工作进程异常: {e}"
+                    })
+        finally:
+            self._release(pool, hung)
+
+        return results
@@ -0,0 +1,180 @@
+"""
+WeasyPrint会话
+在同一进程的多个文档之间共享字体配置、已解析的样式表和已获取的资源
+"""
+
+import hashlib
+import pathlib
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+from weasyprint import CSS, HTML
+from weasyprint.text.fonts import FontConfiguration
+
+from utils.phase_timer import PhaseTimer, optional_phase
+from utils.url_fetcher import CachingURLFetcher
+
+# 注释整体匹配，注释中的 <link> 不处理
+_LINK_RE = re.compile(r"<!--.*?-->|<link\b[^>]*>", re.IGNORECASE | re.DOTALL)
+_ATTR_RE = re.compile(r"""([a-zA-Z-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""")
+_BASE_RE = re.compile(r"<base\b", re.IGNORECASE)
+# 对打印输出生效的媒体类型
+PRINT_MEDIA = {"all", "print"}
+
+
+class WeasyPrintSession:
+    """
+    WeasyPrint会话
+
+    每次 HTML(...).write_pdf() 默认都会新建字体配置、重新解析样式表并重新获取资源。
+    会话持有一个 FontConfiguration，按内容哈希缓存解析后的 CSS 对象，并通过带缓存的
+    url_fetcher 复用获取到的资源，供同一工作进程中的所有文档使用。
+
+    文档中 <link> 引用的样式表默认由 WeasyPrint 在 render 内部加载，内容经 url_fetcher 缓存，
+    但每个文档都会重新解析。开启 shared_stylesheets 后，会话从文档中移除对打印生效的
+    <link rel="stylesheet">，按地址获取内容并解析一次，之后作为 render(stylesheets=...) 传入。
+    这样传入的样式表属于用户样式表：普通声明的优先级低于文档自身的所有作者样式，
+    !important 声明反而高于作者样式，层叠结果可能与原文档不同，因此需要显式开启。
+    """
+
+    def __init__(self, stylesheets: Optional[List[str]] = None,
+                 url_fetcher: Optional[Callable[[str], Dict[str, Any]]] = None,
+                 offline: bool = False, resource_cache_dir: Optional[str] = None,
+                 shared_stylesheets: bool = False):
+        """
+        Args:
+            stylesheets: 所有文档共用的样式表路径，只解析一次
+            url_fetcher: 自定义资源获取函数，默认使用 CachingURLFetcher
+            offline: 离线模式，禁止网络请求(仅对默认获取函数生效)
+            resource_cache_dir: 资源的磁盘缓存目录(仅对默认获取函数生效)
+            shared_stylesheets: 把文档中 <link> 引用的样式表改为按地址解析一次、跨文档复用，
+                会改变这些样式表的层叠来源，见类说明
+        """
+        self.shared_stylesheets = shared_stylesheets
+        self.font_config = FontConfiguration()
+        self.url_fetcher = url_fetcher or CachingURLFetcher(
+            disk_cache_dir=resource_cache_dir, offline=offline
+        )
+
+        self.stats = {
+            "documents": 0,
+            "css_hits": 0,
+            "css_misses": 0,
+            "links_shared": 0
+        }
+
+        self._css_cache: Dict[str, CSS] = {}
+        self._lock = threading.Lock()
+
+        self.stylesheets = [self.get_css(filename=path) for path in (stylesheets or [])]
+
+    def get_css(self, filename: Optional[str] = None, string: Optional[str] = None,
+                base_url: Optional[str] = None) -> CSS:
+        """
+        获取解析后的样式表，相同内容只解析一次
+
+        Args:
+            filename: 样式表文件路径
+            string: 样式表内容
+            base_url: 解析样式表中相对URL的基准
+        """
+        if filename is not None:
+            with open(filename, 'rb') as f:
+                content = f.read()
+            base_url = base_url or filename
+        else:
+            content = (string or "").encode('utf-8')
+
+        key = hashlib.sha256(content + b"\0" + (base_url or "").encode('utf-8')).hexdigest()
+        with self._lock:
+            css = self._css_cache.get(key)
+            if css is not None:
+                self.stats["css_hits"] += 1
+                return css
+            self.stats["css_misses"] += 1
+
+        css = CSS(string=content.decode('utf-8'), base_url=base_url,
+                  font_config=self.font_config, url_fetcher=self.url_fetcher)
+        with self._lock:
+            self._css_cache[key] = css
+        return css
+
+    def get_linked_css(self, url: str) -> CSS:
+        """获取 <link> 引用的样式表，内容经 url_fetcher 获取，相同内容和地址只解析一次"""
+        entry = self.url_fetcher(url)
+        content = entry.get("string")
+        if content is None:
+            content = entry["file_obj"].read()
+        if isinstance(content, bytes):
+            content = content.decode(entry.get("encoding") or "utf-8")
+        return self.get_css(string=content, base_url=entry.get("redirected_url") or url)
+
+    def share_linked_stylesheets(self, html_content: str, base_url: str) -> Tuple[str, List[CSS]]:
+        """
+        移除文档中对打印生效的 <link rel="stylesheet">，返回 (处理后的HTML, 按文档顺序解析好的样式表)
+
+        带 <base> 的文档、备用样式表和获取失败的样式表保持原样，由 WeasyPrint 自行加载。
+        """
+        if _BASE_RE.search(html_content):
+            return html_content, []
+
+        sheets: List[CSS] = []
+
+        def _replace(match: re.Match) -> str:
+            tag = match.group(0)
+            if tag.startswith("<!--"):
+                return tag
+            attrs = {attr.group(1).lower(): next(value for value in attr.groups()[1:] if value is not None)
+                     for attr in _ATTR_RE.finditer(tag)}
+            rel = attrs.get("rel", "").lower().split()
+            media = {medium.strip() for medium in attrs.get("media", "all").lower().split(",")}
+            if "stylesheet" not in rel or "alternate" in rel or not attrs.get("href") or not media & PRINT_MEDIA:
+                return tag
+            try:
+                sheets.append(self.get_linked_css(urljoin(base_url, attrs["href"])))
+            except Exception:
+                return tag
+            return ""
+
+        html_content = _LINK_RE.sub(_replace, html_content)
+        with self._lock:
+            self.stats["links_shared"] += len(sheets)
+        return html_content, sheets
+
+    def convert(self, html_path: str, output_path: str,
+                stylesheets: Optional[List[CSS]] = None,
+                timer: Optional[PhaseTimer] = None) -> None:
+        """
+        转换单个HTML文件
+
+        Args:
+            html_path: 输入HTML文件路径，同时作为解析相对URL的基准
+            output_path: 输出PDF文件路径
+            stylesheets: 额外的样式表，通常来自 get_css
+            timer: 阶段计时器，记录 load、parse、layout、write 四个阶段
+        """
+        linked: List[CSS] = []
+        with optional_phase(timer, "load"):
+            with open(html_path, 'r', encoding='utf-8') as f:
+                html_content = f.read()
+            if self.shared_stylesheets:
+                html_content, linked = self.share_linked_stylesheets(
+                    html_content, pathlib.Path(html_path).resolve().as_uri()
+                )
+
+        with optional_phase(timer, "parse"):
+            html_doc = HTML(string=html_content, base_url=html_path, url_fetcher=self.url_fetcher)
+
+        # render 完成样式层叠和排版；WeasyPrint 在 write_pdf 中直接把页面绘制进PDF，
+        # 没有独立的绘制(paint)步骤，绘制耗时计入 write
+        with optional_phase(timer, "layout"):
+            document = html_doc.render(
+                stylesheets=self.stylesheets + linked + (stylesheets or []),
+                font_config=self.font_config
+            )
+
+        with optional_phase(timer, "write"):
+            document.write_pdf(output_path)
+        self.stats["documents"] += 1